@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (required by DataFrame.to_parquet / read_parquet)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Cached copies live next to the source CSVs, in a hidden sub-folder
+CACHE_DIR_NAME = ".csv_cache"
+
+# Sources whose dtypes cannot be stored as Parquet are not retried in this process
+_uncacheable = set()
+_lock = threading.Lock()
+
+
+def detect_separator(file_path, sample_size=2048):
+    """Detect the separator (';' or ',') from the beginning of the file."""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        sample = f.read(sample_size)
+    if ';' in sample and sample.count(';') > sample.count(','):
+        return ';'
+    return ','
+
+
+def _cache_paths(file_path, options):
+    """Parquet file and metadata file for a source CSV read with the given options."""
+    folder, name = os.path.split(os.path.abspath(file_path))
+    key = hashlib.md5(json.dumps(options, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:10]
+    base = os.path.join(folder, CACHE_DIR_NAME, f"{os.path.splitext(name)[0]}.{key}")
+    return base + ".parquet", base + ".json"
+
+
+def _source_signature(file_path):
+    stat = os.stat(file_path)
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _load_cached(parquet_path, meta_path, signature):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("source") != signature or not os.path.exists(parquet_path):
+        return None
+    try:
+        df = pd.read_parquet(parquet_path)
+    except Exception as e:
+        print(f"[csv_cache] Invalid cache {parquet_path}, rebuilding: {e}")
+        return None
+    # Parquet gives None for missing strings, read_csv gives NaN
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _parse_csv(file_path, sep, kwargs):
+    if sep is None:
+        sep = detect_separator(file_path)
+    return pd.read_csv(file_path, sep=sep, **kwargs)
+
+
+def _store_cached(df, parquet_path, meta_path, signature, options):
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({"source": signature, "options": options}, f, default=str)
+
+
+def read_csv_cached(file_path, sep=',', **kwargs):
+    """
+    Drop-in replacement for pd.read_csv backed by a Parquet copy of the file.
+
+    The first read parses the CSV and writes the Parquet copy; following reads
+    load the Parquet file until the source mtime or size changes. With
+    sep=None the separator (';' or ',') is detected once, when the cache is
+    built. Without pyarrow, or if the frame cannot be stored as Parquet, the
+    CSV is simply parsed with pd.read_csv.
+    """
+    file_path = os.fspath(file_path)
+    options = dict(kwargs, sep=sep)
+    if not PARQUET_AVAILABLE or file_path in _uncacheable:
+        return _parse_csv(file_path, sep, kwargs)
+
+    signature = _source_signature(file_path)
+    parquet_path, meta_path = _cache_paths(file_path, options)
+    df = _load_cached(parquet_path, meta_path, signature)
+    if df is not None:
+        return df
+
+    df = _parse_csv(file_path, sep, kwargs)
+    try:
+        with _lock:
+            _store_cached(df, parquet_path, meta_path, signature, options)
+    except Exception as e:
+        # Mixed-type object columns or a read-only folder: keep working from the CSV
+        print(f"[csv_cache] Not caching {file_path}: {e}")
+        _uncacheable.add(file_path)
+    return df
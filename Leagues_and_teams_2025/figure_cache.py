@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from pages.csv_cache import CACHE_DIR_NAME
+
+# Figures kept in memory per process (least recently used are evicted first)
+MAX_MEMORY_ENTRIES = 64
+
+
+def source_signature(sources):
+    """(path, mtime, size) of each source file; mtime and size are None for missing files."""
+    signature = []
+    for path in sources:
+        try:
+            stat = os.stat(path)
+            signature.append((os.path.abspath(path), stat.st_mtime, stat.st_size))
+        except OSError:
+            signature.append((os.path.abspath(path), None, None))
+    return tuple(signature)
+
+
+class FigureCache:
+    """
+    Cache of the Plotly figures of a chart, keyed by (league, season, chart
+    type, source mtime).
+
+    build() returns the figures of one chart type (a figure or a list of
+    figures) and only runs when the sources changed since the last build: the
+    figures are stored as plain JSON dicts, ready for dcc.Graph, in an LRU
+    cache in memory and in a JSON file in the cache folder next to the first
+    source. A cache hit does not touch pandas or Plotly.
+    """
+
+    def __init__(self, max_entries=MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_path(league, season, chart, sources):
+        folder = os.path.dirname(os.path.abspath(sources[0]))
+        name = hashlib.md5(json.dumps([league, season, chart]).encode('utf-8')).hexdigest()[:10]
+        return os.path.join(folder, CACHE_DIR_NAME, f"figures.{chart}.{name}.json")
+
+    def _remember(self, key, figures):
+        with self._lock:
+            self._memory[key] = figures
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _read_disk(cache_path, signature):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('source') != [list(entry) for entry in signature]:
+            return None
+        return data['figures']
+
+    @staticmethod
+    def _write_disk(cache_path, signature, figures):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'source': signature, 'figures': figures}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"[FigureCache] Not caching {cache_path}: {e}")
+
+    def get(self, league, season, chart, sources, build):
+        """
+        Figures of a chart as JSON dicts (a list if build returns a list).
+        sources are the files the figures are built from.
+        """
+        signature = source_signature(sources)
+        key = (league, season, chart, signature)
+        with self._lock:
+            figures = self._memory.get(key)
+            if figures is not None:
+                self._memory.move_to_end(key)
+                return figures
+
+        cache_path = self._cache_path(league, season, chart, sources)
+        figures = self._read_disk(cache_path, signature)
+        if figures is None:
+            built = build()
+            if isinstance(built, (list, tuple)):
+                figures = [json.loads(figure.to_json()) for figure in built]
+            else:
+                figures = json.loads(built.to_json())
+            if all(entry[1] is not None for entry in signature):
+                self._write_disk(cache_path, signature, figures)
+        self._remember(key, figures)
+        return figures
+
+    def clear(self):
+        """Empty the in-memory cache (the files on disk are left untouched)."""
+        with self._lock:
+            self._memory.clear()
+
+
+_figure_cache = FigureCache()
+
+
+def cached_figures(league, season, chart, sources, build):
+    """Figures of a chart from the process-wide FigureCache (see FigureCache.get)."""
+    return _figure_cache.get(league, season, chart, sources, build)
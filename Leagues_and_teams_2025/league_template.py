@@ -1,13 +1,17 @@
-# league_template.py aggiornato con toggle Offensive/Defensive Stats ma SENZA classifica e SENZA scatter con loghi
+# league_template.py aggiornato con classifica e toggle Offensive/Defensive Stats ma SENZA scatter con loghi
 
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import os
+import threading
 from urllib.parse import parse_qs
 import dash
+from pages.csv_cache import read_csv_cached
+from pages.figure_cache import cached_figures
 
 LEAGUE_NAMES = {
     "EPL": "Premier League",
@@ -35,6 +39,62 @@ DEFAULT_SEASONS = ["24-25", "23-24", "22-23"]
 
 layout = html.Div(id="dynamic-league-layout")
 
+# Cartella assets/<lega> -> (mtime della cartella, loghi .png in ordine alfabetico)
+_logo_listings = {}
+_logo_listings_lock = threading.Lock()
+
+def list_team_logos(league_code):
+    """Loghi delle squadre di una lega; la cartella viene riletta solo quando cambia."""
+    folder_path = os.path.join("assets", league_code)
+    try:
+        mtime = os.path.getmtime(folder_path)
+    except OSError:
+        return []
+    cached = _logo_listings.get(folder_path)
+    if cached is None or cached[0] != mtime:
+        images = sorted(f for f in os.listdir(folder_path) if f.endswith(".png"))
+        cached = (mtime, images)
+        with _logo_listings_lock:
+            _logo_listings[folder_path] = cached
+    return cached[1]
+
+def league_stats_path(league_code, season):
+    base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, league_code, f"data_{league_code}_{season}", f"{league_code}_{season}.csv")
+
+def load_league_stats(league_code, season):
+    return read_csv_cached(league_stats_path(league_code, season))
+
+def league_standings_path(league_code, season):
+    # Classifica della stagione, accanto al CSV delle statistiche (come clasificacion.csv della Serie A)
+    return os.path.join(os.path.dirname(league_stats_path(league_code, season)), "clasificacion.csv")
+
+def load_league_standings(league_code, season):
+    return read_csv_cached(league_standings_path(league_code, season))
+
+# Colonne della classifica mostrate in tabella, se presenti nel CSV
+STANDINGS_COLUMNS = [
+    ("#", "RL"), ("Team", "Equipo"), ("Pts", "Pts"), ("⚽ GF", "GF"),
+    ("🛡️ GC", "GC"), ("xG", "xG"), ("xGA", "xGA"),
+]
+
+def league_standings_figure(league_code, season):
+    """Grafico dei punti della classifica, dalla cache delle figure come le statistiche."""
+    return cached_figures(league_code, season, "standings", [league_standings_path(league_code, season)],
+                          lambda: create_standings_chart(load_league_standings(league_code, season)))
+
+def league_stats_figures(league_code, season, section):
+    """
+    Figure della sezione offensive o defensive di una lega e stagione, dalla
+    cache delle figure (ricostruite solo se il CSV della stagione cambia).
+    """
+    if section == "defensive":
+        build = lambda stats: [create_defensive_radar(stats), create_defensive_zone_chart(stats)]
+    else:
+        build = lambda stats: [create_offensive_radar(stats), create_goal_creation_chart(stats)]
+    return cached_figures(league_code, season, section, [league_stats_path(league_code, season)],
+                          lambda: build(load_league_stats(league_code, season)))
+
 def register_callbacks(app):
     @app.callback(
         Output("dynamic-league-layout", "children"),
@@ -76,6 +136,7 @@ def register_callbacks(app):
                 html.H3("Select a Team", className="text-center my-4", style={"color": "#1D3557"}),
                 html.Div(id="team-cards-container-generic", className="my-4"),
                 html.Hr(),
+                html.Div(id="league-standings-container-generic", className="my-4"),
                 html.Div([
                     html.Div([
                         dbc.ButtonGroup([
@@ -97,12 +158,10 @@ def register_callbacks(app):
         if not search or not season:
             return []
         league_code = parse_qs(search.lstrip("?")).get("league", [None])[0]
-        folder_path = os.path.join("assets", league_code)
-
-        if not os.path.exists(folder_path):
+        images = list_team_logos(league_code)
+        if not images:
             return []
 
-        images = [f for f in os.listdir(folder_path) if f.endswith(".png")]
         return dbc.Row([
             dbc.Col(
                 dbc.Card([
@@ -117,9 +176,40 @@ def register_callbacks(app):
                         ),
                     ]),
                 ], className="shadow-lg text-center mb-4"), width=3
-            ) for img in sorted(images)
+            ) for img in images
         ], className="g-4 justify-content-center")
 
+    @app.callback(
+        Output("league-standings-container-generic", "children"),
+        Input("url", "search"),
+        Input("season-selector-generic", "value")
+    )
+    def update_standings(search, season):
+        if not search or not season:
+            return []
+        league_code = parse_qs(search.lstrip("?")).get("league", [None])[0]
+        if not league_code or not os.path.exists(league_standings_path(league_code, season)):
+            return []
+
+        try:
+            standings = load_league_standings(league_code, season)
+            points_fig = league_standings_figure(league_code, season)
+        except:
+            return html.Div("Classifica non disponibile", className="text-danger")
+
+        return html.Div([
+            html.H4("🏆 Standings", className="mb-2", style={"color": "#1D3557"}),
+            dash_table.DataTable(
+                columns=[{"name": name, "id": col} for name, col in STANDINGS_COLUMNS if col in standings.columns],
+                data=standings.to_dict("records"),
+                style_table={"overflowX": "auto"},
+                style_cell={"textAlign": "center", "fontFamily": "Poppins", "padding": "6px", "whiteSpace": "nowrap"},
+                style_header={"backgroundColor": "#1D3557", "color": "white", "fontWeight": "bold"}
+            ),
+            dcc.Graph(figure=points_fig, style={"height": "500px"}, className="mt-4"),
+            html.Hr()
+        ])
+
     @app.callback(
         Output("league-stats-container-generic", "children"),
         Input("offensive-btn", "n_clicks"),
@@ -132,26 +222,17 @@ def register_callbacks(app):
             return ""
         ctx = dash.callback_context
         league_code = parse_qs(search.lstrip("?")).get("league", [None])[0]
-        folder = f"data_{league_code}_{season}"
-        base = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(base, league_code, folder)
+        section = "defensive" if ctx.triggered_id == "defensive-btn" else "offensive"
 
         try:
-            stats = pd.read_csv(os.path.join(path, f"{league_code}_{season}.csv"))
+            radar_fig, detail_fig = league_stats_figures(league_code, season, section)
         except:
             return html.Div("Dati non disponibili", className="text-danger")
 
-        triggered = ctx.triggered_id
-        if triggered == "defensive-btn":
-            return html.Div([
-                dcc.Graph(figure=create_defensive_radar(stats), style={"height": "600px"}),
-                dcc.Graph(figure=create_defensive_zone_chart(stats), style={"height": "650px"})
-            ])
-        else:
-            return html.Div([
-                dcc.Graph(figure=create_offensive_radar(stats), style={"height": "600px"}),
-                dcc.Graph(figure=create_goal_creation_chart(stats), style={"height": "650px"})
-            ])
+        return html.Div([
+            dcc.Graph(figure=radar_fig, style={"height": "600px"}),
+            dcc.Graph(figure=detail_fig, style={"height": "650px"})
+        ])
 
 import plotly.graph_objects as go
 
@@ -179,29 +260,29 @@ def create_offensive_radar(df):
         'Exitosa%': 55
     }
 
-    radar_df = df[['Equipo'] + radar_metrics].copy()
-
-    for metrica in radar_metrics:
-        radar_df[metrica] = radar_df[metrica] / max_reference[metrica]
+    # Valori normalizzati (una riga per squadra, radar chiuso ripetendo la prima metrica)
+    normalized = df[radar_metrics].to_numpy(dtype=float) / [max_reference[m] for m in radar_metrics]
+    closed = np.hstack([normalized, normalized[:, :1]])
+    shown = normalized * [max_reference[m] for m in radar_metrics]
+    theta = radar_labels + [radar_labels[0]]
 
-    fig = go.Figure()
-    for _, row in radar_df.iterrows():
-        values = [row[m] for m in radar_metrics]
-        fig.add_trace(go.Scatterpolar(
-            r=values + [values[0]],
-            theta=radar_labels + [radar_labels[0]],
+    fig = go.Figure(data=[
+        go.Scatterpolar(
+            r=list(r),
+            theta=theta,
             fill='toself',
-            name=row['Equipo'],
+            name=team,
             hovertemplate=(
-                f"<b>{row['Equipo']}</b><br>" +
-                f"Goals/90: {row['Gls./90'] * max_reference['Gls./90']:.2f}<br>" +
-                f"xG/90: {row['xG/90'] * max_reference['xG/90']:.2f}<br>" +
-                f"Assists/90: {row['Ast/90'] * max_reference['Ast/90']:.2f}<br>" +
-                f"SCA90: {row['SCA90'] * max_reference['SCA90']:.2f}<br>" +
-                f"Shots/90: {row['T/90'] * max_reference['T/90']:.2f}<br>" +
-                f"Successful Dribbles %: {row['Exitosa%'] * max_reference['Exitosa%']:.2f}%<extra></extra>"
+                f"<b>{team}</b><br>" +
+                f"Goals/90: {v[0]:.2f}<br>" +
+                f"xG/90: {v[1]:.2f}<br>" +
+                f"Assists/90: {v[2]:.2f}<br>" +
+                f"SCA90: {v[3]:.2f}<br>" +
+                f"Shots/90: {v[4]:.2f}<br>" +
+                f"Successful Dribbles %: {v[5]:.2f}%<extra></extra>"
             )
-        ))
+        ) for team, r, v in zip(df['Equipo'], closed, shown)
+    ])
 
     fig.update_layout(
         polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
@@ -219,9 +300,7 @@ def create_goal_creation_chart(df):
     }
     df['Total'] = df[cols].sum(axis=1)
     df = df.sort_values(by='Total', ascending=False)
-    fig = go.Figure()
-    for col in cols:
-        fig.add_trace(go.Bar(x=df['Equipo'], y=df[col], name=label_map[col]))
+    fig = go.Figure(data=[go.Bar(x=df['Equipo'], y=df[col], name=label_map[col]) for col in cols])
     fig.update_layout(barmode='stack', xaxis_title='Team', yaxis_title='GCA')
     return fig
 
@@ -244,42 +323,42 @@ def create_defensive_radar(df):
         'Errores_inverso': df['Errores'].max()  # così l'inverso si scala correttamente
     }
 
-    radar_df = df[['Equipo', 'Tkl/90', 'Intercepciones/90', 'Tkl+Int/90', 'Bloqueos_totales/90', '% de ganados', 'Errores_inverso']].copy()
-
-    # Percentili su scala 100
-    for metrica in radar_df.columns[1:]:
-        radar_df[metrica] = radar_df[metrica] / max_reference[metrica] * 100
-
-    fig = go.Figure()
-    for _, row in radar_df.iterrows():
-        values = [
-            row['Tkl/90'],
-            row['Intercepciones/90'],
-            row['Tkl+Int/90'],
-            row['Bloqueos_totales/90'],
-            row['% de ganados'],
-            row['Errores_inverso'],
-            row['Tkl/90']
-        ]
-        original = df[df['Equipo'] == row['Equipo']].iloc[0]
-        hovertext = (
-            f"<b>{row['Equipo']}</b><br>" +
-            f"Tkl/90: {original['Tkl']/original['90 s']:.2f}<br>" +
-            f"Intercepciones/90: {original['Intercepciones']/original['90 s']:.2f}<br>" +
-            f"Tkl+Int/90: {original['Tkl+Int']/original['90 s']:.2f}<br>" +
-            f"Bloqueos totales/90: {original['Bloqueos_totales']/original['90 s']:.2f}<br>" +
-            f"Duelli vinti %: {original['% de ganados']:.2f}<br>" +
-            f"Errori (inversi): {original['Errores_inverso']:.2f}"
-        )
-
-        fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=['Tkl', 'Intercepciones', 'Tkl+Int', 'Bloqueos_totales', 'Duelli vinti %', 'Errori (inversi)', 'Tkl'],
+    radar_columns = ['Tkl/90', 'Intercepciones/90', 'Tkl+Int/90', 'Bloqueos_totales/90', '% de ganados', 'Errores_inverso']
+
+    # Percentili su scala 100, radar chiuso ripetendo Tkl/90
+    scaled = df[radar_columns].to_numpy(dtype=float) / [max_reference[m] for m in radar_columns] * 100
+    closed = np.hstack([scaled, scaled[:, :1]])
+
+    # Valori nel tooltip: prima riga di ogni squadra
+    original = df.drop_duplicates(subset='Equipo').set_index('Equipo').reindex(df['Equipo'])
+    hover_values = np.column_stack([
+        original['Tkl'] / original['90 s'],
+        original['Intercepciones'] / original['90 s'],
+        original['Tkl+Int'] / original['90 s'],
+        original['Bloqueos_totales'] / original['90 s'],
+        original['% de ganados'],
+        original['Errores_inverso']
+    ])
+    theta = ['Tkl', 'Intercepciones', 'Tkl+Int', 'Bloqueos_totales', 'Duelli vinti %', 'Errori (inversi)', 'Tkl']
+
+    fig = go.Figure(data=[
+        go.Scatterpolar(
+            r=list(r),
+            theta=theta,
             fill='toself',
-            name=row['Equipo'],
+            name=team,
             hoverinfo='text',
-            text=hovertext
-        ))
+            text=(
+                f"<b>{team}</b><br>" +
+                f"Tkl/90: {v[0]:.2f}<br>" +
+                f"Intercepciones/90: {v[1]:.2f}<br>" +
+                f"Tkl+Int/90: {v[2]:.2f}<br>" +
+                f"Bloqueos totales/90: {v[3]:.2f}<br>" +
+                f"Duelli vinti %: {v[4]:.2f}<br>" +
+                f"Errori (inversi): {v[5]:.2f}"
+            )
+        ) for team, r, v in zip(df['Equipo'], closed, hover_values)
+    ])
 
     fig.update_layout(
         polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
@@ -287,6 +366,19 @@ def create_defensive_radar(df):
     )
     return fig
 
+def create_standings_chart(df):
+    # Punti per squadra in ordine di classifica, con gol e xG nel tooltip
+    df = df.sort_values(by='Pts', ascending=False)
+    extra = [col for col in ['GF', 'GC', 'xG', 'xGA'] if col in df.columns]
+    hover = "".join(f"<br>{col}: %{{customdata[{i}]}}" for i, col in enumerate(extra))
+    fig = go.Figure(go.Bar(
+        x=df['Equipo'], y=df['Pts'], customdata=df[extra].to_numpy(),
+        marker_color='#1D3557',
+        hovertemplate=f"<b>%{{x}}</b><br>Pts: %{{y}}{hover}<extra></extra>"
+    ))
+    fig.update_layout(xaxis_title='Team', yaxis_title='Points', title='🏆 Points', title_x=0.5)
+    return fig
+
 def create_defensive_zone_chart(df):
     zone_df = df[['Equipo', '3.º_def', '3.º_cent', '3.º_ataq']].copy()
     zone_df = zone_df.rename(columns={
@@ -296,8 +388,7 @@ def create_defensive_zone_chart(df):
     })
     zone_df['Total'] = zone_df[['Defensive Third', 'Middle Third', 'Attacking Third']].sum(axis=1)
     zone_df = zone_df.sort_values(by='Total', ascending=False)
-    fig = go.Figure()
-    for zone in ['Defensive Third', 'Middle Third', 'Attacking Third']:
-        fig.add_trace(go.Bar(x=zone_df['Equipo'], y=zone_df[zone], name=zone))
+    fig = go.Figure(data=[go.Bar(x=zone_df['Equipo'], y=zone_df[zone], name=zone)
+                          for zone in ['Defensive Third', 'Middle Third', 'Attacking Third']])
     fig.update_layout(barmode='stack', xaxis_title='Team', yaxis_title='Defensive Actions')
     return fig
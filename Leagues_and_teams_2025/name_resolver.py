@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rapidfuzz import fuzz, process
+
+# Scorers accepted by NameResolver (rapidfuzz.fuzz functions)
+SCORERS = ('ratio', 'partial_ratio', 'token_sort_ratio')
+
+# Names resolved one at a time (e.g. from a URL) kept in memory per resolver
+MAX_RECENT_NAMES = 1024
+
+
+def trigrams(text):
+    """Character trigrams of a string, padded so that short names still have some."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameResolver:
+    """
+    Resolves free-form names against a fixed list of candidate names.
+
+    Candidates are indexed by trigram once; a query is only scored against the
+    candidates sharing at least one trigram with it (all of them if none do).
+    Scores are the best of the chosen scorers, rounded to integers (as the
+    old fuzzywuzzy scores were), and the first candidate with the highest
+    score wins. Each scorer is a single rapidfuzz process.cdist call over the
+    block.
+
+    Names resolved in batch with resolve_many are memoized in memory and, if
+    memo_dir is given, in a JSON file named after the candidates, scorers and
+    threshold, so a changed candidate list never reuses stale answers. Names
+    resolved one at a time with resolve may come from user input: they are
+    only kept in an in-memory LRU of max_recent entries and never written to
+    disk.
+    """
+
+    def __init__(self, candidates, scorers=('ratio',), min_score=80, memo_dir=None,
+                 max_recent=MAX_RECENT_NAMES):
+        unknown = [s for s in scorers if s not in SCORERS]
+        if unknown:
+            raise ValueError(f"Unknown scorers: {unknown}")
+        self.candidates = list(candidates)
+        self.scorers = tuple(scorers)
+        self.min_score = min_score
+        self._keys = np.array([str(c).lower() for c in self.candidates], dtype=object)
+
+        blocks = {}
+        for i, key in enumerate(self._keys):
+            for gram in trigrams(key):
+                blocks.setdefault(gram, []).append(i)
+        self._blocks = {gram: np.array(rows) for gram, rows in blocks.items()}
+
+        signature = json.dumps([self.candidates, self.scorers, self.min_score], default=str)
+        name = hashlib.md5(signature.encode('utf-8')).hexdigest()[:12]
+        self.memo_path = os.path.join(memo_dir, f"names.{name}.json") if memo_dir else None
+        self._memo = self._load_memo()
+        self.max_recent = max_recent
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load_memo(self):
+        if not self.memo_path:
+            return {}
+        try:
+            with open(self.memo_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_memo(self):
+        try:
+            os.makedirs(os.path.dirname(self.memo_path), exist_ok=True)
+            tmp_path = f"{self.memo_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._memo, f, ensure_ascii=False)
+            os.replace(tmp_path, self.memo_path)
+        except OSError as e:
+            print(f"[NameResolver] Not saving {self.memo_path}: {e}")
+            self.memo_path = None
+
+    def _block(self, key):
+        rows = [self._blocks[gram] for gram in trigrams(key) if gram in self._blocks]
+        return np.unique(np.concatenate(rows)) if rows else np.arange(len(self._keys))
+
+    def _scores(self, key, rows):
+        choices = self._keys[rows].tolist()
+        matrix = np.vstack([process.cdist([key], choices, scorer=getattr(fuzz, scorer))[0]
+                            for scorer in self.scorers])
+        return np.rint(matrix).max(axis=0)
+
+    def _match(self, key):
+        rows = self._block(key)
+        if not len(rows):
+            return None
+        scores = self._scores(key, rows)
+        best = int(np.argmax(scores))
+        return self.candidates[rows[best]] if scores[best] >= self.min_score else None
+
+    def resolve(self, name):
+        """Best candidate for name, or None if no candidate reaches min_score."""
+        if not isinstance(name, str):
+            return None
+        key = name.lower()
+        if key in self._memo:
+            return self._memo[key]
+        with self._lock:
+            if key in self._recent:
+                self._recent.move_to_end(key)
+                return self._recent[key]
+        result = self._match(key)
+        with self._lock:
+            self._recent[key] = result
+            while len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+        return result
+
+    def resolve_many(self, names):
+        """Resolve a list of names, writing the memo file at most once."""
+        keys = {name.lower() for name in names if isinstance(name, str)}
+        missing = {key: self._match(key) for key in keys if key not in self._memo}
+        if missing:
+            with self._lock:
+                self._memo.update(missing)
+                if self.memo_path:
+                    self._save_memo()
+        return [self._memo[name.lower()] if isinstance(name, str) else None for name in names]
@@ -5,7 +5,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+import glob
 import dash
+from pages.csv_cache import read_csv_cached
+from pages.figure_cache import cached_figures
 
 # --- Squadre per stagione ---
 TEAMS_2425 = [
@@ -149,7 +152,7 @@ def load_league_stats(season):
     if not folder_name:
         return None
     data_path = os.path.join(current_dir, "..", folder_name)
-    clasif = pd.read_csv(os.path.join(data_path, "clasificacion.csv"))
+    clasif = read_csv_cached(os.path.join(data_path, "clasificacion.csv"))
     return clasif
 
 def add_team_logos(df, season):
@@ -222,7 +225,7 @@ def normalize_team_names(df):
     df['Equipo'] = df['Equipo'].astype(str).str.strip().str.lower()
     return df
 
-def create_defensive_stats(df, season):
+def create_defensive_figures(df, season):
     clasif = load_league_stats(season)
     clasif = normalize_team_names(clasif)
     df = normalize_team_names(df)
@@ -357,6 +360,9 @@ def create_defensive_stats(df, season):
         legend_title='Zone'
     )
 
+    return [radar_fig, scatter_fig, zone_fig]
+
+def defensive_stats_layout(radar_fig, scatter_fig, zone_fig):
     return html.Div([
         dcc.Graph(figure=radar_fig, style={"height": "600px"}),
         html.H4("🧱 xGA vs Goals Conceded", className="mt-5", style={"color": "#1D3557"}),
@@ -365,12 +371,9 @@ def create_defensive_stats(df, season):
         dcc.Graph(figure=zone_fig, style={"height": "650px"})
     ])
 
+def create_defensive_stats(df, season):
+    return defensive_stats_layout(*create_defensive_figures(df, season))
 
-# Componenti globali inizializzati
-radar_chart_component_global = html.Div()
-scatter_component_global = html.Div()
-gca_stacked_component_global = html.Div()
-defensive_stats_content_global = html.Div()
 
 def get_color(row):
     pos = row["RL"]
@@ -393,7 +396,7 @@ import pandas as pd
 import plotly.graph_objects as go
 import os
 
-def create_playing_styles_scatter(df, season):
+def create_playing_styles_figure(df, season):
     import plotly.graph_objects as go
     from dash import dcc, html
     import pandas as pd
@@ -502,11 +505,12 @@ def create_playing_styles_scatter(df, season):
         yaxis=dict(automargin=True)
     )
 
-    return dcc.Graph(figure=fig, style={"height": "700px"})
+    return fig
 
-def generate_stats_layout(season):
-    global radar_chart_component_global, scatter_component_global, gca_stacked_component_global, defensive_stats_content_global
+def create_playing_styles_scatter(df, season):
+    return dcc.Graph(figure=create_playing_styles_figure(df, season), style={"height": "700px"})
 
+def generate_stats_layout(season):
     clasif = load_league_stats(season)
     if clasif is None:
         return html.Div("Dati non disponibili per questa stagione", className="text-danger")
@@ -571,19 +575,51 @@ def generate_stats_layout(season):
         style_data={"backgroundColor": "white", "color": "black"}
     )
 
-    # Caricamento CSV con metriche
+    # --- RENDER LAYOUT COMPLETO ---
+    return html.Div([
+        html.H4("🏆 Standings", className="mt-4 mb-2", style={"color": "#1D3557"}),
+        classification_table,
+        html.H4("🎯 Scores", className="mt-5 mb-2", style={"color": "#1D3557"}),
+        marcatori_table,
+        html.Hr(),
+        html.H2("📊 Serie A Stats", className="text-center mt-4", style={"color": "#1D3557", "fontWeight": "bold"}),
+      
+        html.Div(id="offensive-stats-container", className="mt-4"),
+        html.Div(id="defensive-stats-container", className="mt-4"),
+        html.Div(id="style-stats-container", className="mt-4"),
+        html.Div(id="advanced-stats-content", className="mt-4")
+    ])
+
+def team_stats_path(season):
+    # Metriche di squadra della stagione (Serie_A_<stagione>.csv)
+    folder_map = {
+        "24-25": "data_serie_a_24-25",
+        "23-24": "data_serie_a_23-24",
+        "22-23": "data_serie_a_22-23",
+    }
     filename_map = {
         "24-25": "Serie_A_24-25.csv",
         "23-24": "Serie_A_23-24.csv",
         "22-23": "Serie_A_22-23.csv"
     }
-    csv_path = os.path.join(current_dir, "..", folder_map[season], filename_map[season])
-    serie_a_df = pd.read_csv(csv_path)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, "..", folder_map[season], filename_map[season])
+
+def load_team_stats(season):
+    return read_csv_cached(team_stats_path(season))
+
+def league_stats_path(season):
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, "..", "data_serie_a_" + season, "clasificacion.csv")
+
+def wyscout_path_for(season):
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, "data_serie_a_" + season)
+
+def create_offensive_figures(serie_a_df, season):
 
-    # COMPONENTI GRAFICI
     offensive_metrics = ['Equipo', 'Gls./90', 'xG/90', 'Ast/90', 'SCA90', 'T/90', 'Exitosa%']
     radar_fig = create_offensive_radar(serie_a_df[offensive_metrics])
-    radar_chart_component_global = dcc.Graph(figure=radar_fig, style={"height": "600px"})
 
     df_loghi = add_team_logos(serie_a_df.copy(), season)
     fig = go.Figure()
@@ -623,7 +659,6 @@ def generate_stats_layout(season):
         height=600,
         margin=dict(l=40, r=40, t=40, b=40)
     )
-    scatter_component_global = dcc.Graph(figure=fig, style={"height": "600px"})
 
     gca_sources = serie_a_df[['Equipo', 'PassLive_GCA', 'PassDead_GCA', 'HASTA_GCA', 'Dis_GCA', 'FR_GCA', 'Def_GCA']].copy()
     gca_sources['Total_GCA'] = gca_sources.iloc[:, 1:].sum(axis=1)
@@ -656,27 +691,57 @@ def generate_stats_layout(season):
         legend_title='GCA Type',
         height=600
     )
-    gca_stacked_component_global = dcc.Graph(figure=gca_fig, style={"height": "650px", "width": "100%"})
 
-    defensive_stats_content_global = create_defensive_stats(serie_a_df.copy(), season)
+    return [radar_fig, fig, gca_fig]
 
-    # --- RENDER LAYOUT COMPLETO ---
+def build_offensive_section(season):
+    # Figure dalla cache: pandas e Plotly solo se Serie_A_<stagione>.csv è cambiato
+    radar_fig, fig, gca_fig = cached_figures(
+        "serie_a", season, "offensive", [team_stats_path(season)],
+        lambda: create_offensive_figures(load_team_stats(season), season)
+    )
     return html.Div([
-        html.H4("🏆 Standings", className="mt-4 mb-2", style={"color": "#1D3557"}),
-        classification_table,
-        html.H4("🎯 Scores", className="mt-5 mb-2", style={"color": "#1D3557"}),
-        marcatori_table,
-        html.Hr(),
-        html.H2("📊 Serie A Stats", className="text-center mt-4", style={"color": "#1D3557", "fontWeight": "bold"}),
-      
-        html.Div(id="offensive-stats-container", className="mt-4"),
-        html.Div(id="defensive-stats-container", className="mt-4"),
-        html.Div(id="style-stats-container", className="mt-4"),
-        html.Div(id="advanced-stats-content", className="mt-4")
+        html.H4("📈 Offensive Radar", className="mt-4", style={"color": "#1D3557"}),
+        dcc.Graph(figure=radar_fig, style={"height": "600px"}),
+        html.H4("🎯 xG vs Goals", className="mt-5", style={"color": "#1D3557"}),
+        dcc.Graph(figure=fig, style={"height": "600px"}),
+        html.H4("🧩 Goal-Creation Breakdown", className="mt-5", style={"color": "#1D3557"}),
+        dcc.Graph(figure=gca_fig, style={"height": "650px", "width": "100%"})
     ])
 
-import glob
-import os
+def build_defensive_section(season):
+    figures = cached_figures(
+        "serie_a", season, "defensive", [team_stats_path(season), league_stats_path(season)],
+        lambda: create_defensive_figures(load_team_stats(season), season)
+    )
+    return defensive_stats_layout(*figures)
+
+def build_style_section(season):
+    wyscout_path = wyscout_path_for(season)
+    sources = sorted(glob.glob(os.path.join(wyscout_path, "*_wyscout.csv")))
+    if not sources:
+        return create_playing_styles_scatter(load_wyscout_playing_style_data(wyscout_path, season), season)
+
+    fig = cached_figures(
+        "serie_a", season, "style", sources,
+        lambda: create_playing_styles_figure(load_wyscout_playing_style_data(wyscout_path, season), season)
+    )
+    return dcc.Graph(figure=fig, style={"height": "700px"})
+
+# Sezione -> funzione che costruisce i grafici della sezione per una stagione
+STATS_SECTIONS = {
+    "offensive": build_offensive_section,
+    "defensive": build_defensive_section,
+    "style": build_style_section,
+}
+
+def get_stats_section(season, section):
+    """
+    Grafici di una sezione delle statistiche (offensive, defensive, style) per
+    una stagione, costruiti solo al click sulla sezione. Le figure vengono dalla
+    cache per (stagione, sezione, mtime dei file sorgente), vedi FigureCache.
+    """
+    return STATS_SECTIONS[section](season)
 
 import os
 import pandas as pd
@@ -796,35 +861,11 @@ def register_callbacks(app):
     def toggle_stat_sections(n_off, n_def, n_style, season):
         triggered = dash.callback_context.triggered[0]["prop_id"].split(".")[0] if dash.callback_context.triggered else None
         if triggered == "btn-offensive":
-            return [
-                html.Div([
-                    html.H4("📈 Offensive Radar", className="mt-4", style={"color": "#1D3557"}),
-                    radar_chart_component_global,
-                    html.H4("🎯 xG vs Goals", className="mt-5", style={"color": "#1D3557"}),
-                    scatter_component_global,
-                    html.H4("🧩 Goal-Creation Breakdown", className="mt-5", style={"color": "#1D3557"}),
-                    gca_stacked_component_global
-                ])
-            ], [], []
+            return [get_stats_section(season, "offensive")], [], []
         elif triggered == "btn-defensive":
-            return [], [defensive_stats_content_global], []
-
+            return [], [get_stats_section(season, "defensive")], []
         elif triggered == "btn-style":
-            season = dash.callback_context.inputs["season-selector.value"]
-            folder_map = {
-                "24-25": "data_serie_a_24-25",
-                "23-24": "data_serie_a_23-24",
-                "22-23": "data_serie_a_22-23",
-            }
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            wyscout_path = os.path.join(current_dir, "data_serie_a_" + season)
-
-             # season = "24-25", adatto come 'stagione'
-            playing_df = load_wyscout_playing_style_data(wyscout_path, season)
-            style_fig = create_playing_styles_scatter(playing_df, season)
-            print("🧪 CONTENUTO playing_df:")
-            print(playing_df.head())  # <<< AGGIUNGI QUESTA RIGA
-            return [], [], [style_fig]
+            return [], [], [get_stats_section(season, "style")]
 
         # <- assicurati che questo sia fuori da tutti gli if
         return [], [], []
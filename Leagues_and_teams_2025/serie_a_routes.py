@@ -1,6 +1,6 @@
 from dash import html
 from pages.serie_a_teams import get_team_layout, normalize_team_name, teams
-from fuzzywuzzy import fuzz
+from pages.name_resolver import NameResolver
 import os
 
 # Mapping dei nomi delle squadre e loro varianti
@@ -45,6 +45,10 @@ SPECIAL_CASES = {
     "hellas_verona": "Hellas_Verona"
 }
 
+# Fuzzy matching on the official names (ratio > 80); names come from the URL,
+# so they are only memoized in memory
+TEAM_RESOLVER = NameResolver(SERIE_A_TEAMS, scorers=('ratio',), min_score=81)
+
 def find_best_match(team_name):
     """Find the best matching team name using fuzzy matching"""
     if not team_name:
@@ -56,16 +60,7 @@ def find_best_match(team_name):
         return SPECIAL_CASES[team_lower]
         
     # Try fuzzy matching
-    best_ratio = 0
-    best_match = None
-    
-    for official_name in SERIE_A_TEAMS:
-        ratio = fuzz.ratio(team_lower, official_name.lower())
-        if ratio > best_ratio and ratio > 80:  # 80% threshold for matching
-            best_ratio = ratio
-            best_match = official_name
-            
-    return best_match
+    return TEAM_RESOLVER.resolve(team_lower)
 
 # Remove the old functions since we're using serie_a_teams.py now
 
@@ -1,12 +1,16 @@
-from dash import dcc, html, callback_context, ALL, no_update, State
+from dash import dcc, html, callback_context, ALL, MATCH, no_update, State
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
 import pandas as pd
 import plotly.graph_objects as go
 import os
 import dash
+import json
 import re
-from fuzzywuzzy import fuzz  # invece di thefuzz
+import threading
+from pages.csv_cache import read_csv_cached, CACHE_DIR_NAME
+from pages.figure_cache import source_signature
+from pages.name_resolver import NameResolver
 
 # Comprehensive team mapping - all variants point to the same canonical name
 TEAM_VARIANTS = {
@@ -146,6 +150,17 @@ def normalize_team_name(name):
     name = " ".join(name.split())
     return name
 
+_team_resolvers = {}
+
+def _team_resolver(possible_names, threshold):
+    """Resolver (ratio, partial_ratio, token_sort_ratio) per lista di nomi e soglia, creato una volta sola"""
+    key = (tuple(normalize_team_name(n) for n in possible_names), threshold)
+    if key not in _team_resolvers:
+        _team_resolvers[key] = NameResolver(key[0], scorers=('ratio', 'partial_ratio', 'token_sort_ratio'),
+                                            min_score=threshold,
+                                            memo_dir=os.path.join(BASE_PATH, CACHE_DIR_NAME))
+    return _team_resolvers[key]
+
 def find_matching_team_name(name, possible_names, threshold=85):
     """
     Trova il nome della squadra più simile tra quelli possibili usando fuzzy matching.
@@ -168,24 +183,7 @@ def find_matching_team_name(name, possible_names, threshold=85):
         return TEAM_NAME_MAPPING[name]
     
     # Poi cerca la corrispondenza più simile
-    best_match = None
-    best_ratio = 0
-    
-    for possible_name in possible_names:
-        possible_name = normalize_team_name(possible_name)
-        
-        # Prova diverse varianti di matching fuzzy
-        ratios = [
-            fuzz.ratio(name.lower(), possible_name.lower()),
-            fuzz.partial_ratio(name.lower(), possible_name.lower()),
-            fuzz.token_sort_ratio(name.lower(), possible_name.lower())
-        ]
-        
-        max_ratio = max(ratios)
-        if max_ratio > best_ratio and max_ratio >= threshold:
-            best_ratio = max_ratio
-            best_match = possible_name
-    
+    best_match = _team_resolver(possible_names, threshold).resolve(name)
     return best_match if best_match else name
 
 def get_file_name_for_team(team_name, file_type):
@@ -232,109 +230,173 @@ def get_file_name_for_team(team_name, file_type):
     mapping = file_mappings.get(file_type, {})
     return mapping.get(canonical_name, canonical_name)
 
-def get_team_info(team_name, display_name):
-    """Get basic team information from various data sources for any Serie A team"""
-    season = "24-25"  # Hardcoded season
-    
-    # Read classification data
-    clasificacion_df = pd.read_csv(f"pages/data_serie_a_{season}/clasificacion.csv")
-    
-    # Find team position
-    team_position = None
-    for idx, row in clasificacion_df.iterrows():
-        if row["Equipo"] == display_name:
-            team_position = idx + 1  # +1 because position starts from 1
-            break
-    
-    if team_position is None:
-        team_position = 0  # Default if not found
-    
-    # Get the correct file name for this team
-    file_team_name = display_name
-    if display_name == "Inter":
-        file_team_name = "Internazionale"
-    elif display_name == "Hellas Verona":
-        file_team_name = "Hellas_Verona"
-    
-    # Read market value and age data from Serie A_transfermarkt.csv
-    transfermarkt_df = pd.read_csv(f"pages/data_serie_a_{season}/Serie A_transfermarkt.csv")
-    
-    # Find the team in transfermarkt data
-    market_value = 0.0
-    avg_age = 0.0
-    
-    for _, row in transfermarkt_df.iterrows():
-        if (display_name.lower() in row['nombre'].lower() or 
-            row['nombre'].lower() in display_name.lower() or
-            (display_name == "Inter" and "inter" in row['nombre'].lower()) or
-            (display_name == "Hellas Verona" and "hellas" in row['nombre'].lower()) or
-            (display_name == "Atalanta" and "atalanta" in row['nombre'].lower()) or
-            (display_name == "Milan" and "milan" in row['nombre'].lower() and "inter" not in row['nombre'].lower())):
-            
-            # Extract market value (remove '€' and 'm' and convert to float)
-            market_value_str = row['valor_total'].replace('€', '').replace('m', '')
-            market_value = float(market_value_str)
-            
-            # Get average age from extranjeros column  
-            avg_age = float(row['extranjeros'])
-            break
-    
-    # Calculate total salary
-    total_salary = 0
-    
-    # Read salary data from Capology file
-    salary_file = f"pages/Salari_Capology/Serie_A/{file_team_name}/Tabla_Limpia_{file_team_name}.csv"
-    if os.path.exists(salary_file):
-        try:
-            salary_df = pd.read_csv(salary_file)
-            if "Bruto Anual" in salary_df.columns:
-                # Clean and sum salary data
-                for salary_str in salary_df["Bruto Anual"].dropna():
-                    if isinstance(salary_str, str) and "€" in salary_str:
-                        # Remove €, spaces, and commas, then convert to float
-                        clean_salary = salary_str.replace("€", "").replace(" ", "").replace(",", "")
-                        try:
-                            total_salary += float(clean_salary)
-                        except:
-                            continue
-        except Exception as e:
-            print(f"Error reading salary file for {display_name}: {e}")
-            total_salary = 0
+# Bundle per squadra (posizione, valore di mercato, età, salari, modulo, V/N/P, gol)
+TEAM_BUNDLE_FILE = "team_bundles.json"
 
-    # Read formation data
+_team_bundles = {}
+_team_bundles_lock = threading.Lock()
+
+def get_file_team_name(display_name):
+    """File name used for a team in the Wyscout and Capology folders"""
+    if display_name == "Inter":
+        return "Internazionale"
+    if display_name == "Hellas Verona":
+        return "Hellas_Verona"
+    return display_name
+
+def team_bundle_sources(season, team_names=None):
+    """Files a season's team bundles are built from"""
+    sources = [
+        f"pages/data_serie_a_{season}/clasificacion.csv",
+        f"pages/data_serie_a_{season}/Serie A_transfermarkt.csv"
+    ]
+    for display_name in team_names or teams:
+        file_team_name = get_file_team_name(display_name)
+        sources.append(f"pages/Salari_Capology/Serie_A/{file_team_name}/Tabla_Limpia_{file_team_name}.csv")
+        sources.append(f"pages/data_serie_a_{season}/{file_team_name}_wyscout.csv")
+    return sources
+
+def _matches_transfermarkt_team(display_name, nombre):
+    nombre = nombre.lower()
+    return (display_name.lower() in nombre or
+            nombre in display_name.lower() or
+            (display_name == "Inter" and "inter" in nombre) or
+            (display_name == "Hellas Verona" and "hellas" in nombre) or
+            (display_name == "Atalanta" and "atalanta" in nombre) or
+            (display_name == "Milan" and "milan" in nombre and "inter" not in nombre))
+
+def _total_salary(salary_file, display_name):
+    """Sum of the 'Bruto Anual' salaries (values like '€1,500,000') of a Capology file"""
+    if not os.path.exists(salary_file):
+        return 0
+    try:
+        salary_df = read_csv_cached(salary_file)
+    except Exception as e:
+        print(f"Error reading salary file for {display_name}: {e}")
+        return 0
+    if "Bruto Anual" not in salary_df.columns:
+        return 0
+    salaries = salary_df["Bruto Anual"].dropna()
+    salaries = salaries[salaries.map(lambda value: isinstance(value, str))].astype(str)
+    salaries = salaries[salaries.str.contains("€", regex=False)]
+    clean = salaries.str.replace("€", "", regex=False).str.replace(" ", "", regex=False).str.replace(",", "", regex=False)
+    return float(pd.to_numeric(clean, errors="coerce").sum())
+
+def _most_used_formation(wyscout_file, display_name):
     most_used_formation = "4-3-3"  # Default
-    wyscout_file = f"pages/data_serie_a_{season}/{file_team_name}_wyscout.csv"
     if os.path.exists(wyscout_file):
         try:
-            wyscout_df = pd.read_csv(wyscout_file, sep=";")
+            wyscout_df = read_csv_cached(wyscout_file, sep=";")
             if not wyscout_df.empty and "Seleccionar esquema" in wyscout_df.columns:
                 formations = wyscout_df["Seleccionar esquema"].dropna()
                 if not formations.empty:
                     most_used_formation = formations.mode()[0] if len(formations.mode()) > 0 else formations.iloc[0]
         except Exception as e:
             print(f"Error reading wyscout file for {display_name}: {e}")
-    
-    return {
-        "position": team_position,
-        "market_value": market_value,
-        "total_salary": round(total_salary / 1_000_000, 2),  # Convert to millions
-        "avg_age": avg_age,
-        "formation": most_used_formation.split()[0] if ' ' in most_used_formation else most_used_formation
-    }
+    return most_used_formation.split()[0] if ' ' in most_used_formation else most_used_formation
+
+def build_team_bundle(display_name, season, clasificacion_df, transfermarkt_df):
+    """Position, market value, age, total salary, formation, W/D/L and goals of one team"""
+    file_team_name = get_file_team_name(display_name)
+
+    # Position and results from the classification (first row of the team)
+    team_rows = clasificacion_df[clasificacion_df["Equipo"] == display_name]
+    bundle = {"position": int(team_rows.index[0]) + 1 if not team_rows.empty else 0}
+    if not team_rows.empty:
+        team_stats = team_rows.iloc[0]
+        bundle.update({
+            "wins": int(team_stats["PG"]),  # Partite Vinte
+            "draws": int(team_stats["PE"]),  # Pareggi
+            "losses": int(team_stats["PP"]), # Sconfitte
+            "goals_for": int(team_stats["GF"]),  # Gol Fatti
+            "goals_against": int(team_stats["GC"])  # Gol Subiti
+        })
+
+    # Market value and average age from the first matching Transfermarkt row
+    bundle["market_value"] = 0.0
+    bundle["avg_age"] = 0.0
+    for nombre, valor_total, extranjeros in zip(transfermarkt_df['nombre'], transfermarkt_df['valor_total'],
+                                                transfermarkt_df['extranjeros']):
+        if _matches_transfermarkt_team(display_name, nombre):
+            bundle["market_value"] = float(valor_total.replace('€', '').replace('m', ''))
+            bundle["avg_age"] = float(extranjeros)
+            break
+
+    salary_file = f"pages/Salari_Capology/Serie_A/{file_team_name}/Tabla_Limpia_{file_team_name}.csv"
+    bundle["total_salary"] = round(_total_salary(salary_file, display_name) / 1_000_000, 2)  # Convert to millions
+    bundle["formation"] = _most_used_formation(f"pages/data_serie_a_{season}/{file_team_name}_wyscout.csv", display_name)
+    return bundle
+
+def build_team_bundles(season="24-25", team_names=None):
+    """
+    Build the bundles of a season's teams from the classification, Transfermarkt,
+    Capology and Wyscout files and save them, with the signature of those files,
+    in the cache folder of the season. Returns {team: bundle}.
+    """
+    team_names = list(team_names or teams)
+    sources = team_bundle_sources(season, team_names)
+    signature = source_signature(sources)
+    clasificacion_df = read_csv_cached(sources[0])
+    transfermarkt_df = read_csv_cached(sources[1])
+    bundles = {name: build_team_bundle(name, season, clasificacion_df, transfermarkt_df) for name in team_names}
+
+    bundle_path = os.path.join(os.path.dirname(sources[0]), CACHE_DIR_NAME, TEAM_BUNDLE_FILE)
+    try:
+        os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+        tmp_path = f"{bundle_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"source": signature, "teams": bundles}, f, ensure_ascii=False)
+        os.replace(tmp_path, bundle_path)
+    except OSError as e:
+        print(f"Not saving team bundles for {season}: {e}")
+
+    with _team_bundles_lock:
+        _team_bundles[season] = (signature, bundles)
+    return bundles
+
+def load_team_bundles(season="24-25"):
+    """
+    Bundles of a season's teams: from memory, then from the saved file, rebuilt
+    only when one of the source files changed.
+    """
+    sources = team_bundle_sources(season)
+    signature = source_signature(sources)
+    cached = _team_bundles.get(season)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    bundle_path = os.path.join(os.path.dirname(sources[0]), CACHE_DIR_NAME, TEAM_BUNDLE_FILE)
+    try:
+        with open(bundle_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if data.get("source") == [list(entry) for entry in signature]:
+        with _team_bundles_lock:
+            _team_bundles[season] = (signature, data["teams"])
+        return data["teams"]
+    return build_team_bundles(season)
+
+def get_team_bundle(display_name, season="24-25"):
+    """Bundle of a team (teams outside the list are built on demand)"""
+    bundle = load_team_bundles(season).get(display_name)
+    if bundle is None:
+        bundle = build_team_bundle(
+            display_name, season,
+            read_csv_cached(f"pages/data_serie_a_{season}/clasificacion.csv"),
+            read_csv_cached(f"pages/data_serie_a_{season}/Serie A_transfermarkt.csv")
+        )
+    return bundle
+
+def get_team_info(team_name, display_name):
+    """Get basic team information from various data sources for any Serie A team"""
+    bundle = get_team_bundle(display_name, "24-25")  # Hardcoded season
+    return {key: bundle[key] for key in ("position", "market_value", "total_salary", "avg_age", "formation")}
 
 def get_team_stats(display_name):
     """Get team statistics from the classification data for any Serie A team"""
-    season = "24-25"
-    clasificacion_df = pd.read_csv(f"pages/data_serie_a_{season}/clasificacion.csv")
-    team_stats = clasificacion_df[clasificacion_df["Equipo"] == display_name].iloc[0]
-    
-    return {
-        "wins": int(team_stats["PG"]),  # Partite Vinte
-        "draws": int(team_stats["PE"]),  # Pareggi
-        "losses": int(team_stats["PP"]), # Sconfitte
-        "goals_for": int(team_stats["GF"]),  # Gol Fatti
-        "goals_against": int(team_stats["GC"])  # Gol Subiti
-    }
+    bundle = get_team_bundle(display_name, "24-25")
+    return {key: bundle[key] for key in ("wins", "draws", "losses", "goals_for", "goals_against")}
 
 def create_wdl_chart(wins, draws, losses):
     """Create a donut chart for Wins/Draws/Losses"""
@@ -482,7 +544,7 @@ def create_team_layout(team_name):
     
     return html.Div([
         # Add this at the top of the layout
-        dcc.Store(id=f'player-styles-{display_name}', data={
+        dcc.Store(id={'type': 'team-player-styles', 'team': display_name}, data={
             'player-marker:hover': {
                 'transform': 'scale(1.1)',
                 'z-index': '1000'
@@ -493,7 +555,7 @@ def create_team_layout(team_name):
         }),
         
         # Hidden div for triggering callbacks
-        html.Div(id=f"trigger-update-{display_name}", children="initial", style={"display": "none"}),
+        html.Div(id={'type': 'team-trigger', 'team': display_name}, children="initial", style={"display": "none"}),
         
         # Header bar
         html.Div(
@@ -540,7 +602,7 @@ def create_team_layout(team_name):
                                     dbc.Card([
                                         html.H6("Position", className="text-muted mb-1", 
                                                style={"fontSize": "0.8rem"}),
-                                        html.H3(id=f"team-position-{display_name}", className="mb-0",
+                                        html.H3(id={'type': 'team-info', 'field': 'position', 'team': display_name}, className="mb-0",
                                                style={"fontSize": "1.2rem"})
                                     ], body=True, className="text-center h-100 shadow-sm py-2"),
                                     width=12,
@@ -552,7 +614,7 @@ def create_team_layout(team_name):
                                     dbc.Card([
                                         html.H6("Market Value", className="text-muted mb-1",
                                                style={"fontSize": "0.8rem"}),
-                                        html.H3(id=f"market-value-{display_name}", className="mb-0",
+                                        html.H3(id={'type': 'team-info', 'field': 'market-value', 'team': display_name}, className="mb-0",
                                                style={"fontSize": "1.2rem"})
                                     ], body=True, className="text-center h-100 shadow-sm py-2"),
                                     width=12,
@@ -564,7 +626,7 @@ def create_team_layout(team_name):
                                     dbc.Card([
                                         html.H6("Avg Age", className="text-muted mb-1",
                                                style={"fontSize": "0.8rem"}),
-                                        html.H3(id=f"avg-age-{display_name}", className="mb-0",
+                                        html.H3(id={'type': 'team-info', 'field': 'avg-age', 'team': display_name}, className="mb-0",
                                                style={"fontSize": "1.2rem"})
                                     ], body=True, className="text-center h-100 shadow-sm py-2"),
                                     width=12,
@@ -578,7 +640,7 @@ def create_team_layout(team_name):
                                     dbc.Card([
                                         html.H6("Formation", className="text-muted mb-1",
                                                style={"fontSize": "0.8rem"}),
-                                        html.H3(id=f"formation-{display_name}", className="mb-0",
+                                        html.H3(id={'type': 'team-info', 'field': 'formation', 'team': display_name}, className="mb-0",
                                                style={"fontSize": "1.2rem"})
                                     ], body=True, className="text-center h-100 shadow-sm py-2"),
                                     width=12,
@@ -590,7 +652,7 @@ def create_team_layout(team_name):
                                     dbc.Card([
                                         html.H6("Total Salary", className="text-muted mb-1",
                                                style={"fontSize": "0.8rem"}),
-                                        html.H3(id=f"total-salary-{display_name}", className="mb-0",
+                                        html.H3(id={'type': 'team-info', 'field': 'total-salary', 'team': display_name}, className="mb-0",
                                                style={"fontSize": "1.2rem"})
                                     ], body=True, className="text-center h-100 shadow-sm py-2"),
                                     width=12,
@@ -611,7 +673,7 @@ def create_team_layout(team_name):
                         dbc.CardHeader("Wins / Draws / Losses", className="text-center"),
                         dbc.CardBody(
                             dcc.Graph(
-                                id=f'wdl-chart-{display_name}',
+                                id={'type': 'team-chart', 'chart': 'wdl', 'team': display_name},
                                 config={'displayModeBar': False}
                             )
                         )
@@ -626,7 +688,7 @@ def create_team_layout(team_name):
                         dbc.CardHeader("Goal Difference", className="text-center"),
                         dbc.CardBody(
                             dcc.Graph(
-                                id=f'goals-chart-{display_name}',
+                                id={'type': 'team-chart', 'chart': 'goals', 'team': display_name},
                                 config={'displayModeBar': False}
                             )
                         )
@@ -646,25 +708,25 @@ def create_team_layout(team_name):
                     # Goalkeepers
                     html.Div([
                         html.H4("Goalkeepers", className="mb-3"),
-                        html.Div(id=f"goalkeeper-buttons-{display_name}", className="d-flex flex-wrap gap-2")
+                        html.Div(id={'type': 'team-squad', 'group': 'goalkeeper', 'team': display_name}, className="d-flex flex-wrap gap-2")
                     ], className="mb-4"),
                     
                     # Defenders
                     html.Div([
                         html.H4("Defenders", className="mb-3"),
-                        html.Div(id=f"defender-buttons-{display_name}", className="d-flex flex-wrap gap-2")
+                        html.Div(id={'type': 'team-squad', 'group': 'defender', 'team': display_name}, className="d-flex flex-wrap gap-2")
                     ], className="mb-4"),
                     
                     # Midfielders
                     html.Div([
                         html.H4("Midfielders", className="mb-3"),
-                        html.Div(id=f"midfielder-buttons-{display_name}", className="d-flex flex-wrap gap-2")
+                        html.Div(id={'type': 'team-squad', 'group': 'midfielder', 'team': display_name}, className="d-flex flex-wrap gap-2")
                     ], className="mb-4"),
                     
                     # Attackers
                     html.Div([
                         html.H4("Attackers", className="mb-3"),
-                        html.Div(id=f"attacker-buttons-{display_name}", className="d-flex flex-wrap gap-2")
+                        html.Div(id={'type': 'team-squad', 'group': 'attacker', 'team': display_name}, className="d-flex flex-wrap gap-2")
                     ])
                 ])
             ], className="shadow-sm mb-4"),
@@ -690,35 +752,39 @@ def create_team_layout(team_name):
                                 active_label_style={'color': '#1D3557'}
                             ),
                         ],
-                        id=f"analysis-tabs-{display_name}",
+                        id={'type': 'team-analysis-tabs', 'team': display_name},
                         active_tab="tab-offensive",
                     )
                 ),
                 dbc.CardBody(
-                    html.Div(id=f"analysis-content-{display_name}")
+                    html.Div(id={'type': 'team-analysis-content', 'team': display_name})
                 )
             ], className="shadow-sm mb-4")
         ], fluid=True)
     ], className="bg-light min-vh-100")
 
-def register_team_callbacks(app, team_name):
-    """Register callbacks for a specific team"""
-    
-    # Use normalized team name for consistency between layout and callbacks
-    display_name = normalize_team_variants(team_name)
-    
+def register_team_callbacks(app):
+    """
+    Register the team page callbacks once for every team: component ids are
+    pattern-matching dicts keyed by team (see create_team_layout), so the
+    callback map does not grow with the number of teams.
+    """
+    trigger = {'type': 'team-trigger', 'team': MATCH}
+
     @app.callback(
         [
-            Output(f"team-position-{display_name}", "children"),
-            Output(f"market-value-{display_name}", "children"),
-            Output(f"avg-age-{display_name}", "children"),
-            Output(f"formation-{display_name}", "children"),
-            Output(f"total-salary-{display_name}", "children")
+            Output({'type': 'team-info', 'field': 'position', 'team': MATCH}, "children"),
+            Output({'type': 'team-info', 'field': 'market-value', 'team': MATCH}, "children"),
+            Output({'type': 'team-info', 'field': 'avg-age', 'team': MATCH}, "children"),
+            Output({'type': 'team-info', 'field': 'formation', 'team': MATCH}, "children"),
+            Output({'type': 'team-info', 'field': 'total-salary', 'team': MATCH}, "children")
         ],
-        Input(f"trigger-update-{display_name}", "children")
+        Input(trigger, "children"),
+        State(trigger, "id")
     )
-    def update_team_info(_):
-        info = get_team_info(team_name, display_name)
+    def update_team_info(_, trigger_id):
+        display_name = trigger_id['team']
+        info = get_team_info(display_name, display_name)
         return [
             f"#{info['position']}",
             f"€{info['market_value']:.1f}M",
@@ -728,26 +794,31 @@ def register_team_callbacks(app, team_name):
         ]
 
     @app.callback(
-        [Output(f"wdl-chart-{display_name}", "figure"),
-         Output(f"goals-chart-{display_name}", "figure")],
-        Input(f"trigger-update-{display_name}", "children")
+        [
+            Output({'type': 'team-chart', 'chart': 'wdl', 'team': MATCH}, "figure"),
+            Output({'type': 'team-chart', 'chart': 'goals', 'team': MATCH}, "figure")
+        ],
+        Input(trigger, "children"),
+        State(trigger, "id")
     )
-    def update_charts(_):
-        stats = get_team_stats(display_name)
+    def update_charts(_, trigger_id):
+        stats = get_team_stats(trigger_id['team'])
         wdl_fig = create_wdl_chart(stats["wins"], stats["draws"], stats["losses"])
         goals_fig = create_goals_chart(stats["goals_for"], stats["goals_against"])
         return wdl_fig, goals_fig
 
     @app.callback(
         [
-            Output(f"goalkeeper-buttons-{display_name}", "children"),
-            Output(f"defender-buttons-{display_name}", "children"),
-            Output(f"midfielder-buttons-{display_name}", "children"),
-            Output(f"attacker-buttons-{display_name}", "children")
+            Output({'type': 'team-squad', 'group': 'goalkeeper', 'team': MATCH}, "children"),
+            Output({'type': 'team-squad', 'group': 'defender', 'team': MATCH}, "children"),
+            Output({'type': 'team-squad', 'group': 'midfielder', 'team': MATCH}, "children"),
+            Output({'type': 'team-squad', 'group': 'attacker', 'team': MATCH}, "children")
         ],
-        Input(f"trigger-update-{display_name}", "children")
+        Input(trigger, "children"),
+        State(trigger, "id")
     )
-    def update_player_buttons(_):
+    def update_player_buttons(_, trigger_id):
+        display_name = trigger_id['team']
         # Get the correct file name
         file_name = display_name
         if display_name == "Inter":
@@ -756,7 +827,7 @@ def register_team_callbacks(app, team_name):
             file_name = "Hellas_Verona"
         
         # Read player data
-        df = pd.read_csv(f"pages/data_serie_a_24-25/{file_name}.csv")
+        df = read_csv_cached(f"pages/data_serie_a_24-25/{file_name}.csv")
         
         # Extract primary position for each player
         df['primary_pos'] = df['Posc'].str.split(',').str[0]
@@ -770,10 +841,12 @@ def register_team_callbacks(app, team_name):
         return goalkeepers, defenders, midfielders, attackers
 
     @app.callback(
-        Output(f"analysis-content-{display_name}", "children"),
-        Input(f"analysis-tabs-{display_name}", "active_tab")
+        Output({'type': 'team-analysis-content', 'team': MATCH}, "children"),
+        Input({'type': 'team-analysis-tabs', 'team': MATCH}, "active_tab"),
+        State({'type': 'team-analysis-tabs', 'team': MATCH}, "id")
     )
-    def update_analysis_content(active_tab):
+    def update_analysis_content(active_tab, tabs_id):
+        display_name = tabs_id['team']
         if active_tab == "tab-offensive":
             return create_offensive_analysis(display_name)
         elif active_tab == "tab-defensive":
@@ -814,7 +887,7 @@ def draw_formation(team_name, formation="4-2-3-1", players=None):
     # Try to get actual player data
     if os.path.exists(team_file):
         try:
-            df = pd.read_csv(team_file)
+            df = read_csv_cached(team_file)
             # Convert minutes to numeric
             if 'Mín' in df.columns:
                 df['minutes'] = pd.to_numeric(df['Mín'].str.replace(',', ''), errors='coerce')
@@ -969,7 +1042,7 @@ def create_offensive_analysis(display_name):
             file_team_name = "Hellas_Verona"
         
         # Load Serie A data for build-up analysis
-        df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+        df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
         
         # Build-up metrics and their max reference values
         metrics = {
@@ -1036,7 +1109,7 @@ def create_offensive_analysis(display_name):
         if not os.path.exists(wyscout_file):
             return html.Div(f"Wyscout data not available for {display_name}")
             
-        df_wyscout = pd.read_csv(wyscout_file, sep=';')
+        df_wyscout = read_csv_cached(wyscout_file, sep=';')
         
         # Filter only team data
         df_wyscout = df_wyscout[df_wyscout['Equipo'] == display_name]
@@ -1365,10 +1438,10 @@ def create_defensive_analysis(display_name):
         if not os.path.exists(wyscout_file):
             return html.Div(f"Wyscout data not available for {display_name}")
             
-        df_wyscout = pd.read_csv(wyscout_file, sep=';')
+        df_wyscout = read_csv_cached(wyscout_file, sep=';')
         
         # Load Serie A data for defensive quality analysis
-        df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+        df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
         
         defensive_style_analysis = create_defensive_style_analysis_dynamic(df_wyscout, display_name)
         defensive_quality_analysis = create_defensive_quality_analysis_dynamic(df_serie_a, display_name)
@@ -1406,13 +1479,13 @@ def create_set_pieces_analysis(display_name):
             file_team_name = "Hellas_Verona"
         
         # Load data
-        df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+        df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
         
         wyscout_file = f"pages/data_serie_a_24-25/{file_team_name}_wyscout.csv"
         if not os.path.exists(wyscout_file):
             return html.Div(f"Wyscout data not available for {display_name}")
             
-        df_wyscout = pd.read_csv(wyscout_file, sep=";")
+        df_wyscout = read_csv_cached(wyscout_file, sep=";")
         
         # Calculate set piece metrics for Serie A data
         def calculate_set_piece_metrics(df):
@@ -1736,7 +1809,7 @@ def create_defensive_quality_analysis_dynamic(df_serie_a, team_name):
         comparison_label = "Serie A"
     
     # Load classification data
-    clasificacion = pd.read_csv("pages/data_serie_a_24-25/clasificacion.csv")
+    clasificacion = read_csv_cached("pages/data_serie_a_24-25/clasificacion.csv")
     
     if comparison_teams:
         target_df = clasificacion[clasificacion['Equipo'].isin(comparison_teams)].copy()
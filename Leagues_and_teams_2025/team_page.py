@@ -6,16 +6,17 @@ import plotly.graph_objects as go
 import os
 import dash
 import re
+from pages.csv_cache import read_csv_cached
 
 def get_team_info():
     """Get basic team information from various data sources"""
     season = "24-25"  # Hardcoded season
     # Read classification data
-    clasificacion_df = pd.read_csv(f"pages/data_serie_a_{season}/clasificacion.csv")
+    clasificacion_df = read_csv_cached(f"pages/data_serie_a_{season}/clasificacion.csv")
     juve_position = clasificacion_df[clasificacion_df["Equipo"] == "Juventus"].index[0] + 1
     
     # Read market value and age data
-    juve_df = pd.read_csv(f"pages/data_serie_a_{season}/Juventus FC.csv")
+    juve_df = read_csv_cached(f"pages/data_serie_a_{season}/Juventus FC.csv")
     
     # Calculate average age from Date of Birth/Age column
     ages = juve_df["Date of Birth/Age"].str.extract(r"\((\d+)\)").astype(float)
@@ -32,7 +33,7 @@ def get_team_info():
     salary_file = "pages/Salari_Capology/Serie_A/Juventus/Tabla_Limpia_Juventus.csv"
     if os.path.exists(salary_file):
         try:
-            salary_df = pd.read_csv(salary_file)
+            salary_df = read_csv_cached(salary_file)
             if "Bruto Anual" in salary_df.columns:
                 # Clean and sum salary data
                 for salary_str in salary_df["Bruto Anual"].dropna():
@@ -69,7 +70,7 @@ def get_team_info():
     # Old player folder processing removed - now using Capology file only
 
     # Read formation data
-    wyscout_df = pd.read_csv(f"pages/data_serie_a_{season}/Juventus_wyscout.csv", sep=";")
+    wyscout_df = read_csv_cached(f"pages/data_serie_a_{season}/Juventus_wyscout.csv", sep=";")
     most_used_formation = wyscout_df["Seleccionar esquema"].mode()[0]
     
     return {
@@ -697,7 +698,7 @@ def create_goals_chart(goals_for, goals_against):
 def get_team_stats():
     """Get team statistics from the classification data"""
     season = "24-25"
-    clasificacion_df = pd.read_csv(f"pages/data_serie_a_{season}/clasificacion.csv")
+    clasificacion_df = read_csv_cached(f"pages/data_serie_a_{season}/clasificacion.csv")
     juve_stats = clasificacion_df[clasificacion_df["Equipo"] == "Juventus"].iloc[0]
     
     return {
@@ -828,7 +829,7 @@ def register_team_callbacks(app):
     )
     def update_player_buttons(_):
         # Read player data
-        df = pd.read_csv("pages/data_serie_a_24-25/Juventus.csv")
+        df = read_csv_cached("pages/data_serie_a_24-25/Juventus.csv")
         
         # Extract primary position for each player
         df['primary_pos'] = df['Posc'].str.split(',').str[0]
@@ -848,7 +849,7 @@ def register_team_callbacks(app):
     def render_tab_content(active_tab):
         if active_tab == "tab-offensive":
             # Load Serie A data for build-up analysis
-            df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+            df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
             
             # Calculate average of top 4 teams
             top_4_teams = ['Napoli', 'Inter', 'Atalanta', 'Juventus']
@@ -910,7 +911,7 @@ def register_team_callbacks(app):
             )
 
             # Load Wyscout data for detailed attacking analysis
-            df_wyscout = pd.read_csv("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=';')
+            df_wyscout = read_csv_cached("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=';')
             
             # Filter only Juventus data
             df_wyscout = df_wyscout[df_wyscout['Equipo'] == 'Juventus']
@@ -1214,10 +1215,10 @@ def register_team_callbacks(app):
             
         elif active_tab == "tab-defensive":
             # Load Wyscout data
-            df_wyscout = pd.read_csv("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=';')
+            df_wyscout = read_csv_cached("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=';')
             
             # Load Serie A data for defensive quality analysis
-            df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+            df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
             
             defensive_style_analysis = create_defensive_style_analysis(df_wyscout)
             defensive_quality_analysis = create_defensive_quality_analysis(df_serie_a)
@@ -1231,8 +1232,8 @@ def register_team_callbacks(app):
             
         elif active_tab == "tab-set-pieces":
             # Load data
-            df_serie_a = pd.read_csv("pages/data_serie_a_24-25/Serie_A_24-25.csv")
-            df_wyscout = pd.read_csv("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=";")
+            df_serie_a = read_csv_cached("pages/data_serie_a_24-25/Serie_A_24-25.csv")
+            df_wyscout = read_csv_cached("pages/data_serie_a_24-25/Juventus_wyscout.csv", sep=";")
             
             # Define top 4 teams
             top_4_teams = ['Napoli', 'Inter', 'Atalanta', 'Juventus']
@@ -1382,7 +1383,7 @@ def register_team_callbacks(app):
         """Update the formation display with player markers"""
         try:
             # Read player data
-            df = pd.read_csv("pages/data_serie_a_24-25/Juventus.csv")
+            df = read_csv_cached("pages/data_serie_a_24-25/Juventus.csv")
             
             # Convert minutes to numeric, removing any commas
             df['minutes'] = pd.to_numeric(df['Mín'].str.replace(',', ''), errors='coerce')
@@ -1611,7 +1612,7 @@ def create_defensive_style_analysis(df_wyscout):
 
 def create_defensive_quality_analysis(df_serie_a):
     # Carica i dati dalla classificazione
-    clasificacion = pd.read_csv("pages/data_serie_a_24-25/clasificacion.csv")
+    clasificacion = read_csv_cached("pages/data_serie_a_24-25/clasificacion.csv")
     
     # Filtra solo le top 4 squadre
     top_4_teams = ['Napoli', 'Inter', 'Atalanta', 'Juventus']
@@ -0,0 +1,71 @@
+import pandas as pd
+import numpy as np
+import os
+
+from pages.Scout_Analysis.kpi_matrix import (
+    ROLE_FILE_KEYS, RoleKpiMatrix, role_file_path, percentile_table_path,
+    league_column, rank_percentiles, save_percentile_sources
+)
+from pages.Scout_Analysis.profile_weights import load_profile_kpis
+
+
+def load_role_kpis():
+    """
+    Restituisce ruolo -> lista dei KPI (con e senza palla) di tutti i profili del
+    ruolo, come elencati nel CSV dei profili (gli stessi del radar di confronto)
+    """
+    return {role: list(dict.fromkeys(kpi for kpis in profiles.values() for kpi in kpis))
+            for role, profiles in load_profile_kpis().items()}
+
+
+def build_percentile_table(matrix, kpis):
+    """
+    Tabella con una riga per giocatore e squadra (prima occorrenza nel file di
+    rating): percentile di ogni KPI nel ruolo e nel ruolo + lega
+    """
+    table = pd.DataFrame({'Player': matrix.players, 'Team': matrix.teams, 'League': matrix.leagues})
+    leagues = matrix.leagues.fillna('').to_numpy()
+    league_groups = {league: np.flatnonzero(leagues == league) for league in pd.unique(leagues)}
+
+    columns = {}
+    for kpi in kpis:
+        values = matrix.values(kpi)
+        columns[kpi] = rank_percentiles(matrix.sorted_values(kpi), values)
+
+        league_pct = np.zeros(len(values))
+        for rows in league_groups.values():
+            league_values = values[rows]
+            league_pct[rows] = rank_percentiles(np.sort(league_values), league_values)
+        columns[league_column(kpi)] = league_pct
+
+    table = pd.concat([table, pd.DataFrame(columns, index=table.index)], axis=1)
+    return table.drop_duplicates(subset=['Player', 'Team'])
+
+
+def main():
+    role_kpis = load_role_kpis()
+
+    for role in ROLE_FILE_KEYS:
+        kpis = role_kpis.get(role)
+        if not kpis:
+            print(f"Nessun KPI definito per {role}")
+            continue
+
+        role_file = role_file_path(role)
+        if not os.path.exists(role_file):
+            print(f"File di rating non trovato: {role_file}")
+            continue
+
+        print(f"\nCalcolo percentili per {role} ({len(kpis)} KPI)...")
+        matrix = RoleKpiMatrix(role_file)
+        table = build_percentile_table(matrix, kpis)
+
+        output_file = percentile_table_path(role)
+        table.to_csv(output_file, index=False)
+        # Firme dei file sorgente: la tabella vale finché rating e file squadra non cambiano
+        save_percentile_sources(role, matrix)
+        print(f"Salvati {len(table)} giocatori in {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pages.Scout_Analysis.player_registry import PlayerRegistry
+from rating_engine import get_league_paths, read_csv_cached
+from rating_manifest import RatingManifest
+
+CAPOLOGY_PATH = Path('/Users/federico/dash_project/pages/Salari_Capology')
+
+# Colonne Transfermarkt e Capology aggiunte ai rating
+TRANSFERMARKT_COLUMNS = ['Name', 'Team', 'Age', 'Nationality', 'Height', 'Foot', 'Market Value',
+                         'Contract Until', 'Position']
+CAPOLOGY_COLUMNS = ['Jugador', 'Team', 'Bruto Anual', 'Cláusula De Rescisión']
+
+# Ruolo: file dei rating da arricchire, posizioni Transfermarkt, file di output,
+# colonna di ordinamento, profili mostrati nelle classifiche e se aggiungere la posizione
+EnrichConfig = namedtuple('EnrichConfig', [
+    'label', 'ratings_file', 'positions', 'output_file', 'sort_by', 'profiles', 'include_position'
+])
+
+ENRICH_CONFIGS = {
+    'striker': EnrichConfig(
+        label='attaccanti',
+        ratings_file='striker_ratings_complete.csv',
+        positions=['Centre-Forward', 'Second Striker'],
+        output_file='striker_ratings_complete_en.csv',
+        sort_by='Falso_Nueve',
+        profiles=['Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker'],
+        include_position=True
+    ),
+    'winger': EnrichConfig(
+        label='winger',
+        ratings_file='winger_ratings.csv',
+        positions=['Left Winger', 'Right Winger', 'Left Midfield', 'Right Midfield'],
+        output_file='winger_ratings_complete_en.csv',
+        sort_by='Key_Passer',
+        profiles=['Key_Passer', 'Creative_Winger'],
+        include_position=True
+    ),
+    'attacking_midfielder': EnrichConfig(
+        label='attacking midfielder/central midfielder',
+        ratings_file='attacking_midfielder_ratings.csv',
+        positions=['Attacking Midfield', 'Central Midfield'],
+        output_file='attacking_midfielder_ratings_complete_en.csv',
+        sort_by='Diez',
+        profiles=['Diez', 'Space_Invader'],
+        include_position=True
+    ),
+    'midfielder': EnrichConfig(
+        label='centrocampisti',
+        ratings_file='midfielder_ratings.csv',
+        positions=['Central Midfield', 'Defensive Midfield', 'Attacking Midfield',
+                   'Left Midfield', 'Right Midfield', 'Midfield'],
+        output_file='midfielder_ratings_complete_en.csv',
+        sort_by='Pivot_Master',
+        profiles=['Pivot_Master', 'Maestro', 'Box_to_Box'],
+        include_position=True
+    ),
+    'fullback': EnrichConfig(
+        label='terzini',
+        ratings_file='fullback_ratings.csv',
+        positions=['Left-Back', 'Right-Back'],
+        output_file='fullback_ratings_complete_en.csv',
+        sort_by='Sentinel_Fullback',
+        profiles=['Sentinel_Fullback', 'Advanced_Wingback', 'Overlapping_Runner'],
+        include_position=True
+    ),
+    'centreback': EnrichConfig(
+        label='difensori centrali',
+        ratings_file='centreback_ratings.csv',
+        positions=['Centre-Back'],
+        output_file='centreback_ratings_complete_en.csv',
+        sort_by='Guardian',
+        profiles=['Guardian', 'Deep_Distributor', 'Enforcer'],
+        include_position=False
+    ),
+}
+
+
+def parse_money(series):
+    """
+    Importi monetari di una colonna in float ("€12.00m" -> 12000000, "1,500,000" -> 1500000);
+    valori mancanti o non numerici -> 0.0
+    """
+    text = series.astype('string').str.replace('€', '', regex=False).str.replace(',', '', regex=False)
+    text = text.str.strip().str.lower()
+    millions = text.str.contains('m', regex=False, na=False)
+    values = pd.to_numeric(text.str.replace('m', '', regex=False), errors='coerce').astype('float64')
+    values[millions] *= 1000000
+    return values.fillna(0.0)
+
+
+def extract_age(series):
+    """Età dalla colonna 'Date of Birth/Age' (il numero tra parentesi), NaN se assente"""
+    age = series.astype('string').str.extract(r'\((\d+)\)', expand=False)
+    return pd.to_numeric(age, errors='coerce').astype('float64')
+
+
+def format_currency(values, decimals=0):
+    """Formatta gli importi con il punto come separatore delle migliaia; '' per i valori mancanti"""
+    # Formattazione per riga voluta: il format spec in C è più veloce delle
+    # alternative "vettoriali" con gli accessor .str (che ciclano comunque in Python)
+    return values.map(lambda value: '' if pd.isna(value) else f"€{value:,.{decimals}f}".replace(',', '.'))
+
+
+def _read_transfermarkt(file):
+    try:
+        df = read_csv_cached(file)
+        df['Age'] = extract_age(df['Date of Birth/Age'])
+        df['Market Value'] = parse_money(df['Market Value'])
+        df['Team'] = file.stem.replace('_transfermarkt', '')
+        return df
+    except Exception as e:
+        print(f"Errore nel processare {file}: {str(e)}")
+        return None
+
+
+def _read_capology(file, team):
+    try:
+        df = read_csv_cached(file)[['Jugador', 'Bruto Anual', 'Cláusula De Rescisión']].copy()
+        df['Bruto Anual'] = parse_money(df['Bruto Anual'])
+        df['Cláusula De Rescisión'] = parse_money(df['Cláusula De Rescisión'])
+        df['Team'] = team
+        return df
+    except Exception as e:
+        print(f"Errore nel processare {file}: {str(e)}")
+        return None
+
+
+def get_capology_files(league_name):
+    """Coppie (file Capology, squadra) di una lega"""
+    league_path = CAPOLOGY_PATH / league_name
+    if not league_path.exists():
+        return []
+    files = []
+    for team_dir in league_path.iterdir():
+        capology_file = team_dir / f"Tabla_Limpia_{team_dir.name}.csv"
+        if team_dir.is_dir() and capology_file.exists():
+            files.append((capology_file, team_dir.name))
+    return files
+
+
+def load_player_info(league_paths=None, max_workers=None):
+    """
+    Carica una sola volta i dati Transfermarkt e Capology di tutte le leghe
+    (file letti in parallelo). Restituisce (transfermarkt_df, capology_df), None
+    per le fonti senza file validi.
+    """
+    league_paths = league_paths or get_league_paths()
+    transfermarkt_files = [file for league_path in league_paths.values()
+                           for file in sorted(league_path.glob('*_transfermarkt.csv'))]
+    capology_files = [pair for league_name in league_paths for pair in get_capology_files(league_name)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        transfermarkt = [df for df in executor.map(_read_transfermarkt, transfermarkt_files) if df is not None]
+        capology = [df for df in executor.map(lambda pair: _read_capology(*pair), capology_files) if df is not None]
+
+    transfermarkt_df = pd.concat(transfermarkt, ignore_index=True) if transfermarkt else None
+    capology_df = pd.concat(capology, ignore_index=True) if capology else None
+    print(f"Caricati {len(transfermarkt)} file Transfermarkt e {len(capology)} file Capology "
+          f"in {time.perf_counter() - start:.2f}s")
+    return transfermarkt_df, capology_df
+
+
+def _merge_source(ratings, source_df, name_column, registry, source):
+    """
+    Left join di una fonte sui rating: per Player_ID se il file dei rating ha gli
+    id e c'è un registro (alias della fonte risolti dal registro per nome e
+    squadra, una sola riga per id), altrimenti per nome e squadra.
+    """
+    if registry is None or 'Player_ID' not in ratings.columns:
+        merged = pd.merge(ratings, source_df, left_on=['Player', 'Team'], right_on=[name_column, 'Team'], how='left')
+        return merged.drop(name_column, axis=1)
+
+    ids = registry.lookup_ids(source_df[name_column], source_df['Team'], source)
+    source_df = source_df.drop(columns=[name_column, 'Team']).assign(Player_ID=ids)[ids.notna()]
+    source_df = source_df.drop_duplicates(subset='Player_ID')
+    return pd.merge(ratings.astype({'Player_ID': 'Int64'}), source_df, on='Player_ID', how='left')
+
+
+def enrich_ratings(ratings, transfermarkt_df, capology_df, config, registry=None):
+    """
+    Aggiunge ai rating di un ruolo i dati Transfermarkt (solo giocatori con una
+    posizione del ruolo) e Capology, abbinati per Player_ID (vedi PlayerRegistry)
+    o per giocatore e squadra, e formatta gli importi monetari.
+    """
+    if transfermarkt_df is not None:
+        columns = [c for c in TRANSFERMARKT_COLUMNS if config.include_position or c != 'Position']
+        role_tm = transfermarkt_df.loc[transfermarkt_df['Position'].isin(config.positions), columns]
+        ratings = _merge_source(ratings, role_tm, 'Name', registry, 'transfermarkt')
+
+    if capology_df is not None:
+        ratings = _merge_source(ratings, capology_df[CAPOLOGY_COLUMNS], 'Jugador', registry, 'capology')
+
+    # Rinomina le colonne in inglese
+    ratings = ratings.rename(columns={
+        'Bruto Anual': 'Annual Salary',
+        'Cláusula De Rescisión': 'Release Clause'
+    })
+
+    # 2 decimali per i salari, 0 per clausole e valori di mercato
+    for column, decimals in [('Annual Salary', 2), ('Release Clause', 0), ('Market Value', 0)]:
+        if column in ratings.columns:
+            ratings[column] = format_currency(ratings[column], decimals)
+    return ratings.sort_values(config.sort_by, ascending=False)
+
+
+def print_top_players(final_ratings, config):
+    """Mostra i top 20 per ogni profilo"""
+    columns = (['Player', 'Team', 'League'] + config.profiles + ['Age'] +
+               (['Position'] if config.include_position else []) + ['Market Value', 'Annual Salary'])
+    for profile in config.profiles:
+        print(f"\nTop 20 per rating {profile.replace('_', ' ')}:")
+        ranked = final_ratings.sort_values(profile, ascending=False)
+        print(ranked[columns].head(20).to_string())
+
+
+def enrich_roles(roles=None, league_paths=None, max_workers=None):
+    """
+    Arricchisce i CSV di rating dei ruoli indicati (tutti se None) con età,
+    nazionalità, valore di mercato, contratto, salario e clausola, e salva un
+    file *_complete_en.csv per ruolo. Transfermarkt e Capology vengono letti una
+    sola volta per tutti i ruoli.
+    """
+    roles = list(roles or ENRICH_CONFIGS)
+    ratings = {}
+    for role in roles:
+        config = ENRICH_CONFIGS[role]
+        try:
+            ratings[role] = pd.read_csv(config.ratings_file)
+            print(f"Caricato il file esistente con {len(ratings[role])} {config.label}")
+        except Exception as e:
+            print(f"Errore nel caricare il file esistente {config.ratings_file}: {str(e)}")
+    if not ratings:
+        return {}
+
+    transfermarkt_df, capology_df = load_player_info(league_paths, max_workers)
+    registry = PlayerRegistry()
+    manifest = RatingManifest(os.path.dirname(os.path.abspath(ENRICH_CONFIGS[roles[0]].output_file)))
+    results = {}
+    for role, role_ratings in ratings.items():
+        config = ENRICH_CONFIGS[role]
+        final_ratings = enrich_ratings(role_ratings, transfermarkt_df, capology_df, config, registry)
+        final_ratings.to_csv(config.output_file, index=False)
+        print(f"\nAnalisi completata. I risultati sono stati salvati in '{config.output_file}'")
+        print(f"Analizzati {len(final_ratings)} {config.label} in totale")
+        if not manifest.record_output(config.output_file):
+            print(f"'{config.output_file}' invariato rispetto all'ultima esecuzione")
+        print_top_players(final_ratings, config)
+        results[role] = final_ratings
+
+    registry.save()
+    manifest.save()
+    return results
+
+
+def main():
+    """Arricchisce i rating di tutti i ruoli leggendo Transfermarkt e Capology una sola volta"""
+    enrich_roles()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import re
+import unicodedata
+from collections import Counter
+
+import pandas as pd
+
+from pages.name_resolver import NameResolver
+
+# Livelli di matching, nell'ordine in cui vengono provati
+MATCH_METHODS = ['exact', 'normalized', 'token_sort', 'fuzzy']
+
+# Similarità minima (fuzz.ratio, 0-100) per il fallback fuzzy
+FUZZY_CUTOFF = 93
+
+
+def remove_accents(text):
+    """Rimuove gli accenti da un testo"""
+    return ''.join(c for c in unicodedata.normalize('NFD', text)
+                   if not unicodedata.combining(c))
+
+
+def normalize_name(name):
+    """Nome senza accenti, minuscolo; None se il nome non è una stringa"""
+    if not isinstance(name, str):
+        return None
+    return remove_accents(name).lower().strip() or None
+
+
+def token_key(name):
+    """Token del nome normalizzato (trattini, punti e apostrofi come spazi) in ordine alfabetico"""
+    normalized = normalize_name(name)
+    if normalized is None:
+        return None
+    return ' '.join(sorted(re.sub(r"[-.'’]", ' ', normalized).split())) or None
+
+
+class NameIndex:
+    """
+    Indice dei nomi di riferimento (es. Transfermarkt) costruito una volta per lega.
+    Un nome viene cercato per nome esatto, poi senza accenti e in minuscolo, poi
+    con i token ordinati, infine con un NameResolver sui nomi a token ordinati
+    (blocchi per trigrammi). A parità di chiave vale il primo nome dell'elenco.
+    """
+
+    def __init__(self, names):
+        self.exact = {}
+        self.normalized = {}
+        self.token_sorted = {}
+        for name in names:
+            if not isinstance(name, str):
+                continue
+            self.exact.setdefault(name, name)
+            self.normalized.setdefault(normalize_name(name), name)
+            key = token_key(name)
+            if key is not None:
+                self.token_sorted.setdefault(key, name)
+        self._memo = {}
+        self._resolver = None
+
+    def _fuzzy(self, key):
+        if self._resolver is None:
+            self._resolver = NameResolver(self.token_sorted, min_score=FUZZY_CUTOFF)
+        best = self._resolver.resolve(key)
+        return self.token_sorted[best] if best else None
+
+    def match(self, name):
+        """(nome di riferimento, livello) per un nome; (None, None) se non trovato."""
+        if name in self._memo:
+            return self._memo[name]
+        result = (None, None)
+        if isinstance(name, str):
+            key = token_key(name)
+            if name in self.exact:
+                result = (self.exact[name], 'exact')
+            elif normalize_name(name) in self.normalized:
+                result = (self.normalized[normalize_name(name)], 'normalized')
+            elif key in self.token_sorted:
+                result = (self.token_sorted[key], 'token_sort')
+            elif key is not None:
+                fuzzy = self._fuzzy(key)
+                if fuzzy is not None:
+                    result = (fuzzy, 'fuzzy')
+        self._memo[name] = result
+        return result
+
+
+def match_names(names, reference_names):
+    """
+    Abbina ogni nome di names (Series) ai nomi di riferimento con un NameIndex.
+    Restituisce due Series allineate a names: nome abbinato e livello di matching.
+    """
+    index = NameIndex(reference_names)
+    unique = pd.unique(names)
+    results = dict(zip(unique, (index.match(name) for name in unique)))
+    matched = names.map({name: result[0] for name, result in results.items()})
+    methods = names.map({name: result[1] for name, result in results.items()})
+    return matched, methods
+
+
+def match_report(methods):
+    """Riepilogo del matching: abbinati sul totale e conteggio per livello."""
+    counts = Counter(method for method in methods if method is not None)
+    total = len(methods)
+    matched = sum(counts.values())
+    rate = matched / total * 100 if total else 0.0
+    detail = ', '.join(f"{method} {counts[method]}" for method in MATCH_METHODS if counts[method])
+    return f"{matched}/{total} nomi abbinati ({rate:.1f}%){': ' + detail if detail else ''}"
@@ -0,0 +1,485 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Gli script di rating usano la cache dei CSV, il registro dei giocatori e i pesi
+# dei profili dell'app Dash: vanno lanciati con la cartella del progetto Dash
+# (quella che contiene pages/, es. /Users/federico/dash_project) nel PYTHONPATH
+from pages.csv_cache import read_csv_cached
+from pages.Scout_Analysis.player_registry import PlayerRegistry
+from pages.Scout_Analysis.profile_weights import load_profile_weights
+from name_matching import match_names, match_report
+from rating_manifest import RatingManifest, model_key
+
+BASE_PATH = Path('/Users/federico/dash_project/pages')
+
+# Coefficienti per i minuti giocati (estremi inclusi, fuori dai range: 0.0)
+MINUTES_COEFFICIENTS = {
+    (0, 500): 0.0,      # Sotto 500 minuti: rating 30
+    (501, 1000): 0.7,   # 501-1000 minuti: coefficiente 0.7
+    (1001, 1500): 0.85, # 1001-1500 minuti: coefficiente 0.85
+    (1501, float('inf')): 1.0  # Oltre 1500 minuti: coefficiente 1.0
+}
+
+# Profilo definito nel codice: KPI con palla e senza palla con i rispettivi pesi
+# e peso delle due fasi (solo per i ruoli che non usano i profili del CSV)
+Profile = namedtuple('Profile', ['name', 'with_ball', 'without_ball', 'with_ball_kpis', 'without_ball_kpis'])
+
+# Ruolo: posizioni Transfermarkt, pesi delle leghe, profili e regole di calcolo.
+# profile_role: ruolo nel CSV dei profili da cui prendere i pesi dei KPI;
+# multipliers: moltiplicatore della scala finale di ogni profilo (ordine delle colonne);
+# profiles: profili definiti nel codice, usati quando profile_role è None;
+# flat_value: valore normalizzato di un KPI costante nella lega;
+# renormalize: divide per la somma dei pesi dei KPI presenti nei file
+RoleConfig = namedtuple('RoleConfig', [
+    'label', 'positions', 'league_weights', 'profile_role', 'multipliers', 'profiles',
+    'output_file', 'flat_value', 'renormalize', 'sort_by'
+])
+
+TOP5_LEAGUE_WEIGHTS = {
+    'Serie_A': 1.7, 'EPL': 1.7, 'La_Liga': 1.7, 'Bundesliga': 1.7, 'Ligue_1': 1.7,
+    'Primeira_Liga': 1.2, 'Eredivisie': 1.2, 'Süper_Lig': 1.2,
+    'MLS': 1.0, 'Championship': 1.0
+}
+
+ROLE_CONFIGS = {
+    'striker': RoleConfig(
+        label='attaccanti',
+        positions=['centre-forward', 'second striker'],
+        league_weights={
+            'Serie_A': 1.6, 'EPL': 1.75, 'La_Liga': 1.8, 'Bundesliga': 1.75, 'Ligue_1': 1.75,
+            'Primeira_Liga': 1.5, 'Eredivisie': 1.2, 'Süper_Lig': 1.0,
+            'MLS': 0.9, 'Championship': 0.9
+        },
+        profile_role='STRIKER',
+        multipliers={'Falso_Nueve': 1.0, 'Aerial_Dominator': 1.15, 'Lethal_Striker': 1.05},
+        profiles=None,
+        output_file='striker_ratings_complete.csv',
+        flat_value=0.5, renormalize=True, sort_by=None
+    ),
+    'winger': RoleConfig(
+        label='winger',
+        positions=['left winger', 'right winger', 'left midfield', 'right midfield'],
+        league_weights=TOP5_LEAGUE_WEIGHTS,
+        profile_role='WINGER',
+        multipliers={'Key_Passer': 0.70, 'Creative_Winger': 0.70},
+        profiles=None,
+        output_file='winger_ratings.csv',
+        flat_value=0.5, renormalize=True, sort_by=None
+    ),
+    'attacking_midfielder': RoleConfig(
+        label='attacking midfielder/central midfielder',
+        positions=['attacking midfield', 'central midfield'],
+        league_weights=TOP5_LEAGUE_WEIGHTS,
+        profile_role='ATTACKING MIDFIELDER',
+        multipliers={'Diez': 0.70, 'Space_Invader': 0.70},
+        profiles=None,
+        output_file='attacking_midfielder_ratings.csv',
+        flat_value=0.5, renormalize=True, sort_by=None
+    ),
+    'centreback': RoleConfig(
+        label='difensori centrali',
+        positions=['centre-back', 'center-back'],
+        league_weights=TOP5_LEAGUE_WEIGHTS,
+        profile_role='CENTRE BACK',
+        multipliers={'Guardian': 1.0, 'Deep_Distributor': 1.0, 'Enforcer': 0.85},
+        profiles=None,
+        output_file='centreback_ratings.csv',
+        flat_value=0.5, renormalize=True, sort_by=None
+    ),
+    'fullback': RoleConfig(
+        label='terzini',
+        positions=['left-back', 'right-back'],
+        league_weights=TOP5_LEAGUE_WEIGHTS,
+        profile_role='FULLBACK',
+        multipliers={'Sentinel_Fullback': 0.80, 'Advanced_Wingback': 1.1, 'Overlapping_Runner': 1.1},
+        profiles=None,
+        output_file='fullback_ratings.csv',
+        flat_value=0.5, renormalize=True, sort_by=None
+    ),
+    # Portieri: modello proprio (KPI diversi da quelli del CSV), somma pesata semplice,
+    # senza fasi e senza rinormalizzazione dei pesi
+    'goalkeeper': RoleConfig(
+        label='portieri',
+        positions=['goalkeeper'],
+        league_weights={
+            'Serie_A': 1.4, 'EPL': 1.4, 'La_Liga': 1.4, 'Bundesliga': 1.4, 'Ligue_1': 1.4,
+            'Primeira_Liga': 1.2, 'Eredivisie': 1.2, 'Süper_Lig': 1.2,
+            'MLS': 1.0, 'Championship': 1.0
+        },
+        profile_role=None,
+        multipliers={'Playmaker_Keeper': 0.8, 'Shot_Stopper': 0.8},
+        profiles=[
+            Profile('Playmaker_Keeper', 1.0, 0.0, {'Att (GK)': 0.4, 'DistProm.': 0.3, 'Mín': 0.3}, {}),
+            Profile('Shot_Stopper', 1.0, 0.0, {'PSxG': 0.3, 'PSxG/SoT': 0.3, 'PSxG+/-': 0.4}, {}),
+        ],
+        output_file='goalkeeper_ratings.csv',
+        flat_value=0.0, renormalize=False, sort_by='Playmaker_Keeper'
+    ),
+}
+
+
+def safe_float_convert(value):
+    """Converte in modo sicuro un valore in float, gestendo anche i numeri con virgola come separatore delle migliaia"""
+    if pd.isna(value) or value == '':
+        return 0.0
+    try:
+        if isinstance(value, str):
+            value = value.replace(',', '')
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def to_float_array(series):
+    """safe_float_convert applicata a un'intera colonna"""
+    if series.dtype == object:
+        series = series.astype(str).str.replace(',', '', regex=False)
+    return pd.to_numeric(series, errors='coerce').fillna(0.0).to_numpy(dtype='float64')
+
+
+def minutes_coefficients(minutes):
+    """Coefficiente dei minuti per un array di minuti giocati"""
+    conditions = [(minutes >= low) & (minutes <= high) for low, high in MINUTES_COEFFICIENTS]
+    return np.select(conditions, list(MINUTES_COEFFICIENTS.values()), default=0.0)
+
+
+def weight_matrix(profiles):
+    """
+    Matrice KPI x profili dei profili definiti nel codice: peso del KPI
+    moltiplicato per il peso della fase (con/senza palla).
+    Restituisce (lista dei KPI, matrice).
+    """
+    kpis = []
+    for profile in profiles:
+        for kpi in list(profile.with_ball_kpis) + list(profile.without_ball_kpis):
+            if kpi not in kpis:
+                kpis.append(kpi)
+
+    weights = np.zeros((len(kpis), len(profiles)))
+    for col, profile in enumerate(profiles):
+        for kpi, weight in profile.with_ball_kpis.items():
+            weights[kpis.index(kpi), col] += weight * profile.with_ball
+        for kpi, weight in profile.without_ball_kpis.items():
+            weights[kpis.index(kpi), col] += weight * profile.without_ball
+    return kpis, weights
+
+
+def role_weights(config):
+    """
+    (lista dei KPI, matrice KPI x profili) di un ruolo, con le colonne
+    nell'ordine di config.multipliers. I pesi vengono dal CSV dei profili
+    compilato (vedi profile_weights), salvo i ruoli con profili nel codice.
+    """
+    if config.profile_role is None:
+        return weight_matrix(config.profiles)
+    compiled = load_profile_weights()[config.profile_role]
+    columns = [compiled.profile_index[name] for name in config.multipliers]
+    return compiled.kpis, compiled.weights[:, columns]
+
+
+def get_league_paths():
+    """Restituisce i percorsi delle leghe da analizzare"""
+    return {
+        'Serie_A': BASE_PATH / 'data_serie_a_24-25',
+        'EPL': BASE_PATH / 'EPL/data_EPL_24-25',
+        'La_Liga': BASE_PATH / 'La_Liga/data_La_Liga_24-25',
+        'Bundesliga': BASE_PATH / 'Bundesliga/data_Bundesliga_24-25',
+        'Ligue_1': BASE_PATH / 'Ligue_1/data_Ligue_1_24-25',
+        'Primeira_Liga': BASE_PATH / 'Primeira_Liga/data_Primeira_Liga_24-25',
+        'Eredivisie': BASE_PATH / 'Eredivisie/data_Eredivisie_24-25',
+        'Süper_Lig': BASE_PATH / 'Süper_Lig/data_Süper_Lig_24-25',
+        'MLS': BASE_PATH / 'MLS/data_MLS_24',
+        'Championship': BASE_PATH / 'Championship/data_Championship_24-25'
+    }
+
+
+def get_team_files(league_path):
+    """Restituisce le coppie di file FBRef e Transfermarkt per ogni squadra"""
+    team_files = []
+    for file in league_path.glob('*.csv'):
+        if file.name.endswith('_transfermarkt.csv') or file.name.endswith('_wyscout.csv'):
+            continue
+        if file.name in ['clasificacion.csv', 'marcadores.csv', 'marcatori_Serie_A_24-25.csv', 'Serie_A_24-25.csv']:
+            continue
+        # Gestione speciale per Juventus
+        if file.name == 'Juventus.csv':
+            transfermarkt_file = league_path / 'Juventus FC.csv'
+        else:
+            transfermarkt_file = league_path / f"{file.stem}_transfermarkt.csv"
+        if transfermarkt_file.exists():
+            team_files.append((file, transfermarkt_file))
+    return team_files
+
+
+def _read_team_files(fbref_file, transfermarkt_file):
+    """Legge i file FBRef e Transfermarkt di una squadra; None se uno dei due non è leggibile"""
+    try:
+        fbref_df = read_csv_cached(fbref_file)
+        fbref_df['Team'] = fbref_file.stem
+
+        transfermarkt_df = read_csv_cached(transfermarkt_file)
+        transfermarkt_df['Team'] = fbref_file.stem
+        return fbref_df, transfermarkt_df
+    except Exception as e:
+        print(f"Errore nel caricamento dei file {fbref_file} o {transfermarkt_file}: {str(e)}")
+        return None
+
+
+def load_league_data(league_path, executor=None):
+    """
+    Carica i dati della lega da FBRef e Transfermarkt. Con un executor i file
+    delle squadre vengono letti in parallelo (l'ordine delle righe non cambia)
+    """
+    try:
+        team_files = get_team_files(league_path)
+        if not team_files:
+            print(f"Nessun file trovato in {league_path}")
+            return None, None
+
+        if executor is not None:
+            teams = list(executor.map(lambda files: _read_team_files(*files), team_files))
+        else:
+            teams = [_read_team_files(*files) for files in team_files]
+        teams = [team for team in teams if team is not None]
+
+        if not teams:
+            print(f"Nessun dato valido trovato in {league_path}")
+            return None, None
+
+        return (pd.concat([fbref_df for fbref_df, _ in teams], ignore_index=True),
+                pd.concat([transfermarkt_df for _, transfermarkt_df in teams], ignore_index=True))
+    except Exception as e:
+        print(f"Errore nel caricamento dei dati per {league_path}: {str(e)}")
+        return None, None
+
+
+def load_leagues(league_paths=None, max_workers=None):
+    """
+    Carica tutte le leghe in parallelo su un pool di thread (leghe e file delle
+    squadre). Restituisce lega -> (fbref_df, transfermarkt_df) nell'ordine di
+    league_paths, escluse le leghe senza dati, e stampa il tempo di ogni lega.
+    """
+    league_paths = league_paths or get_league_paths()
+    existing = {}
+    for league_name, league_path in league_paths.items():
+        if league_path.exists():
+            existing[league_name] = league_path
+        else:
+            print(f"Directory {league_path} non trovata")
+
+    def load(league_name):
+        start = time.perf_counter()
+        data = load_league_data(existing[league_name], file_executor)
+        return data, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as file_executor, \
+            ThreadPoolExecutor(max_workers=max(1, len(existing))) as league_executor:
+        loaded = dict(zip(existing, league_executor.map(load, existing)))
+
+    leagues = {}
+    for league_name, ((fbref_df, transfermarkt_df), elapsed) in loaded.items():
+        if fbref_df is None or transfermarkt_df is None:
+            print(f"{league_name}: nessun dato caricato ({elapsed:.2f}s)")
+            continue
+        print(f"{league_name}: {len(fbref_df)} righe FBRef, {len(transfermarkt_df)} Transfermarkt in {elapsed:.2f}s")
+        leagues[league_name] = (fbref_df, transfermarkt_df)
+    print(f"Caricate {len(leagues)} leghe in {time.perf_counter() - start:.2f}s")
+    return leagues
+
+
+def select_role_rows(fbref_df, transfermarkt_df, config, matches=None):
+    """
+    Maschera delle righe FBRef del ruolo: il nome deve corrispondere (vedi
+    name_matching) a un giocatore Transfermarkt la cui prima riga ha una delle
+    posizioni del ruolo. matches sono i nomi Transfermarkt già abbinati a fbref_df
+    """
+    positions = transfermarkt_df['Position'].str.lower()
+    first_rows = ~transfermarkt_df['Name'].duplicated()
+    first_position = pd.Series(positions[first_rows].to_numpy(), index=transfermarkt_df.loc[first_rows, 'Name'])
+
+    if matches is None:
+        matches, _ = match_names(fbref_df['Jugador'], transfermarkt_df['Name'])
+    return matches.map(first_position).isin(config.positions).to_numpy()
+
+
+def score_players(fbref_df, mask, config, league_weight):
+    """
+    Rating di tutti i profili per le righe selezionate da mask, in un solo passaggio:
+    normalizzazione min-max di ogni KPI sull'intera lega, prodotto con la matrice
+    dei pesi, poi coefficienti dei minuti e della lega
+    """
+    kpis, weights = role_weights(config)
+    present = [i for i, kpi in enumerate(kpis) if kpi in fbref_df.columns]
+    weights = weights[present]
+
+    values = np.column_stack([to_float_array(fbref_df[kpis[i]]) for i in present]) \
+        if present else np.zeros((len(fbref_df), 0))
+    low, high = values.min(axis=0), values.max(axis=0)
+    span = high - low
+    flat = span == 0
+    normalized = np.where(flat, config.flat_value,
+                          (values[mask] - low) / np.where(flat, 1.0, span))
+
+    scores = normalized @ weights
+    if config.renormalize:
+        total = weights.sum(axis=0)
+        scores = np.divide(scores, total, out=scores, where=total > 0)
+
+    multipliers = np.array(list(config.multipliers.values()))
+    coefficients = minutes_coefficients(to_float_array(fbref_df.loc[mask, 'Mín']))
+    final = 30 + (scores * multipliers * 69) * coefficients[:, None] * league_weight
+    return np.round(np.minimum(99.0, final), 1)
+
+
+def rate_league(fbref_df, transfermarkt_df, league_name, role, matches=None):
+    """
+    Calcola i rating di tutti i giocatori di un ruolo in una lega. matches
+    (opzionale) sono i nomi Transfermarkt abbinati alle righe di fbref_df,
+    calcolati una volta per lega da run_roles
+    """
+    config = ROLE_CONFIGS[role]
+    if fbref_df is None or fbref_df.empty or transfermarkt_df is None or transfermarkt_df.empty:
+        return None
+
+    mask = select_role_rows(fbref_df, transfermarkt_df, config, matches)
+    if not mask.any():
+        print(f"Nessun giocatore ({config.label}) trovato in {league_name}")
+        return None
+
+    league_weight = config.league_weights.get(league_name, 1.0)
+    ratings = score_players(fbref_df, mask, config, league_weight)
+
+    players = fbref_df.loc[mask]
+    result = pd.DataFrame({
+        'Player': players['Jugador'].to_numpy(),
+        'Team': players['Team'].to_numpy(),
+        'League': league_name
+    })
+    for col, profile in enumerate(config.multipliers):
+        result[profile] = ratings[:, col]
+    return result
+
+
+def print_top_players(final_ratings, config):
+    """Mostra i top 20 per ogni profilo"""
+    columns = ['Player', 'Team', 'League'] + list(config.multipliers)
+    for profile in config.multipliers:
+        print(f"\nTop 20 per rating {profile.replace('_', ' ')}:")
+        ranked = final_ratings.sort_values(profile, ascending=False)
+        print(ranked[columns].head(20).to_string())
+
+
+def role_model_key(role):
+    """Chiave del modello di un ruolo: configurazione, pesi dei KPI e coefficienti dei minuti."""
+    config = ROLE_CONFIGS[role]
+    kpis, weights = role_weights(config)
+    return model_key(role, config._replace(label=None, output_file=None)._asdict(),
+                     kpis, weights.tolist(), list(MINUTES_COEFFICIENTS.items()))
+
+
+def run_roles(roles=None, league_paths=None, max_workers=None, incremental=True):
+    """
+    Calcola i rating dei ruoli indicati (tutti se None) su tutte le leghe e
+    salva un CSV per ruolo. Le leghe vengono caricate in parallelo, una sola volta.
+
+    Con incremental=True il manifest (rating_manifest.json, accanto ai CSV di
+    output) registra gli hash dei file squadra di ogni lega: vengono caricate
+    e ricalcolate solo le leghe con file nuovi, modificati o rimossi (o con un
+    modello di rating cambiato), per le altre si riusano i risultati salvati. I range min/max sono calcolati
+    per lega, quindi un file modificato non influisce sulle altre leghe.
+
+    I giocatori vengono registrati nel PlayerRegistry (con il nome Transfermarkt
+    abbinato come alias) e ogni file di output ha la colonna Player_ID.
+    """
+    roles = list(roles or ROLE_CONFIGS)
+    league_paths = league_paths or get_league_paths()
+    output_dir = os.path.dirname(os.path.abspath(ROLE_CONFIGS[roles[0]].output_file))
+    manifest = RatingManifest(output_dir) if incremental else None
+    registry = PlayerRegistry()
+    keys = {role: role_model_key(role) for role in roles}
+
+    # Hash dei file di ogni lega e ruoli da ricalcolare
+    file_hashes, stale = {}, {}
+    for league_name, league_path in league_paths.items():
+        if not league_path.exists():
+            print(f"Directory {league_path} non trovata")
+            continue
+        if manifest is None:
+            stale[league_name] = roles
+            continue
+        files = [path for pair in get_team_files(league_path) for path in pair]
+        file_hashes[league_name] = manifest.hash_files(league_name, files)
+        stale_roles = [role for role in roles
+                       if not manifest.is_current(league_name, file_hashes[league_name], role, keys[role])]
+        if stale_roles:
+            stale[league_name] = stale_roles
+
+    reused = [league for league in file_hashes if league not in stale]
+    if manifest is not None:
+        print(f"Leghe da ricalcolare: {len(stale)}, risultati riutilizzati: {len(reused)}")
+
+    leagues = load_leagues({league: league_paths[league] for league in stale}, max_workers) if stale else {}
+    all_ratings = {role: [] for role in roles}
+    for league_name in league_paths:
+        if league_name in leagues:
+            print(f"\nAnalizzando {league_name}...")
+            fbref_df, transfermarkt_df = leagues[league_name]
+            matches, methods = match_names(fbref_df['Jugador'], transfermarkt_df['Name'])
+            print(f"Matching FBRef-Transfermarkt: {match_report(methods)}")
+            for name, team, tm_name in dict.fromkeys(zip(fbref_df['Jugador'], fbref_df['Team'], matches)):
+                registry.register(name, team, league_name, aliases={'fbref': name, 'transfermarkt': tm_name})
+        elif league_name not in file_hashes or league_name in stale:
+            # Directory mancante o lega senza dati validi
+            continue
+
+        for role in roles:
+            if league_name in leagues and role in stale[league_name]:
+                ratings = rate_league(fbref_df, transfermarkt_df, league_name, role, matches)
+                if manifest is not None:
+                    manifest.store_result(league_name, file_hashes[league_name], role, keys[role], ratings)
+                if ratings is not None:
+                    print(f"Analizzati {len(ratings)} {ROLE_CONFIGS[role].label} in {league_name}")
+            else:
+                ratings = manifest.load_result(league_name, role)
+            if ratings is not None:
+                all_ratings[role].append(ratings)
+
+    results = {}
+    for role in roles:
+        config = ROLE_CONFIGS[role]
+        if not all_ratings[role]:
+            print(f"Nessun dato trovato per l'analisi ({config.label})")
+            continue
+
+        final_ratings = pd.concat(all_ratings[role], ignore_index=True)
+        final_ratings.insert(0, 'Player_ID', registry.assign_ids(final_ratings, role))
+        if config.sort_by:
+            final_ratings = final_ratings.sort_values(config.sort_by, ascending=False)
+        final_ratings.to_csv(config.output_file, index=False)
+        print(f"\nAnalisi completata. I risultati sono stati salvati in '{config.output_file}'")
+        print(f"Analizzati {len(final_ratings)} {config.label} in totale")
+        if manifest is not None and not manifest.record_output(config.output_file):
+            print(f"'{config.output_file}' invariato rispetto all'ultima esecuzione")
+        print_top_players(final_ratings, config)
+        results[role] = final_ratings
+
+    registry.save()
+    if manifest is not None:
+        manifest.save()
+    return results
+
+
+def main():
+    """Calcola i rating di tutti i ruoli leggendo ogni lega una sola volta"""
+    run_roles()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Manifest e risultati per lega, scritti nella cartella dei CSV di output
+MANIFEST_FILE = 'rating_manifest.json'
+CACHE_DIR_NAME = '.rating_cache'
+
+
+def file_hash(path, previous=None):
+    """
+    Hash MD5 del contenuto di un file, con mtime e dimensione. Se mtime e
+    dimensione coincidono con la voce precedente del manifest, il file non viene riletto.
+    """
+    stat = os.stat(path)
+    if previous and previous.get('mtime') == stat.st_mtime and previous.get('size') == stat.st_size:
+        return previous
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'md5': digest.hexdigest()}
+
+
+def content_hashes(file_hashes):
+    """Percorso -> MD5: mtime e dimensione servono solo a evitare di rileggere i file."""
+    return {path: entry.get('md5') for path, entry in file_hashes.items()}
+
+
+def model_key(*parts):
+    """Chiave del modello di rating (configurazione del ruolo e pesi): cambia se cambia il calcolo."""
+    text = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+class RatingManifest:
+    """
+    Manifest del calcolo incrementale: per ogni lega gli hash dei file squadra
+    letti e, per ogni ruolo, la chiave del modello e il numero di righe del
+    risultato salvato in CACHE_DIR_NAME; per ogni file di output il suo hash.
+    Manifest e risultati stanno in output_dir, la cartella dei CSV di output.
+    Un file conta come modificato solo se cambia il suo contenuto (MD5).
+    """
+
+    def __init__(self, output_dir='.'):
+        output_dir = Path(output_dir).resolve()
+        self.path = str(output_dir / MANIFEST_FILE)
+        self.cache_dir = output_dir / CACHE_DIR_NAME
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.leagues = data.get('leagues', {})
+        self.outputs = data.get('outputs', {})
+
+    def hash_files(self, league_name, files):
+        """Hash dei file di una lega, riusando quelli del manifest per i file non modificati."""
+        previous = self.leagues.get(league_name, {}).get('files', {})
+        return {str(path): file_hash(path, previous.get(str(path))) for path in files}
+
+    def _result_path(self, league_name, role):
+        return self.cache_dir / league_name / f"{role}.pkl"
+
+    def is_current(self, league_name, file_hashes, role, key):
+        """True se i file della lega e il modello del ruolo non sono cambiati dall'ultimo calcolo."""
+        entry = self.leagues.get(league_name)
+        if entry is None or content_hashes(entry.get('files', {})) != content_hashes(file_hashes):
+            return False
+        # Stesso contenuto: aggiorna mtime e dimensione per non rileggere i file la prossima volta
+        entry['files'] = file_hashes
+        role_entry = entry.get('roles', {}).get(role)
+        if role_entry is None or role_entry.get('model') != key:
+            return False
+        return role_entry.get('rows', 0) == 0 or self._result_path(league_name, role).exists()
+
+    def load_result(self, league_name, role):
+        """Risultato salvato di un ruolo in una lega (None se la lega non aveva giocatori del ruolo)."""
+        if self.leagues[league_name]['roles'][role].get('rows', 0) == 0:
+            return None
+        return pd.read_pickle(self._result_path(league_name, role))
+
+    def store_result(self, league_name, file_hashes, role, key, ratings):
+        """Salva il risultato di un ruolo in una lega e aggiorna il manifest."""
+        entry = self.leagues.get(league_name)
+        if entry is None or content_hashes(entry.get('files', {})) != content_hashes(file_hashes):
+            # File cambiati: i risultati degli altri ruoli non sono più validi
+            entry = {'files': file_hashes, 'roles': {}}
+            self.leagues[league_name] = entry
+        entry['files'] = file_hashes
+        rows = 0 if ratings is None else len(ratings)
+        if rows:
+            result_path = self._result_path(league_name, role)
+            result_path.parent.mkdir(parents=True, exist_ok=True)
+            ratings.to_pickle(result_path)
+        entry['roles'][role] = {'model': key, 'rows': rows}
+
+    def record_output(self, output_file):
+        """Registra l'hash di un file di output; True se il contenuto è cambiato."""
+        previous = self.outputs.get(output_file)
+        current = file_hash(output_file)
+        self.outputs[output_file] = current
+        return previous is None or previous.get('md5') != current['md5']
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'leagues': self.leagues, 'outputs': self.outputs}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
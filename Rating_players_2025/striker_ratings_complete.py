@@ -1,386 +1,18 @@
-import pandas as pd
-import numpy as np
-from pathlib import Path
-import os
-import unicodedata
+from rating_engine import ROLE_CONFIGS, rate_league, run_roles
 
-# Pesi delle leghe
-LEAGUE_WEIGHTS = {
-    'Serie_A': 1.6,      # Top 5
-    'EPL': 1.75,          # Top 5
-    'La_Liga': 1.8,      # Top 5
-    'Bundesliga': 1.75,   # Top 5
-    'Ligue_1': 1.75,      # Top 5
-    'Primeira_Liga': 1.5,
-    'Eredivisie': 1.2,
-    'Süper_Lig': 1.0,
-    'MLS': 0.9,
-    'Championship': 0.9
-}
+# Pesi delle leghe e profili sono definiti in rating_engine.ROLE_CONFIGS
+LEAGUE_WEIGHTS = ROLE_CONFIGS['striker'].league_weights
 
-# Coefficienti per i minuti giocati
-MINUTES_COEFFICIENTS = {
-    (0, 500): 0.0,      # Sotto 500 minuti: rating 30
-    (501, 1000): 0.7,   # 501-1000 minuti: coefficiente 0.7
-    (1001, 1500): 0.85, # 1001-1500 minuti: coefficiente 0.85
-    (1501, float('inf')): 1.0  # Oltre 1500 minuti: coefficiente 1.0
-}
-
-def remove_accents(text):
-    """Rimuove gli accenti da un testo"""
-    if pd.isna(text) or not isinstance(text, str):
-        return text
-    return ''.join(c for c in unicodedata.normalize('NFD', text)
-                  if not unicodedata.combining(c))
-
-def normalize_name(name):
-    """Normalizza un nome per il matching"""
-    if pd.isna(name) or not isinstance(name, str):
-        return name
-    # Rimuove accenti e converte in minuscolo
-    normalized = remove_accents(name).lower().strip()
-    return normalized
-
-def safe_float_convert(value):
-    """Converte in modo sicuro un valore in float, gestendo anche i numeri con virgola come separatore delle migliaia"""
-    if pd.isna(value) or value == '':
-        return 0.0
-    try:
-        if isinstance(value, str):
-            value = value.replace(',', '')
-        return float(value)
-    except (ValueError, TypeError):
-        return 0.0
-
-def get_minutes_coefficient(minutes):
-    """Restituisce il coefficiente in base ai minuti giocati"""
-    minutes = safe_float_convert(minutes)
-    for (min_range, max_range), coefficient in MINUTES_COEFFICIENTS.items():
-        if min_range <= minutes <= max_range:
-            return coefficient
-    return 0.0
-
-def get_league_paths():
-    """Restituisce i percorsi delle leghe da analizzare"""
-    base_path = Path('/Users/federico/dash_project/pages')
-    league_paths = {
-        'Serie_A': base_path / 'data_serie_a_24-25',
-        'EPL': base_path / 'EPL/data_EPL_24-25',
-        'La_Liga': base_path / 'La_Liga/data_La_Liga_24-25',
-        'Bundesliga': base_path / 'Bundesliga/data_Bundesliga_24-25',
-        'Ligue_1': base_path / 'Ligue_1/data_Ligue_1_24-25',
-        'Primeira_Liga': base_path / 'Primeira_Liga/data_Primeira_Liga_24-25',
-        'Eredivisie': base_path / 'Eredivisie/data_Eredivisie_24-25',
-        'Süper_Lig': base_path / 'Süper_Lig/data_Süper_Lig_24-25',
-        'MLS': base_path / 'MLS/data_MLS_24',
-        'Championship': base_path / 'Championship/data_Championship_24-25'
-    }
-    return league_paths
-
-def get_team_files(league_path):
-    """Restituisce le coppie di file FBRef e Transfermarkt per ogni squadra"""
-    team_files = []
-    for file in league_path.glob('*.csv'):
-        if file.name.endswith('_transfermarkt.csv') or file.name.endswith('_wyscout.csv'):
-            continue
-        if file.name in ['clasificacion.csv', 'marcadores.csv', 'marcatori_Serie_A_24-25.csv', 'Serie_A_24-25.csv']:
-            continue
-        # Gestione speciale per Juventus
-        if file.name == 'Juventus.csv':
-            transfermarkt_file = league_path / 'Juventus FC.csv'
-        else:
-            transfermarkt_file = league_path / f"{file.stem}_transfermarkt.csv"
-        if transfermarkt_file.exists():
-            team_files.append((file, transfermarkt_file))
-    return team_files
-
-def load_league_data(league_path):
-    """Carica i dati della lega da FBRef e Transfermarkt"""
-    try:
-        team_files = get_team_files(league_path)
-        if not team_files:
-            print(f"Nessun file trovato in {league_path}")
-            return None, None
-
-        all_fbref_data = []
-        all_transfermarkt_data = []
-
-        for fbref_file, transfermarkt_file in team_files:
-            try:
-                fbref_df = pd.read_csv(fbref_file)
-                fbref_df['Team'] = fbref_file.stem
-                all_fbref_data.append(fbref_df)
-                
-                transfermarkt_df = pd.read_csv(transfermarkt_file)
-                transfermarkt_df['Team'] = fbref_file.stem
-                all_transfermarkt_data.append(transfermarkt_df)
-            except Exception as e:
-                print(f"Errore nel caricamento dei file {fbref_file} o {transfermarkt_file}: {str(e)}")
-                continue
-
-        if not all_fbref_data or not all_transfermarkt_data:
-            print(f"Nessun dato valido trovato in {league_path}")
-            return None, None
-
-        return pd.concat(all_fbref_data, ignore_index=True), pd.concat(all_transfermarkt_data, ignore_index=True)
-    except Exception as e:
-        print(f"Errore nel caricamento dei dati per {league_path}: {str(e)}")
-        return None, None
-
-def normalize_kpi(value, min_val, max_val):
-    """Normalizza un valore KPI tra 0 e 1"""
-    if pd.isna(value) or pd.isna(min_val) or pd.isna(max_val):
-        return 0.0
-    if max_val == min_val:
-        return 0.5
-    return (value - min_val) / (max_val - min_val)
-
-def calculate_global_ranges(fbref_df):
-    """Calcola i range globali per la normalizzazione dei KPI"""
-    kpi_ranges = {}
-    
-    # KPI per Falso Nueve (80/20 con/senza palla) - dal CSV
-    falso_nueve_kpis = {
-        'Con palla': {
-            'xG + xAG': {'weight': 0.25, 'inverse': False},
-            'PrgP': {'weight': 0.18, 'inverse': False},
-            'PrgC': {'weight': 0.15, 'inverse': False},
-            'GCA90': {'weight': 0.12, 'inverse': False},
-            '1/3': {'weight': 0.10, 'inverse': False}
-        },
-        'Senza palla': {
-            'FR': {'weight': 0.50, 'inverse': False},
-            'Recup.': {'weight': 0.30, 'inverse': False},
-            '3.º ataq.': {'weight': 0.20, 'inverse': False}
-        }
-    }
-    
-    # KPI per Aerial Dominator (70/30 con/senza palla) - dal CSV
-    aerial_dominator_kpis = {
-        'Con palla': {
-            'PrgR': {'weight': 0.25, 'inverse': False},
-            'xG': {'weight': 0.15, 'inverse': False},
-            'T/90': {'weight': 0.15, 'inverse': False},
-            'G/T': {'weight': 0.10, 'inverse': False},
-            'Ataq. Pen.': {'weight': 0.05, 'inverse': False}
-        },
-        'Senza palla': {
-            '% de ganados': {'weight': 0.67, 'inverse': False},
-            'Recup.': {'weight': 0.17, 'inverse': False},
-            'Int': {'weight': 0.16, 'inverse': False}
-        }
-    }
-    
-    # KPI per Lethal Striker (85/15 con/senza palla) - dal CSV
-    lethal_striker_kpis = {
-        'Con palla': {
-            'npxG': {'weight': 0.34, 'inverse': False},
-            'TalArc/90': {'weight': 0.26, 'inverse': False},
-            'G/T': {'weight': 0.17, 'inverse': False},
-            'Ataq. Pen.': {'weight': 0.08, 'inverse': False}
-        },
-        'Senza palla': {
-            '% de ganados': {'weight': 0.6, 'inverse': False},
-            'FR': {'weight': 0.4, 'inverse': False}
-        }
-    }
-    
-    # Calcola i range per tutti i KPI
-    all_kpis = set()
-    for profile in [falso_nueve_kpis, aerial_dominator_kpis, lethal_striker_kpis]:
-        for phase in profile.values():
-            all_kpis.update(phase.keys())
-    
-    for kpi in all_kpis:
-        if kpi in fbref_df.columns:
-            values = fbref_df[kpi].apply(safe_float_convert)
-            if not values.empty and values.notna().any():
-                kpi_ranges[kpi] = {
-                    'min': values.min(),
-                    'max': values.max()
-                }
-    
-    return kpi_ranges, falso_nueve_kpis, aerial_dominator_kpis, lethal_striker_kpis
-
-def calculate_striker_rating(player_data, kpi_ranges, falso_nueve_kpis, aerial_dominator_kpis, lethal_striker_kpis, league_weight=1.0):
-    """Calcola i rating dell'attaccante per i tre profili"""
-    minutes_coefficient = get_minutes_coefficient(player_data['Mín'])
-    if minutes_coefficient == 0.0:
-        return {
-            'Falso_Nueve': 30.0,
-            'Aerial_Dominator': 30.0,
-            'Lethal_Striker': 30.0
-        }
-    
-    normalized_stats = {}
-    for kpi, ranges in kpi_ranges.items():
-        value = safe_float_convert(player_data.get(kpi, 0))
-        normalized_stats[kpi] = normalize_kpi(value, ranges['min'], ranges['max'])
-    
-    def calculate_profile_rating(profile_kpis, with_ball_weight, without_ball_weight):
-        rating = 0.0
-        total_weight = 0.0
-        
-        # Calcola rating con palla
-        for kpi, info in profile_kpis['Con palla'].items():
-            if kpi in normalized_stats:
-                rating += normalized_stats[kpi] * info['weight'] * with_ball_weight
-                total_weight += info['weight'] * with_ball_weight
-        
-        # Calcola rating senza palla
-        for kpi, info in profile_kpis['Senza palla'].items():
-            if kpi in normalized_stats:
-                rating += normalized_stats[kpi] * info['weight'] * without_ball_weight
-                total_weight += info['weight'] * without_ball_weight
-        
-        if total_weight > 0:
-            rating = rating / total_weight
-        
-        return rating
-    
-    # Calcola i rating per ogni profilo
-    falso_nueve_rating = calculate_profile_rating(falso_nueve_kpis, 0.80, 0.20)
-    aerial_dominator_rating = calculate_profile_rating(aerial_dominator_kpis, 0.70, 0.30)
-    lethal_striker_rating = calculate_profile_rating(lethal_striker_kpis, 0.85, 0.15)
-    
-    # Applica i coefficienti
-    falso_nueve_final = 30 + (falso_nueve_rating * 1.0 * 69) * minutes_coefficient * league_weight
-    aerial_dominator_final = 30 + (aerial_dominator_rating * 1.15 * 69) * minutes_coefficient * league_weight
-    lethal_striker_final = 30 + (lethal_striker_rating * 1.05 * 69) * minutes_coefficient * league_weight
-    
-    # Limita i rating a 99.0
-    return {
-        'Falso_Nueve': round(min(99.0, falso_nueve_final), 1),
-        'Aerial_Dominator': round(min(99.0, aerial_dominator_final), 1),
-        'Lethal_Striker': round(min(99.0, lethal_striker_final), 1)
-    }
-
-def find_player_match(fbref_name, transfermarkt_names):
-    """Trova il match tra un nome FBRef e i nomi Transfermarkt"""
-    normalized_fbref = normalize_name(fbref_name)
-    
-    # Gestione speciale per Julián Álvarez
-    if normalized_fbref == 'julian alvarez':
-        for tm_name in transfermarkt_names:
-            normalized_tm = normalize_name(tm_name)
-            if normalized_tm == 'julian alvarez':
-                return tm_name
-    
-    # Match normale
-    for tm_name in transfermarkt_names:
-        normalized_tm = normalize_name(tm_name)
-        if normalized_fbref == normalized_tm:
-            return tm_name
-    
-    return None
 
 def get_striker_ratings(fbref_df, transfermarkt_df, league_name):
     """Calcola i rating per tutti gli attaccanti di una lega"""
-    if fbref_df is None or fbref_df.empty or transfermarkt_df is None or transfermarkt_df.empty:
-        return None
-    
-    # Ottieni i nomi degli attaccanti dal file transfermarkt
-    strikers_tm = transfermarkt_df[
-        transfermarkt_df['Position'].str.lower().isin([
-            'centre-forward', 'second striker'
-        ])
-    ]['Name'].tolist()
-    
-    # Crea un mapping tra nomi FBRef e Transfermarkt
-    name_mapping = {}
-    for fbref_name in fbref_df['Jugador'].unique():
-        matched_name = find_player_match(fbref_name, strikers_tm)
-        if matched_name:
-            name_mapping[fbref_name] = matched_name
-    
-    # Filtra i dati FBRef per includere solo gli attaccanti con match
-    strikers = fbref_df[fbref_df['Jugador'].isin(name_mapping.keys())].copy()
-    
-    if strikers.empty:
-        print(f"Nessun attaccante trovato in {league_name}")
-        return None
-    
-    kpi_ranges, falso_nueve_kpis, aerial_dominator_kpis, lethal_striker_kpis = calculate_global_ranges(fbref_df)
-    league_weight = LEAGUE_WEIGHTS.get(league_name, 1.0)
-    ratings = []
-    
-    for _, player in strikers.iterrows():
-        # Usa il nome mappato per verificare la posizione
-        tm_name = name_mapping[player['Jugador']]
-        tm_player = transfermarkt_df[transfermarkt_df['Name'] == tm_name]
-        
-        if not tm_player.empty and tm_player.iloc[0]['Position'].lower() in [
-            'centre-forward', 'second striker'
-        ]:
-            rating = calculate_striker_rating(
-                player, kpi_ranges, falso_nueve_kpis, aerial_dominator_kpis, lethal_striker_kpis, league_weight
-            )
-            ratings.append({
-                'Player': player['Jugador'],
-                'Team': player['Team'],
-                'League': league_name,
-                'Falso_Nueve': rating['Falso_Nueve'],
-                'Aerial_Dominator': rating['Aerial_Dominator'],
-                'Lethal_Striker': rating['Lethal_Striker']
-            })
-    
-    if not ratings:
-        print(f"Nessun attaccante valido trovato in {league_name}")
-        return None
-        
-    return pd.DataFrame(ratings)
+    return rate_league(fbref_df, transfermarkt_df, league_name, 'striker')
+
 
 def main():
-    """Funzione principale per analizzare tutte le leghe e generare il CSV"""
-    league_paths = get_league_paths()
-    all_ratings = []
-    
-    for league_name, league_path in league_paths.items():
-        print(f"\nAnalizzando {league_name}...")
-        if not league_path.exists():
-            print(f"Directory {league_path} non trovata")
-            continue
-            
-        fbref_df, transfermarkt_df = load_league_data(league_path)
-        if fbref_df is None or transfermarkt_df is None:
-            continue
-            
-        ratings = get_striker_ratings(fbref_df, transfermarkt_df, league_name)
-        if ratings is not None:
-            all_ratings.append(ratings)
-            print(f"Analizzati {len(ratings)} attaccanti in {league_name}")
-    
-    if all_ratings:
-        final_ratings = pd.concat(all_ratings, ignore_index=True)
-        
-        # Salva i risultati
-        final_ratings.to_csv('striker_ratings_complete.csv', index=False)
-        print("\nAnalisi completata. I risultati sono stati salvati in 'striker_ratings_complete.csv'")
-        print(f"Analizzati {len(final_ratings)} attaccanti in totale")
-        
-        # Verifica se Julián Álvarez è presente
-        julian_alvarez = final_ratings[final_ratings['Player'].str.contains('Julián Álvarez', na=False)]
-        if not julian_alvarez.empty:
-            print(f"\nJulián Álvarez trovato!")
-            print(julian_alvarez[['Player', 'Team', 'League', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker']].to_string())
-        else:
-            print(f"\nJulián Álvarez NON trovato nel file finale")
-        
-        # Mostra i top 20 per ogni profilo
-        print("\nTop 20 per rating Falso Nueve:")
-        falso_nueve_ratings = final_ratings.sort_values('Falso_Nueve', ascending=False)
-        print(falso_nueve_ratings[['Player', 'Team', 'League', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker']].head(20).to_string())
-        
-        print("\nTop 20 per rating Aerial Dominator:")
-        aerial_dominator_ratings = final_ratings.sort_values('Aerial_Dominator', ascending=False)
-        print(aerial_dominator_ratings[['Player', 'Team', 'League', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker']].head(20).to_string())
-        
-        print("\nTop 20 per rating Lethal Striker:")
-        lethal_striker_ratings = final_ratings.sort_values('Lethal_Striker', ascending=False)
-        print(lethal_striker_ratings[['Player', 'Team', 'League', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker']].head(20).to_string())
-    else:
-        print("Nessun dato trovato per l'analisi")
+    """Funzione principale per analizzare tutte le leghe e generare 'striker_ratings_complete.csv'"""
+    run_roles(['striker'])
+
 
-# Esegui il codice
 if __name__ == "__main__":
-    main() 
+    main()
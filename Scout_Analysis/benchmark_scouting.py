@@ -0,0 +1,375 @@
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from pages.Scout_Analysis import kpi_matrix, rating_store, scout_query, scout_utils
+from pages.Scout_Analysis.profile_weights import load_profile_weights
+from pages.Scout_Analysis.rating_store import RATING_FILES, RatingStore
+from pages.Scout_Analysis.scout_query import build_filter_spec
+from pages.Scout_Analysis.scout_utils import POSITION_ROLES, PlayerIndex, get_team_filepath
+
+# CSV dei profili accanto a questo file (stesso file di profile_weights.PROFILES_FILE;
+# un altro percorso si indica con --profiles)
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profili_scout_analysis_finale_corretti.csv')
+
+# Scale dei dataset sintetici: moltiplicatore dei giocatori per squadra e ruolo
+SCALES = [1, 10, 100]
+
+# Dataset a scala 1: 7 leghe x 20 squadre x 7 ruoli x 3 giocatori (2940 giocatori,
+# l'ordine di grandezza dei file reali). Serie_A, MLS e Primeira_Liga hanno percorsi speciali
+LEAGUES = ['Serie_A', 'EPL', 'La_Liga', 'Bundesliga', 'Ligue_1', 'Primeira_Liga', 'MLS']
+TEAMS_PER_LEAGUE = 20
+PLAYERS_PER_TEAM = 3
+
+# Ripetizioni di ogni combinazione dopo la prima chiamata a cache vuote
+REPEATS = 3
+
+RESULTS_FILE = 'scouting_benchmark_results.csv'
+
+FIRST_NAMES = ['Luca', 'Marco', 'João', 'Álvaro', 'Kylian', 'Jan', 'Mohamed', 'Ángel', 'Thomas', 'Lautaro',
+               'Nicolò', 'Pedro', 'Bruno', 'Federico', 'Erling', 'Jordan', 'Kevin', 'Sergej', 'Dušan', 'Hakan']
+LAST_NAMES = ['Rossi', 'Silva', 'Müller', 'García', 'Martínez', 'Smith', 'Dubois', 'Fernandes', 'Jong', 'Barella',
+              'Núñez', 'Öztürk', 'Kovačić', 'Lopes', 'Schmidt', 'Bernardo', 'Moreau', 'Vlahović', 'Anderson', 'Costa']
+NATIONALITIES = ['Italy', 'Spain', 'Portugal', 'France', 'Germany', 'England', 'Brazil', 'Argentina', 'USA', 'Netherlands']
+FEET = ['right', 'left', 'both', None]
+
+# Combinazioni di filtri della pagina di scouting: (lega, rating minimo, valore minimo,
+# salario minimo, ricerca, età massima, piede, clausola, profilo), 'first' = primo
+# profilo della posizione, None = profilo migliore
+POSITION_FILTERS = [
+    (league, rating, 0, 0, term, None, 'all', 'all', profile)
+    for league, rating, term, profile in itertools.product(['all', 'EPL'], [0, 60], ['', 'an'], [None, 'first'])
+] + [
+    ('all', 0, 5, 0, '', None, 'all', 'all', None),
+    ('all', 0, 0, 1, '', 25, 'all', 'all', None),
+    ('La_Liga', 0, 0, 0, '', None, 'left', 'all', 'first'),
+    ('all', 50, 0, 0, '', 30, 'right', 'with_clause', None),
+]
+VALVERDE_FILTERS = [('all', 0, 0, 0, term, None, 'all', 'all', None) for term in ['', 'an']]
+POSITION_PAGES = [1, 3]
+
+# Filtri della pagina dei giocatori simili: (lega, età massima, valore massimo in milioni, risultati)
+SIMILAR_FILTERS = [('all', None, None, 5), ('all', 25, None, 10), ('EPL', None, 20, 5), ('La_Liga', 30, 50, 10)]
+SIMILAR_PLAYERS_PER_ROLE = 4
+
+# Coppie di giocatori confrontate per ogni profilo
+COMPARISON_PAIRS_PER_PROFILE = 3
+
+
+@contextmanager
+def _quiet():
+    """Silenzia i print dei callback durante le misure."""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        yield
+
+
+def _format_currency(values, decimals):
+    """Come enrich_ratings.format_currency: '€3.000.000', '€1.670.000.00'; '' per 0."""
+    return [f"€{value:,.{decimals}f}".replace(',', '.') if value > 0 else '' for value in values]
+
+
+def _player_names(rng, count, start):
+    first = rng.choice(FIRST_NAMES, count)
+    last = rng.choice(LAST_NAMES, count)
+    return [f"{f} {l} {start + i}" for i, (f, l) in enumerate(zip(first, last))]
+
+
+def _rating_frame(rng, role, profiles, scale, start):
+    """Giocatori sintetici di un ruolo su tutte le leghe, con le colonne dei file *_complete_en.csv."""
+    per_team = PLAYERS_PER_TEAM * scale
+    teams = [(league, f"{league} Team {i:02d}") for league in LEAGUES for i in range(TEAMS_PER_LEAGUE)]
+    count = len(teams) * per_team
+    df = pd.DataFrame({
+        'Player_ID': np.arange(start, start + count),
+        'Player': _player_names(rng, count, start),
+        'Team': np.repeat([team for _, team in teams], per_team),
+        'League': np.repeat([league for league, _ in teams], per_team),
+    })
+    for profile in profiles:
+        df[profile] = rng.uniform(20, 95, count).round(2)
+    df['Age'] = rng.integers(17, 38, count)
+    df['Nationality'] = rng.choice(NATIONALITIES, count)
+    df['Height'] = [f"1,{h}m" for h in rng.integers(65, 99, count)]
+    df['Foot'] = rng.choice(np.array(FEET, dtype=object), count)
+    df['Market Value'] = _format_currency(rng.lognormal(15, 1.2, count).round(-5), 0)
+    df['Contract Until'] = [f"30/06/{year}" for year in rng.integers(2025, 2031, count)]
+    df['Position'] = role.title()
+    df['Annual Salary'] = _format_currency(rng.lognormal(13.5, 1.0, count).round(-3), 2)
+    clauses = rng.lognormal(17, 1.0, count).round(-5) * (rng.random(count) < 0.3)
+    df['Release Clause'] = _format_currency(clauses, 0)
+    return df
+
+
+def _valverde_frame(rng, midfielders, profiles):
+    df = midfielders[['Player', 'Team', 'League']].copy()
+    ratings = midfielders[profiles].to_numpy()
+    top = np.argsort(-ratings, axis=1)[:, :3]
+    df['Valverde_Score'] = rng.uniform(60, 99, len(df)).round(1)
+    df['Top_3_Profiles'] = [', '.join(profiles[i] for i in row) for row in top]
+    df['Top_3_Ratings'] = [', '.join(f"{r:.1f}" for r in np.sort(row)[::-1][:3]) for row in ratings]
+    df['Number_of_High_Ratings'] = (ratings >= 70).sum(axis=1)
+    return df
+
+
+def check_profiles_file(profiles_file):
+    """Errore esplicito se manca il CSV dei profili, da cui vengono generati i KPI."""
+    if not os.path.isfile(profiles_file):
+        raise FileNotFoundError(
+            f"CSV dei profili non trovato: {profiles_file}. Il benchmark genera i KPI dai pesi dei "
+            f"profili: copia {os.path.basename(PROFILES_FILE)} accanto a questo script o "
+            f"indicane il percorso con --profiles."
+        )
+
+
+def generate_dataset(base_path, scale, seed=0, profiles_file=PROFILES_FILE):
+    """
+    Genera in base_path i file di rating di tutte le posizioni e i file squadra
+    FBRef (colonna 'Jugador' e tutti i KPI dei profili) per il moltiplicatore
+    scale. Restituisce posizione -> DataFrame dei rating generati.
+    """
+    check_profiles_file(profiles_file)
+    rng = np.random.default_rng(seed)
+    weights = load_profile_weights(profiles_file)
+    all_kpis = list(dict.fromkeys(kpi for role_weights in weights.values() for kpi in role_weights.kpis))
+
+    frames, start = {}, 1
+    for position, role in POSITION_ROLES.items():
+        frames[position] = _rating_frame(rng, role, weights[role].profiles, scale, start)
+        start += len(frames[position])
+    frames['valverde'] = _valverde_frame(rng, frames['midfielder'], weights['MIDFIELDER'].profiles)
+
+    for position, df in frames.items():
+        df.to_csv(os.path.join(base_path, RATING_FILES[position]), index=False)
+    # I profili servono anche a load_profiles_by_position, che li cerca sotto BASE_PATH
+    profiles_dir = os.path.join(base_path, 'pages', 'Scout_Analysis')
+    os.makedirs(profiles_dir, exist_ok=True)
+    shutil.copy(profiles_file, os.path.join(profiles_dir, os.path.basename(PROFILES_FILE)))
+
+    # File squadra FBRef con i giocatori di tutti i ruoli, nei percorsi di get_team_filepath
+    players = pd.concat([df[['Player', 'Team', 'League']] for position, df in frames.items() if position != 'valverde'])
+    for (team, league), group in players.groupby(['Team', 'League'], sort=False):
+        path = os.path.join(base_path, os.path.relpath(get_team_filepath({'Team': team, 'League': league}),
+                                                       scout_utils.BASE_PATH))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        kpis = pd.DataFrame(rng.uniform(0, 100, (len(group), len(all_kpis))).round(2), columns=all_kpis)
+        kpis.insert(0, 'Jugador', group['Player'].to_numpy())
+        kpis.to_csv(path, index=False)
+    return frames
+
+
+def use_dataset(base_path):
+    """
+    Punta i moduli di Scout_Analysis sui file in base_path: store dei rating
+    costruito qui e iniettato senza start() (nessun thread di refresh), indice
+    dei giocatori e matrici KPI; svuota le cache.
+    """
+    scout_utils.BASE_PATH = base_path
+    kpi_matrix.BASE_PATH = base_path
+    with _quiet():
+        rating_store._store = RatingStore(base_path=base_path).load()
+    scout_utils._player_index = PlayerIndex(base_path=base_path)
+    clear_caches()
+
+
+def clear_caches():
+    """Svuota le cache delle query e delle matrici KPI (lo store resta caricato)."""
+    scout_query._cache.clear()
+    kpi_matrix._matrices.clear()
+    kpi_matrix._tables.clear()
+
+
+class _CallbackRecorder:
+    """Sostituto di app.callback / dash.callback che conserva le funzioni registrate per nome."""
+
+    def __init__(self):
+        self.functions = {}
+
+    def callback(self, *args, **kwargs):
+        def register(func):
+            self.functions[func.__name__] = func
+            return func
+        return register
+
+
+def load_callbacks():
+    """
+    Funzioni dei callback di scouting e dei giocatori simili, senza un'app Dash.
+    Va chiamata dopo use_dataset: register_callbacks carica lo store dei rating,
+    che altrimenti verrebbe creato (e avviato) sui file di produzione.
+    """
+    if rating_store._store is None:
+        raise RuntimeError("Chiamare use_dataset prima di load_callbacks")
+    from pages.Scout_Analysis import scout_analysis, similar_players
+
+    recorder = _CallbackRecorder()
+    scout_analysis.register_callbacks(recorder)
+    dash_callback = similar_players.callback
+    similar_players.callback = recorder.callback
+    try:
+        similar_players.register_callbacks(recorder)
+    finally:
+        similar_players.callback = dash_callback
+    return recorder.functions
+
+
+def build_scenarios(frames, callbacks, profiles_file=PROFILES_FILE):
+    """Scenario -> lista di chiamate (funzione senza argomenti) con le combinazioni di filtri."""
+    from pages.Scout_Analysis.player_comparison import calculate_percentiles
+    from pages.Scout_Analysis.scout_analysis import create_position_section
+
+    rng = np.random.default_rng(1)
+    weights = load_profile_weights(profiles_file)
+    positions = list(POSITION_ROLES) + ['valverde']
+
+    position_calls, pagination_calls = [], []
+    for position in positions:
+        profiles = weights[POSITION_ROLES[position]].profiles if position in POSITION_ROLES else [None]
+        search = f"?position={position}"
+        # Il Valverde Score ha solo la ricerca per nome e una sola pagina
+        filters = POSITION_FILTERS if position != 'valverde' else VALVERDE_FILTERS
+        pages = POSITION_PAGES if position != 'valverde' else POSITION_PAGES[:1]
+        for league, rating, market_value, salary, term, age, foot, clause, profile in filters:
+            profile = profiles[0] if profile == 'first' else None
+            args = (search, league, rating, market_value, salary, term, age, foot, 'all', clause, profile)
+            spec = build_filter_spec(*args)
+            for page in pages:
+                position_calls.append(lambda spec=spec, page=page: create_position_section(spec, page))
+                pagination_calls.append(lambda args=args, page=page: callbacks['update_pagination_controls'](*args, {'page': page}))
+
+    similar = callbacks['find_and_display_similar_players']
+    similar_calls = []
+    for position in POSITION_ROLES:
+        # Il menu dei giocatori simili passa il Player_ID
+        for player_id in rng.choice(frames[position]['Player_ID'], SIMILAR_PLAYERS_PER_ROLE, replace=False):
+            for league, age, market_value, results in SIMILAR_FILTERS:
+                similar_calls.append(lambda args=(int(player_id), league, age, market_value, results): similar(*args))
+
+    percentile_calls = []
+    for position, role in POSITION_ROLES.items():
+        for profile, kpis in weights[role].profile_kpis.items():
+            for p1, p2 in rng.choice(frames[position]['Player'], (COMPARISON_PAIRS_PER_PROFILE, 2), replace=False):
+                percentile_calls.append(lambda args=(p1, p2, role, kpis): calculate_percentiles(*args))
+
+    return {
+        'create_position_section': position_calls,
+        'update_pagination_controls': pagination_calls,
+        'find_and_display_similar_players': similar_calls,
+        'calculate_percentiles': percentile_calls,
+    }
+
+
+def time_calls(calls, repeats=REPEATS):
+    """Latenze in ms: (prima chiamata di ogni combinazione, chiamate ripetute)."""
+    cold, warm = [], []
+    with _quiet():
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            cold.append((time.perf_counter() - start) * 1000)
+        for _ in range(repeats):
+            for call in calls:
+                start = time.perf_counter()
+                call()
+                warm.append((time.perf_counter() - start) * 1000)
+    return np.array(cold), np.array(warm)
+
+
+def peak_memory(calls):
+    """Picco di memoria allocata (MB, tracemalloc) per una passata a cache vuote su tutte le chiamate."""
+    clear_caches()
+    tracemalloc.start()
+    try:
+        with _quiet():
+            for call in calls:
+                call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def run_benchmark(scales=SCALES, repeats=REPEATS, data_dir=None, profiles_file=PROFILES_FILE):
+    """
+    Esegue il benchmark per ogni scala e restituisce un DataFrame con, per
+    callback e scala, numero di chiamate, p50/p95 a cache vuote e ripetute e
+    picco di memoria. I dati sintetici vengono generati in data_dir (una cartella
+    temporanea eliminata alla fine se None).
+    """
+    check_profiles_file(profiles_file)
+    callbacks = None
+    root = data_dir or tempfile.mkdtemp(prefix='scout_benchmark_')
+    rows = []
+    try:
+        for scale in scales:
+            base_path = os.path.join(root, f"scale_{scale}x")
+            os.makedirs(base_path, exist_ok=True)
+            start = time.perf_counter()
+            frames = generate_dataset(base_path, scale, profiles_file=profiles_file)
+            players = sum(len(df) for position, df in frames.items() if position != 'valverde')
+            print(f"\n=== Scala {scale}x: {players} giocatori generati in {time.perf_counter() - start:.1f}s ===")
+
+            use_dataset(base_path)
+            if callbacks is None:
+                callbacks = load_callbacks()
+            for scenario, calls in build_scenarios(frames, callbacks, profiles_file).items():
+                clear_caches()
+                cold, warm = time_calls(calls, repeats)
+                peak = peak_memory(calls)
+                rows.append({
+                    'scale': f"{scale}x", 'players': players, 'callback': scenario, 'calls': len(calls),
+                    'cold_p50_ms': np.percentile(cold, 50), 'cold_p95_ms': np.percentile(cold, 95),
+                    'warm_p50_ms': np.percentile(warm, 50) if len(warm) else np.nan,
+                    'warm_p95_ms': np.percentile(warm, 95) if len(warm) else np.nan,
+                    'peak_mb': peak
+                })
+                print(f"{scenario}: cold p50 {rows[-1]['cold_p50_ms']:.2f}ms p95 {rows[-1]['cold_p95_ms']:.2f}ms, "
+                      f"warm p50 {rows[-1]['warm_p50_ms']:.2f}ms p95 {rows[-1]['warm_p95_ms']:.2f}ms, "
+                      f"peak {peak:.1f}MB")
+    finally:
+        if data_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return pd.DataFrame(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dei callback di scouting su dati sintetici multi-lega.")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, metavar='N',
+                        help="moltiplicatori dei giocatori per squadra e ruolo (default: %(default)s)")
+    parser.add_argument('--repeats', type=int, default=REPEATS,
+                        help="ripetizioni a cache calde di ogni combinazione (default: %(default)s)")
+    parser.add_argument('--profiles', default=PROFILES_FILE,
+                        help="CSV dei profili (default: accanto a questo script)")
+    parser.add_argument('--data-dir',
+                        help="cartella in cui generare e conservare i dati sintetici (default: temporanea)")
+    parser.add_argument('--output',
+                        help=f"CSV dei risultati (default: {RESULTS_FILE} nella cartella dei dati, "
+                             f"o accanto a questo script se i dati sono temporanei)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Benchmark alle scale indicate con --scales (default 1x, 10x, 100x)."""
+    args = parse_args(argv)
+    try:
+        check_profiles_file(args.profiles)
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+    output = args.output or os.path.join(args.data_dir or os.path.dirname(os.path.abspath(__file__)), RESULTS_FILE)
+
+    results = run_benchmark(args.scales, args.repeats, args.data_dir, args.profiles)
+    print("\n=== Riepilogo ===")
+    print(results.round(2).to_string(index=False))
+    results.to_csv(output, index=False)
+    print(f"\nRisultati salvati in '{output}'")
+
+
+if __name__ == "__main__":
+    main()
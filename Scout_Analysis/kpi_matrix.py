@@ -0,0 +1,251 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pages.csv_cache import read_csv_cached
+from pages.Scout_Analysis.scout_utils import BASE_PATH, get_team_filepath
+
+# Ruolo (come restituito da get_player_info) -> chiave del file di rating
+ROLE_FILE_KEYS = {
+    'GOALKEEPER': 'goalkeeper', 'CENTRE BACK': 'centreback', 'FULLBACK': 'fullback',
+    'MIDFIELDER': 'midfielder', 'ATTACKING MIDFIELDER': 'attacking_midfielder',
+    'WINGER': 'winger', 'STRIKER': 'striker'
+}
+
+
+def role_file_path(role):
+    """Percorso del file di rating di un ruolo."""
+    key = ROLE_FILE_KEYS.get(role, role.lower().replace(' ', ''))
+    return os.path.join(BASE_PATH, f"{key}_ratings_complete_en.csv")
+
+
+def percentile_table_path(role):
+    """Percorso della tabella dei percentili generata da Rating_players_2025/build_kpi_percentiles.py."""
+    key = ROLE_FILE_KEYS.get(role, role.lower().replace(' ', ''))
+    return os.path.join(BASE_PATH, f"{key}_kpi_percentiles.csv")
+
+
+def percentile_sources_path(role):
+    """Firme dei file (rating e squadre) da cui è stata generata la tabella dei percentili."""
+    return os.path.splitext(percentile_table_path(role))[0] + '.sources.json'
+
+
+def league_column(kpi):
+    """Colonna della tabella con il percentile del KPI all'interno della lega (ruolo + lega)."""
+    return f"{kpi} (League)"
+
+
+def rank_percentiles(sorted_values, scores):
+    """
+    Percentili di scores rispetto alla popolazione ordinata sorted_values,
+    equivalenti a scipy.stats.percentileofscore(kind='rank').
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return np.zeros(len(scores))
+    left = np.searchsorted(sorted_values, scores, side='left')
+    right = np.searchsorted(sorted_values, scores, side='right')
+    return (left + right + (right > left)) * 50.0 / n
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+    except OSError:
+        return None
+
+
+def team_key(team):
+    """Squadra come chiave delle righe (stringa vuota se mancante)."""
+    return team if isinstance(team, str) else ''
+
+
+def _team_filepath(peer):
+    try:
+        return get_team_filepath(peer)
+    except AttributeError:
+        # Team o League mancanti (NaN)
+        return None
+
+
+def _to_numeric(values):
+    """Come get_raw_kpi_data: virgola decimale accettata, valori non numerici o mancanti -> 0.0"""
+    if values.dtype == object:
+        values = values.astype(str).str.replace(',', '.', regex=False)
+    return pd.to_numeric(values, errors='coerce').fillna(0.0).to_numpy(dtype='float64')
+
+
+class RoleKpiMatrix:
+    """
+    Valori FBRef di tutti i giocatori di un ruolo, una riga per giocatore del
+    file di rating (stesso ordine). Ogni file squadra viene letto una sola volta.
+    """
+
+    def __init__(self, role_file):
+        self.role_file = role_file
+        self.role_signature = _file_signature(role_file)
+        df_role = read_csv_cached(role_file, sep=None)
+        df_role = df_role.reset_index(drop=True)
+        self.players = df_role['Player']
+        self.teams = df_role['Team'] if 'Team' in df_role.columns else pd.Series(np.nan, index=df_role.index)
+        self.leagues = df_role['League'] if 'League' in df_role.columns else pd.Series(np.nan, index=df_role.index)
+
+        team_paths = [_team_filepath(peer) for _, peer in df_role.iterrows()]
+        self.signatures = {path: _file_signature(path) for path in set(team_paths) if path}
+
+        rows = pd.DataFrame({'Player': self.players, '_path': team_paths})
+        parts = []
+        for path, group in rows.groupby('_path', sort=False):
+            if not os.path.exists(path):
+                continue
+            try:
+                df_team = read_csv_cached(path)
+                player_col = 'Jugador' if 'Jugador' in df_team.columns else 'Player'
+                # Come get_raw_kpi_data: vale la prima riga del giocatore nel file squadra
+                df_team = df_team.drop_duplicates(subset=player_col).set_index(player_col)
+            except Exception as e:
+                print(f"[KpiMatrix] Error reading {path}: {e}")
+                continue
+            matched = df_team.reindex(group['Player'].to_numpy())
+            matched.index = group.index
+            parts.append(matched)
+
+        self.raw = pd.concat(parts).reindex(rows.index) if parts else pd.DataFrame(index=rows.index)
+        self._first_row = {}
+        self._first_team_row = {}
+        for idx, name, team in zip(self.players.index, self.players, self.teams):
+            self._first_row.setdefault(name, idx)
+            self._first_team_row.setdefault((name, team_key(team)), idx)
+        self._values = {}
+        self._sorted = {}
+
+    def is_stale(self):
+        """True se il file di rating o uno dei file squadra è cambiato su disco."""
+        return (_file_signature(self.role_file) != self.role_signature or
+                any(_file_signature(path) != sig for path, sig in self.signatures.items()))
+
+    def values(self, kpi):
+        """Valori numerici di un KPI per tutti i giocatori del ruolo (0.0 se mancante)."""
+        if kpi not in self._values:
+            if kpi in self.raw.columns:
+                values = _to_numeric(self.raw[kpi])
+            else:
+                values = np.zeros(len(self.raw))
+            self._values[kpi] = values
+        return self._values[kpi]
+
+    def sorted_values(self, kpi):
+        if kpi not in self._sorted:
+            self._sorted[kpi] = np.sort(self.values(kpi))
+        return self._sorted[kpi]
+
+    def sources(self):
+        """Firme del file di rating e dei file squadra usati, salvabili in JSON."""
+        return {'role_file': [self.role_file, self.role_signature],
+                'team_files': sorted([path, sig] for path, sig in self.signatures.items())}
+
+    def player_values(self, player_name, kpis, team=None):
+        """
+        Valori dei KPI di un giocatore: la riga del giocatore nella squadra
+        indicata, o la prima occorrenza del nome nel file di rating se team è
+        None o non corrisponde a nessuna riga.
+        """
+        idx = self._first_team_row.get((player_name, team_key(team))) if team is not None else None
+        if idx is None:
+            idx = self._first_row.get(player_name)
+        if idx is None:
+            return {kpi: 0.0 for kpi in kpis}
+        return {kpi: float(self.values(kpi)[idx]) for kpi in kpis}
+
+    def percentiles(self, player_name, kpis, team=None):
+        """
+        Percentili del giocatore rispetto a tutti i pari ruolo, equivalenti a
+        scipy.stats.percentileofscore(kind='rank'), calcolati con searchsorted.
+        """
+        raw = self.player_values(player_name, kpis, team)
+        return [float(rank_percentiles(self.sorted_values(kpi), [raw[kpi]])[0]) for kpi in kpis]
+
+
+_matrices = {}
+_matrices_lock = threading.Lock()
+
+
+def get_role_kpi_matrix(role):
+    """Matrice KPI di un ruolo, ricostruita solo quando i file sorgente cambiano."""
+    role_file = role_file_path(role)
+    matrix = _matrices.get(role_file)
+    if matrix is None or matrix.is_stale():
+        with _matrices_lock:
+            matrix = _matrices.get(role_file)
+            if matrix is None or matrix.is_stale():
+                matrix = RoleKpiMatrix(role_file)
+                _matrices[role_file] = matrix
+    return matrix
+
+
+_tables = {}
+
+
+def save_percentile_sources(role, matrix):
+    """Salva accanto alla tabella dei percentili le firme dei file usati da matrix."""
+    with open(percentile_sources_path(role), 'w', encoding='utf-8') as f:
+        json.dump(matrix.sources(), f)
+
+
+def _sources_changed(sources_path):
+    """True se manca il file delle firme o se il file di rating o un file squadra è cambiato."""
+    try:
+        with open(sources_path, 'r', encoding='utf-8') as f:
+            sources = json.load(f)
+    except (OSError, ValueError):
+        return True
+    entries = [sources['role_file']] + sources['team_files']
+    return any(_file_signature(path) != (tuple(sig) if sig is not None else None) for path, sig in entries)
+
+
+def _load_percentile_table(role):
+    path = percentile_table_path(role)
+    signature = _file_signature(path)
+    # Tabella assente, senza firme o generata da file di rating/squadre poi cambiati
+    if signature is None or _sources_changed(percentile_sources_path(role)):
+        return None
+    cached = _tables.get(path)
+    if cached is None or cached[0] != signature:
+        table = read_csv_cached(path)
+        table['Team'] = table['Team'].map(team_key)
+        table = table.drop_duplicates(subset=['Player', 'Team'])
+        first_rows = table.drop_duplicates(subset='Player').set_index('Player')
+        cached = (signature, (table.set_index(['Player', 'Team']), first_rows))
+        _tables[path] = cached
+    return cached[1]
+
+
+def lookup_percentiles(role, player_name, kpis, scope='role', team=None):
+    """
+    Percentili precalcolati di un giocatore (scope 'role' o 'league'), per
+    giocatore e squadra (prima occorrenza del nome se team è None).
+    Restituisce None se la tabella non è disponibile o non copre giocatore e KPI.
+    """
+    try:
+        tables = _load_percentile_table(role)
+    except Exception as e:
+        print(f"[KpiMatrix] Error reading percentile table for {role}: {e}")
+        return None
+    if tables is None:
+        return None
+    table, first_rows = tables
+    if team is None:
+        table, key = first_rows, player_name
+    else:
+        key = (player_name, team_key(team))
+    if key not in table.index:
+        return None
+    columns = list(kpis) if scope == 'role' else [league_column(kpi) for kpi in kpis]
+    if any(col not in table.columns for col in columns):
+        return None
+    values = table.loc[key, columns].to_numpy(dtype='float64')
+    return [float(v) for v in np.nan_to_num(values)]
@@ -16,8 +16,8 @@ from fpdf import FPDF
 from dash.exceptions import PreventUpdate
 import random
 import numpy as np
-from scipy.stats import percentileofscore
 import plotly.io as pio
+from pages.csv_cache import read_csv_cached
 
 # Importazioni dal nuovo file di utilità
 from pages.Scout_Analysis.scout_utils import (
@@ -27,8 +27,11 @@ from pages.Scout_Analysis.scout_utils import (
     load_all_player_data_for_dropdown,
     load_profiles_by_position,
     get_player_info,
-    get_player_data
+    get_player_data,
+    get_team_filepath
 )
+from pages.Scout_Analysis.kpi_matrix import get_role_kpi_matrix, lookup_percentiles
+from pages.Scout_Analysis.profile_weights import get_profile_kpis
 
 # Caricamento dati condivisi
 PLAYER_OPTIONS = load_all_player_data_for_dropdown()
@@ -395,7 +398,7 @@ def register_callbacks(app):
             if not os.path.exists(file_path):
                 return [], [], True, True, None, None
 
-            df = pd.read_csv(file_path, sep=';' if ';' in open(file_path).read(1024) else ',')
+            df = read_csv_cached(file_path, sep=None)
             
             # Filtra i giocatori che hanno un rating valido per quel profilo
             if selected_profile in df.columns:
@@ -438,53 +441,13 @@ def register_callbacks(app):
         return card1, card2, radar_fig, stats_table
 
 def get_kpis_for_profile(profile_name):
-    """Gets the list of KPIs for a specific profile from the CSV."""
-    profiles_path = os.path.join(BASE_PATH, 'pages/Scout_Analysis/profili_scout_analysis_finale_corretti.csv')
+    """Gets the list of KPIs for a specific profile from the profiles CSV."""
     try:
-        df = pd.read_csv(profiles_path, sep=';', encoding='utf-8')
-        df.columns = [col.strip() for col in df.columns]
-        
-        df['PROFILO'] = df['PROFILO'].ffill()
-        
-        # FIX: Normalize the incoming profile name to match CSV format (with spaces)
-        profile_name_with_spaces = profile_name.replace('_', ' ')
-        
-        profile_group = df[df['PROFILO'] == profile_name_with_spaces]
-        
-        if profile_group.empty:
-            return []
-
-        kpi_con = profile_group['KPI CON PALLA'].dropna().tolist()
-        kpi_senza = profile_group['KPI SENZA PALLA'].dropna().tolist()
-        
-        all_kpis = [kpi.strip() for kpi in kpi_con + kpi_senza if isinstance(kpi, str) and kpi.strip()]
-        
-        return list(dict.fromkeys(all_kpis)) # Remove duplicates while preserving order
+        return get_profile_kpis(profile_name)
     except Exception as e:
         print(f"Error loading KPIs for profile {profile_name}: {e}")
         return []
 
-def get_team_filepath(player_info):
-    """Constructs the filepath to the team's FBRef CSV."""
-    if player_info is None or 'Team' not in player_info or 'League' not in player_info:
-        return None
-    
-    team = player_info['Team'].replace(' ', '_')
-    league = player_info['League'].replace(' ', '_')
-
-    # Handle special league paths
-    if league == 'Serie_A':
-        return os.path.join(BASE_PATH, 'pages', 'data_serie_a_24-25', f"{team}.csv")
-    elif league == 'MLS':
-        return os.path.join(BASE_PATH, 'pages', 'MLS', 'data_MLS_24', f"{team}.csv")
-    elif league == 'Primeira_Liga':
-         return os.path.join(BASE_PATH, 'pages', 'Primeira_Liga', 'data_primeira_liga_24-25', f"{team}.csv")
-
-    # Generic path for other leagues
-    league_lower = league.lower()
-    return os.path.join(BASE_PATH, 'pages', league, f"data_{league_lower}_24-25", f"{team}.csv")
-
-
 def get_raw_kpi_data(player_name, player_info, kpis):
     """Gets raw KPI values for a player from their team file, ensuring they are numeric."""
     filepath = get_team_filepath(player_info)
@@ -492,7 +455,7 @@ def get_raw_kpi_data(player_name, player_info, kpis):
         return {kpi: 0.0 for kpi in kpis}
 
     try:
-        df_team = pd.read_csv(filepath)
+        df_team = read_csv_cached(filepath)
         player_col = 'Jugador' if 'Jugador' in df_team.columns else 'Player'
         
         player_row = df_team[df_team[player_col] == player_name]
@@ -520,26 +483,24 @@ def get_raw_kpi_data(player_name, player_info, kpis):
         return {kpi: 0.0 for kpi in kpis}
 
 
-def calculate_percentiles(player1_name, player2_name, role, kpis):
-    """Calculates on-the-fly percentiles for two players against their peers."""
-    role_file = os.path.join(BASE_PATH, f"{role.lower().replace(' ', '')}_ratings_complete_en.csv")
-    df_role = pd.read_csv(role_file, sep=';' if ';' in open(role_file).read(1024) else ',')
-
-    all_kpi_values = {kpi: [] for kpi in kpis}
+def _player_team(player_name):
+    _, player_data = get_player_info(player_name)
+    return player_data.get('Team') if player_data is not None else None
 
-    # Gather data for all players in that role
-    for _, peer_row in df_role.iterrows():
-        peer_name = peer_row['Player']
-        peer_kpi_values = get_raw_kpi_data(peer_name, peer_row, kpis)
-        for kpi in kpis:
-            all_kpi_values[kpi].append(peer_kpi_values[kpi])
-            
-    p1_raw = get_raw_kpi_data(player1_name, df_role[df_role['Player'] == player1_name].iloc[0], kpis)
-    p2_raw = get_raw_kpi_data(player2_name, df_role[df_role['Player'] == player2_name].iloc[0], kpis)
-    
-    p1_percentiles = [percentileofscore(all_kpi_values[kpi], p1_raw[kpi]) for kpi in kpis]
-    p2_percentiles = [percentileofscore(all_kpi_values[kpi], p2_raw[kpi]) for kpi in kpis]
-    
+def calculate_percentiles(player1_name, player2_name, role, kpis):
+    """
+    Percentiles for two players against their peers. Players are matched by
+    name and team (the team of the row get_player_info returns). Values come
+    from the precomputed percentile table when it is up to date, otherwise
+    from the cached role KPI matrix.
+    """
+    team1, team2 = _player_team(player1_name), _player_team(player2_name)
+    p1_percentiles = lookup_percentiles(role, player1_name, kpis, team=team1)
+    p2_percentiles = lookup_percentiles(role, player2_name, kpis, team=team2)
+    if p1_percentiles is None or p2_percentiles is None:
+        matrix = get_role_kpi_matrix(role)
+        p1_percentiles = matrix.percentiles(player1_name, kpis, team1)
+        p2_percentiles = matrix.percentiles(player2_name, kpis, team2)
     return p1_percentiles, p2_percentiles
 
 
@@ -619,7 +580,7 @@ def get_fbref_stats(player_info):
         return default_stats
 
     try:
-        df_team = pd.read_csv(filepath)
+        df_team = read_csv_cached(filepath)
         player_col = 'Jugador' if 'Jugador' in df_team.columns else 'Player'
         
         player_row = df_team[df_team[player_col] == player_info['Player']]
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import unicodedata
+
+import pandas as pd
+
+BASE_PATH = "/Users/federico/dash_project"
+REGISTRY_FILE = os.path.join(BASE_PATH, 'player_registry.json')
+
+# Fonti dei nomi registrati come alias
+ALIAS_SOURCES = ('fbref', 'transfermarkt', 'capology')
+
+
+def name_key(name):
+    """Chiave di ricerca di un nome: senza accenti, minuscolo, spazi uniformati; None se non è una stringa."""
+    if not isinstance(name, str):
+        return None
+    text = ''.join(c for c in unicodedata.normalize('NFD', name) if not unicodedata.combining(c))
+    return ' '.join(text.lower().split()) or None
+
+
+class PlayerRegistry:
+    """
+    Registro persistente dei giocatori condiviso da rating e arricchimento (la
+    UI usa la colonna Player_ID che questi scrivono nei file di rating).
+
+    Ogni giocatore ha un id intero stabile (mai riusato), il nome canonico
+    (FBRef), squadra, lega, ruoli e gli alias per fonte (FBRef, Transfermarkt,
+    Capology). Un nome viene risolto per (chiave del nome, squadra), poi per la
+    sola chiave del nome se corrisponde a un unico giocatore: così un
+    trasferimento aggiorna la squadra senza cambiare l'id. In register il
+    fallback sul solo nome esclude i giocatori già registrati nella stessa
+    sessione, per non fondere due omonimi di squadre diverse.
+    """
+
+    def __init__(self, path=REGISTRY_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.next_id = data.get('next_id', 1)
+        self.players = {int(player_id): entry for player_id, entry in data.get('players', {}).items()}
+        self._lock = threading.RLock()
+        self._registered = set()
+        self._reindex()
+
+    def _reindex(self):
+        self._by_team = {}
+        self._by_name = {}
+        for player_id, entry in self.players.items():
+            self._index(player_id, entry)
+
+    @staticmethod
+    def _keys(entry):
+        names = [entry['name']] + [alias for aliases in entry['aliases'].values() for alias in aliases]
+        return {name_key(name) for name in names} - {None}
+
+    def _index(self, player_id, entry):
+        for key in self._keys(entry):
+            team_ids = self._by_team.setdefault((key, entry['team']), [])
+            if player_id not in team_ids:
+                team_ids.append(player_id)
+            self._by_name.setdefault(key, set()).add(player_id)
+
+    def _unindex(self, player_id, entry):
+        for key in self._keys(entry):
+            team_ids = self._by_team.get((key, entry['team']), [])
+            if player_id in team_ids:
+                team_ids.remove(player_id)
+
+    def lookup(self, name, team=None, league=None, exclude=(), by_name=True):
+        """
+        Id del giocatore: per alias e squadra (e lega, se indicata), poi (se
+        by_name) per solo alias se corrisponde a un unico giocatore; None se non
+        registrato.
+        """
+        key = name_key(name)
+        if key is None:
+            return None
+        team_ids = [player_id for player_id in self._by_team.get((key, team), ())
+                    if league is None or self.players[player_id]['league'] == league]
+        if team_ids:
+            return team_ids[0]
+        if not by_name:
+            return None
+        candidates = [player_id for player_id in self._by_name.get(key, ()) if player_id not in exclude]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def register(self, name, team, league=None, role=None, aliases=None):
+        """
+        Registra un giocatore (o aggiorna quello esistente) e restituisce il suo id.
+        aliases: fonte -> nome, aggiunti agli alias del giocatore.
+        """
+        if name_key(name) is None:
+            return None
+        with self._lock:
+            player_id = self.lookup(name, team, league, exclude=self._registered)
+            if player_id is None:
+                player_id = self.next_id
+                self.next_id += 1
+                entry = {'name': name, 'team': team, 'league': league, 'roles': [], 'aliases': {}}
+                self.players[player_id] = entry
+            else:
+                entry = self.players[player_id]
+
+            if entry['team'] != team or (league is not None and entry['league'] != league):
+                # Trasferimento: la squadra precedente non risolve più il giocatore
+                self._unindex(player_id, entry)
+                entry['team'] = team
+                entry['league'] = league if league is not None else entry['league']
+            if role is not None and role not in entry['roles']:
+                entry['roles'].append(role)
+            for source, alias in (aliases or {}).items():
+                if isinstance(alias, str) and alias not in entry['aliases'].setdefault(source, []):
+                    entry['aliases'][source].append(alias)
+
+            self._index(player_id, entry)
+            self._registered.add(player_id)
+            return player_id
+
+    def add_alias(self, player_id, source, alias):
+        """Aggiunge l'alias di una fonte a un giocatore registrato."""
+        with self._lock:
+            entry = self.players[player_id]
+            if isinstance(alias, str) and alias not in entry['aliases'].setdefault(source, []):
+                entry['aliases'][source].append(alias)
+                self._index(player_id, entry)
+
+    def assign_ids(self, df, role=None, source='fbref'):
+        """
+        Registra le righe di un file di rating (Player, Team, League) e restituisce
+        la Series degli id, allineata a df.
+        """
+        leagues = df['League'] if 'League' in df.columns else pd.Series(None, index=df.index)
+        keys = list(zip(df['Player'], df['Team'], leagues))
+        ids = {key: self.register(key[0], key[1], key[2], role, {source: key[0]}) for key in dict.fromkeys(keys)}
+        return pd.Series([ids[key] for key in keys], index=df.index, dtype='Int64')
+
+    def lookup_ids(self, names, teams, source=None):
+        """
+        Id per coppie (nome, squadra) di un'altra fonte, come Series Int64 allineata
+        a names (<NA> se non registrato). Solo per nome e squadra: il fallback sul
+        solo nome abbinerebbe un omonimo di un'altra squadra. Con source i nomi
+        risolti diventano alias.
+        """
+        pairs = list(zip(names, teams))
+        ids = {pair: self.lookup(*pair, by_name=False) for pair in dict.fromkeys(pairs)}
+        if source is not None:
+            for (name, _), player_id in ids.items():
+                if player_id is not None:
+                    self.add_alias(player_id, source, name)
+        return pd.Series([ids[pair] for pair in pairs], index=names.index, dtype='Int64')
+
+    def save(self):
+        data = {'next_id': self.next_id, 'players': {str(k): v for k, v in sorted(self.players.items())}}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
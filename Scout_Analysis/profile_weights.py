@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pages.csv_cache import CACHE_DIR_NAME
+
+BASE_PATH = "/Users/federico/dash_project"
+PROFILES_FILE = os.path.join(BASE_PATH, 'pages/Scout_Analysis/profili_scout_analysis_finale_corretti.csv')
+
+# Pesi compilati di un ruolo: profili (colonne) e KPI (righe) con le mappe nome -> indice,
+# matrice densa KPI x profili (peso del KPI normalizzato nella sua fase x peso della fase)
+# e KPI di ogni profilo (prima con palla, poi senza palla)
+RoleWeights = namedtuple('RoleWeights', ['profiles', 'profile_index', 'kpis', 'kpi_index', 'weights', 'profile_kpis'])
+
+_compiled = {}
+_profile_kpis = {}
+_lock = threading.Lock()
+
+
+def profile_key(name):
+    """Nome del profilo come nelle colonne dei file di rating ('Shot-Stopper' -> 'Shot_Stopper')."""
+    return name.strip().replace('-', '_').replace(' ', '_')
+
+
+def _parse_split(value):
+    """'80/20' -> (0.8, 0.2); None se il peso non è numerico (es. 'Variabile')."""
+    try:
+        with_ball, without_ball = (float(part) for part in str(value).split('/'))
+    except ValueError:
+        return None
+    total = with_ball + without_ball
+    return (with_ball / total, without_ball / total) if total > 0 else None
+
+
+def _phase_weights(group, kpi_column, weight_column, context):
+    kpis = group[kpi_column].astype('string').str.strip()
+    weights = pd.to_numeric(group[weight_column], errors='coerce')
+    named = kpis.notna() & (kpis != '')
+    valid = named & weights.notna()
+    for kpi, weight in zip(kpis[named & ~valid], group[weight_column][named & ~valid]):
+        print(f"[ProfileWeights] {context}: KPI '{kpi}' escluso dai pesi ({weight_column} non numerico: {weight!r})")
+    phase = {}
+    for kpi, weight in zip(kpis[valid], weights[valid]):
+        phase[kpi] = phase.get(kpi, 0.0) + float(weight)
+    total = sum(phase.values())
+    return {kpi: weight / total for kpi, weight in phase.items()} if total > 0 else {}
+
+
+def compile_profiles(path=PROFILES_FILE):
+    """
+    Legge il CSV dei profili (separatore ';', RUOLO e PROFILO riempiti in avanti)
+    e restituisce ruolo -> RoleWeights. I profili senza peso con/senza palla
+    numerico o senza KPI (es. Valverde) e i KPI senza peso numerico sono
+    esclusi, con un messaggio per ognuno.
+    """
+    df = pd.read_csv(path, sep=';', encoding='utf-8')
+    df.columns = [col.strip() for col in df.columns]
+    df['RUOLO'] = df['RUOLO'].ffill()
+    df['PROFILO'] = df['PROFILO'].ffill()
+
+    roles = {}
+    for (role, profile), group in df.groupby(['RUOLO', 'PROFILO'], sort=False):
+        context = f"{role.strip()}/{profile.strip()}"
+        splits = group['PESO CON/SENZA PALLA'].dropna()
+        split = _parse_split(splits.iloc[0]) if not splits.empty else None
+        if split is None:
+            value = splits.iloc[0] if not splits.empty else None
+            print(f"[ProfileWeights] {context}: profilo escluso (peso con/senza palla non numerico: {value!r})")
+            continue
+        with_ball = _phase_weights(group, 'KPI CON PALLA', 'PESO KPI CON', context)
+        without_ball = _phase_weights(group, 'KPI SENZA PALLA', 'PESO KPI SENZA', context)
+        if with_ball or without_ball:
+            roles.setdefault(role.strip(), []).append((profile_key(profile), split, with_ball, without_ball))
+        else:
+            print(f"[ProfileWeights] {context}: profilo escluso (nessun KPI con peso numerico)")
+
+    compiled = {}
+    for role, profiles in roles.items():
+        kpis = []
+        for _, _, with_ball, without_ball in profiles:
+            kpis.extend(kpi for kpi in list(with_ball) + list(without_ball) if kpi not in kpis)
+        kpi_index = {kpi: i for i, kpi in enumerate(kpis)}
+
+        weights = np.zeros((len(kpis), len(profiles)))
+        profile_kpis = {}
+        for col, (name, (with_weight, without_weight), with_ball, without_ball) in enumerate(profiles):
+            for kpi, weight in with_ball.items():
+                weights[kpi_index[kpi], col] += weight * with_weight
+            for kpi, weight in without_ball.items():
+                weights[kpi_index[kpi], col] += weight * without_weight
+            profile_kpis[name] = list(dict.fromkeys(list(with_ball) + list(without_ball)))
+
+        names = [name for name, _, _, _ in profiles]
+        compiled[role] = RoleWeights(names, {name: i for i, name in enumerate(names)},
+                                     kpis, kpi_index, weights, profile_kpis)
+    return compiled
+
+
+def _cache_path(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR_NAME, f"{os.path.splitext(name)[0]}.weights.json")
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _read_cache(cache_path, signature):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('source') != signature:
+        return None
+    return {
+        role: RoleWeights(entry['profiles'], {name: i for i, name in enumerate(entry['profiles'])},
+                          entry['kpis'], {kpi: i for i, kpi in enumerate(entry['kpis'])},
+                          np.array(entry['weights'], dtype='float64').reshape(len(entry['kpis']), len(entry['profiles'])),
+                          entry['profile_kpis'])
+        for role, entry in data['roles'].items()
+    }
+
+
+def _write_cache(cache_path, signature, compiled):
+    data = {
+        'source': signature,
+        'roles': {
+            role: {'profiles': rw.profiles, 'kpis': rw.kpis, 'weights': rw.weights.tolist(),
+                   'profile_kpis': rw.profile_kpis}
+            for role, rw in compiled.items()
+        }
+    }
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, cache_path)
+
+
+def load_profile_weights(path=PROFILES_FILE):
+    """
+    Pesi compilati di tutti i ruoli (ruolo -> RoleWeights). Il CSV viene
+    compilato solo quando cambia: il risultato è tenuto in memoria e salvato
+    in un JSON nella cartella di cache accanto al CSV.
+    """
+    signature = _signature(path)
+    cached = _compiled.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with _lock:
+        cached = _compiled.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        cache_path = _cache_path(path)
+        compiled = _read_cache(cache_path, signature)
+        if compiled is None:
+            compiled = compile_profiles(path)
+            try:
+                _write_cache(cache_path, signature, compiled)
+            except OSError as e:
+                print(f"[ProfileWeights] Not caching {path}: {e}")
+        _compiled[path] = (signature, compiled)
+    return compiled
+
+
+def read_profile_kpis(path=PROFILES_FILE):
+    """
+    Ruolo -> profilo -> KPI elencati nel CSV (con palla poi senza palla, senza
+    duplicati), per tutti i profili, anche quelli esclusi dai pesi compilati.
+    I profili sono indicati con profile_key.
+    """
+    df = pd.read_csv(path, sep=';', encoding='utf-8')
+    df.columns = [col.strip() for col in df.columns]
+    df['RUOLO'] = df['RUOLO'].ffill()
+    df['PROFILO'] = df['PROFILO'].ffill()
+
+    roles = {}
+    for (role, profile), group in df.groupby(['RUOLO', 'PROFILO'], sort=False):
+        kpis = group['KPI CON PALLA'].dropna().tolist() + group['KPI SENZA PALLA'].dropna().tolist()
+        kpis = [kpi.strip() for kpi in kpis if isinstance(kpi, str) and kpi.strip()]
+        profiles = roles.setdefault(role.strip(), {})
+        profiles[profile_key(profile)] = list(dict.fromkeys(profiles.get(profile_key(profile), []) + kpis))
+    return roles
+
+
+def load_profile_kpis(path=PROFILES_FILE):
+    """KPI dei profili come in read_profile_kpis, riletti solo quando il CSV cambia."""
+    signature = _signature(path)
+    cached = _profile_kpis.get(path)
+    if cached is None or cached[0] != signature:
+        cached = (signature, read_profile_kpis(path))
+        with _lock:
+            _profile_kpis[path] = cached
+    return cached[1]
+
+
+def get_profile_kpis(profile_name, path=PROFILES_FILE):
+    """
+    KPI di un profilo come nel CSV (con palla poi senza palla, senza duplicati,
+    di tutti i ruoli in cui compare); lista vuota se non definito.
+    """
+    key = profile_key(profile_name)
+    kpis = [kpi for profiles in load_profile_kpis(path).values() for kpi in profiles.get(key, [])]
+    return list(dict.fromkeys(kpis))
@@ -0,0 +1,313 @@
+import os
+import re
+import threading
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from pages.csv_cache import read_csv_cached
+from pages.Scout_Analysis.similarity import SimilarityIndex
+
+# Percorso base dei file di rating generati dagli script in Rating_players_2025
+BASE_PATH = "/Users/federico/dash_project"
+
+# Posizione -> file di rating
+RATING_FILES = {
+    'goalkeeper': 'goalkeeper_ratings_complete_en.csv',
+    'striker': 'striker_ratings_complete_en.csv',
+    'winger': 'winger_ratings_complete_en.csv',
+    'attacking_midfielder': 'attacking_midfielder_ratings_complete_en.csv',
+    'midfielder': 'midfielder_ratings_complete_en.csv',
+    'fullback': 'fullback_ratings_complete_en.csv',
+    'centreback': 'centreback_ratings_complete_en.csv',
+    'valverde': 'valverde_score_results.csv'
+}
+
+# Colonne monetarie testuali -> colonna numerica in euro aggiunta al caricamento
+MONEY_COLUMNS = {
+    'Market Value': 'Market_Value_Eur',
+    'Annual Salary': 'Annual_Salary_Eur',
+    'Release Clause': 'Release_Clause_Eur'
+}
+
+# Scadenza del contratto ('Contract Until') come data, aggiunta al caricamento
+CONTRACT_DATE_COLUMN = 'Contract_Until_Date'
+
+# Profili di rating, in ordine fisso: indice delle colonne per Max_Rating/Best_Profile
+RATING_PROFILES = [
+    'Playmaker_Keeper', 'Shot_Stopper', 'Guardian', 'Deep_Distributor', 'Enforcer',
+    'Sentinel_Fullback', 'Advanced_Wingback', 'Overlapping_Runner', 'Pivot_Master',
+    'Maestro', 'Box_to_Box', 'Diez', 'Space_Invader', 'Key_Passer', 'Creative_Winger',
+    'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker'
+]
+
+# Colonne anagrafiche, contrattuali e derivate: tutte le altre colonne sono profili di rating
+INFO_COLUMNS = {
+    'Player_ID', 'Player', 'Team', 'League', 'Age', 'Nationality', 'Height', 'Foot',
+    'Market Value', 'Contract Until', 'Position', 'Annual Salary', 'Release Clause',
+    'Max_Rating', 'Best_Profile', CONTRACT_DATE_COLUMN
+} | set(MONEY_COLUMNS.values())
+
+# Ogni quanti secondi il thread in background controlla l'mtime dei file
+REFRESH_INTERVAL = 30
+
+
+def parse_money_series(values):
+    """
+    Converte in blocco stringhe monetarie in euro interi (Int64, <NA> se mancante).
+
+    Gestisce i formati prodotti dagli script add_*_info.py ("€3.000.000",
+    "€1.670.000.00"), il formato europeo con virgola decimale ("€3.000.000,00")
+    e i valori Transfermarkt con suffisso ("€12.00m", "€500k").
+    """
+    s = pd.Series(values, copy=False).astype('string')
+    s = s.str.replace('€', '', regex=False).str.replace(r'\s+', '', regex=True).str.lower()
+
+    suffix = s.str.extract(r'([mk])$', expand=False)
+    has_suffix = suffix.notna()
+    multiplier = suffix.map({'m': 1_000_000, 'k': 1_000}).astype('float64')
+    body = s.str.replace(r'[mk]$', '', regex=True)
+
+    # Con suffisso il numero usa il punto (o la virgola) come separatore decimale
+    scaled = pd.to_numeric(body.where(has_suffix).str.replace(',', '.', regex=False), errors='coerce') * multiplier
+
+    # Senza suffisso punti e virgole sono separatori delle migliaia, tranne un
+    # gruppo finale di 1-2 cifre che è la parte decimale
+    parts = body.where(~has_suffix).str.extract(r'^(?P<whole>[\d.,]*?)(?:[.,](?P<dec>\d{1,2}))?$')
+    whole = pd.to_numeric(parts['whole'].str.replace(r'[.,]', '', regex=True), errors='coerce')
+    dec = pd.to_numeric(parts['dec'], errors='coerce') / 10.0 ** parts['dec'].str.len().astype('float64')
+    plain = whole + dec.fillna(0.0)
+
+    return scaled.where(has_suffix, plain).astype('float64').round().astype('Int64')
+
+
+def parse_money_value(value):
+    """
+    Versione scalare di parse_money_series, in Python puro: euro interi o None
+    se il valore manca o non è riconosciuto.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NA:
+        return None
+    s = re.sub(r'\s+', '', str(value).replace('€', '')).lower()
+
+    if s[-1:] in ('m', 'k'):
+        try:
+            number = float(s[:-1].replace(',', '.'))
+        except ValueError:
+            return None
+        return round(number * (1_000_000 if s[-1] == 'm' else 1_000))
+
+    parts = re.fullmatch(r'(?P<whole>[\d.,]*?)(?:[.,](?P<dec>\d{1,2}))?', s)
+    whole = re.sub(r'[.,]', '', parts['whole']) if parts else ''
+    if not whole:
+        return None
+    dec = int(parts['dec']) / 10 ** len(parts['dec']) if parts['dec'] else 0.0
+    return round(int(whole) + dec)
+
+
+def add_money_columns(df):
+    """Aggiunge le colonne *_Eur accanto alle colonne monetarie testuali presenti."""
+    for source, target in MONEY_COLUMNS.items():
+        if source in df.columns:
+            df[target] = parse_money_series(df[source])
+    return df
+
+
+def parse_contract_dates(values):
+    """
+    Date di scadenza del contratto ("30/06/2026", "Jun 30, 2026", "2026"),
+    NaT se mancanti o non riconosciute. Un anno senza giorno e mese indica la
+    fine della stagione, cioè il 30 giugno di quell'anno.
+
+    >>> parse_contract_dates(['2026', '31/01/2027', 'Jun 30, 2028', None]).dt.strftime('%Y-%m-%d').tolist()
+    ['2026-06-30', '2027-01-31', '2028-06-30', nan]
+    """
+    s = pd.Series(values, copy=False).astype('string').str.strip()
+    s = s.str.replace(r'^(\d{4})$', r'30/06/\1', regex=True)
+    return pd.to_datetime(s, dayfirst=True, errors='coerce', format='mixed')
+
+
+def add_profile_summary(df):
+    """
+    Aggiunge Max_Rating (0 se il giocatore non ha rating) e Best_Profile,
+    calcolati con un unico max per riga sulle colonne dei profili presenti.
+    """
+    profile_cols = [p for p in RATING_PROFILES if p in df.columns]
+    if not profile_cols:
+        return df
+    values = df[profile_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+    values = np.where(np.isnan(values), -np.inf, values)
+    best = values.argmax(axis=1)
+    max_rating = values[np.arange(len(values)), best]
+    has_rating = np.isfinite(max_rating)
+    df['Max_Rating'] = np.where(has_rating, np.maximum(max_rating, 0.0), 0.0)
+    df['Best_Profile'] = np.where(has_rating, np.array(profile_cols, dtype=object)[best], None)
+    return df
+
+
+def build_sort_orders(df):
+    """
+    Ordinamenti precalcolati colonna -> indici posizionali in ordine decrescente
+    (stabile, valori mancanti in fondo) per ogni colonna di ranking presente.
+    """
+    orders = {}
+    for column in RATING_PROFILES + ['Max_Rating', 'Valverde_Score']:
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64')
+        order = np.argsort(-values, kind='stable')
+        order.setflags(write=False)
+        orders[column] = order
+    return MappingProxyType(orders)
+
+
+def read_rating_file(file_path, position):
+    """
+    Legge un file di rating e aggiunge Position, le colonne monetarie numeriche,
+    la data di scadenza del contratto e il riepilogo dei profili.
+    """
+    df = read_csv_cached(file_path, sep=None)
+    df['Position'] = position
+    add_money_columns(df)
+    if 'Contract Until' in df.columns:
+        df[CONTRACT_DATE_COLUMN] = parse_contract_dates(df['Contract Until'])
+    return add_profile_summary(df)
+
+
+class RatingStore:
+    """
+    Cache condivisa dei file di rating, caricata una volta sola per processo.
+
+    Lo snapshot corrente è un mapping in sola lettura posizione -> DataFrame che
+    viene sostituito per intero quando un file cambia: i callback che stanno
+    leggendo il vecchio snapshot non vedono mai uno stato a metà. Insieme ai
+    DataFrame lo snapshot contiene, per posizione, gli ordinamenti precalcolati
+    delle colonne di ranking (vedi build_sort_orders). Per le posizioni con
+    profili viene costruito anche l'indice dei giocatori simili.
+    """
+
+    def __init__(self, base_path=BASE_PATH, files=None, refresh_interval=REFRESH_INTERVAL):
+        self.base_path = base_path
+        self.files = dict(files or RATING_FILES)
+        self.refresh_interval = refresh_interval
+        self._snapshot = (0, MappingProxyType({}), MappingProxyType({}))
+        self._similarity = MappingProxyType({})
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _file_path(self, position):
+        return os.path.join(self.base_path, self.files[position])
+
+    def _current_mtimes(self):
+        mtimes = {}
+        for position in self.files:
+            try:
+                mtimes[position] = os.path.getmtime(self._file_path(position))
+            except OSError:
+                mtimes[position] = None
+        return mtimes
+
+    @property
+    def version(self):
+        """Contatore incrementato a ogni ricarica: utile come chiave per le cache a valle."""
+        return self._snapshot[0]
+
+    def _reload(self, positions, mtimes):
+        version, frames, orders = self._snapshot
+        frames, orders, similarity = dict(frames), dict(orders), dict(self._similarity)
+        for position in positions:
+            file_path = self._file_path(position)
+            if mtimes[position] is None:
+                print(f"[RatingStore] File not found: {file_path}")
+                frames.pop(position, None)
+                orders.pop(position, None)
+                similarity.pop(position, None)
+                continue
+            try:
+                df = read_rating_file(file_path, position)
+                print(f"[RatingStore] Loaded {position}: {df.shape[0]} rows")
+                frames[position] = df
+                orders[position] = build_sort_orders(df)
+                similarity.pop(position, None)
+                if any(p in df.columns for p in RATING_PROFILES):
+                    similarity[position] = SimilarityIndex(df, RATING_PROFILES)
+            except Exception as e:
+                print(f"[RatingStore] Error loading {file_path}: {e}")
+        self._similarity = MappingProxyType(similarity)
+        self._snapshot = (version + 1, MappingProxyType(frames), MappingProxyType(orders))
+        self._mtimes = mtimes
+
+    def load(self):
+        """Carica (o ricarica) tutti i file."""
+        with self._lock:
+            self._reload(list(self.files), self._current_mtimes())
+        return self
+
+    def refresh(self):
+        """Ricarica solo i file il cui mtime è cambiato. Restituisce True se lo snapshot è cambiato."""
+        with self._lock:
+            mtimes = self._current_mtimes()
+            changed = [p for p in self.files if mtimes[p] != self._mtimes.get(p)]
+            if not changed:
+                return False
+            self._reload(changed, mtimes)
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[RatingStore] Refresh failed: {e}")
+
+    def start(self):
+        """Avvia il thread che ricarica i file quando cambiano su disco."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="rating-store-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self):
+        """Terna (versione, frames, ordinamenti per posizione) letta in modo atomico."""
+        return self._snapshot
+
+    def frames(self):
+        """Snapshot corrente (mapping in sola lettura posizione -> DataFrame condiviso)."""
+        return self._snapshot[1]
+
+    def similarity_index(self, position):
+        """Indice dei giocatori simili della posizione (vedi SimilarityIndex), None se non disponibile."""
+        return self._similarity.get(position)
+
+    def view(self, position):
+        """
+        Vista economica del DataFrame di una posizione.
+
+        La copia è superficiale: assegnare colonne sulla vista non tocca lo
+        snapshot condiviso. Non modificare i valori in-place (.loc/.iloc).
+        """
+        df = self.frames().get(position)
+        if df is None:
+            return None
+        return df.copy(deep=False)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rating_store():
+    """Restituisce lo store di processo, caricandolo e avviando il refresh al primo utilizzo."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RatingStore().load().start()
+    return _store
@@ -13,6 +13,10 @@ from unidecode import unidecode
 import csv
 from urllib.parse import parse_qs
 from dash import callback_context
+from pages.Scout_Analysis.rating_store import get_rating_store, parse_money_value, INFO_COLUMNS
+from pages.Scout_Analysis.scout_query import (
+    PLAYERS_PER_PAGE, build_filter_spec, paginate, ranked_rows, run_query
+)
 
 # === CONFIGURAZIONE CAMPIONATI E PESI ===
 LEAGUE_WEIGHTS = {
@@ -151,102 +155,17 @@ POSITION_ICONS = {
 }
 
 def load_player_data():
-    """Load all player rating data"""
-    data_files = {
-        'goalkeeper': 'goalkeeper_ratings_complete_en.csv',
-        'striker': 'striker_ratings_complete_en.csv',
-        'winger': 'winger_ratings_complete_en.csv',
-        'attacking_midfielder': 'attacking_midfielder_ratings_complete_en.csv',
-        'midfielder': 'midfielder_ratings_complete_en.csv',
-        'fullback': 'fullback_ratings_complete_en.csv',
-        'centreback': 'centreback_ratings_complete_en.csv',
-        'valverde': 'valverde_score_results.csv'
-    }
-    
-    BASE_PATH = '/Users/federico/dash_project/'
-    all_data = {}
-    for position, filename in data_files.items():
-        file_path = os.path.join(BASE_PATH, filename)
-        if not os.path.exists(file_path):
-            print(f"[ScoutAnalysis] File not found: {file_path}")
-            continue
-        try:
-            # Detect separator
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sample = f.read(2048)
-                if ';' in sample and sample.count(';') > sample.count(','):
-                    sep = ';'
-                else:
-                    sep = ','
-            df = pd.read_csv(file_path, sep=sep)
-            print(f"[ScoutAnalysis] Loaded {position}: {df.shape[0]} rows, columns: {list(df.columns)}")
-            if df.empty:
-                print(f"[ScoutAnalysis] Loaded file is empty: {file_path}")
-            # Add position column
-            df['Position'] = position
-            all_data[position] = df
-        except Exception as e:
-            print(f"[ScoutAnalysis] Error loading {file_path}: {e}")
-    return all_data
+    """Load all player rating data (shared snapshot, loaded once per process)"""
+    return get_rating_store().frames()
 
 def parse_market_value(value_str):
     """Parse market value string to numeric value in millions"""
-    if pd.isna(value_str) or value_str == '' or value_str == '€0':
-        return 0
-    
-    try:
-        # Remove currency symbols
-        value_str = str(value_str).replace('€', '').strip()
-        
-        # Handle European format with comma as decimal separator (e.g., "3.000.000,00")
-        if ',' in value_str and '.' in value_str:
-            # This is European format: dots as thousand separators, comma as decimal
-            # Remove dots first, then replace comma with dot
-            value_str = value_str.replace('.', '').replace(',', '.')
-        elif ',' in value_str:
-            # Only comma present, likely European format without thousand separators
-            value_str = value_str.replace(',', '.')
-        else:
-            # Standard format with dots as thousand separators (e.g., "15.000.000")
-            # Remove dots to get the full number
-            value_str = value_str.replace('.', '')
-        
-        # Convert to float and then to millions
-        value = float(value_str)
-        result = value / 1_000_000  # Convert to millions
-        return result
-    except Exception as e:
-        print(f"[DEBUG] Error parsing market value '{value_str}': {e}")
-        return 0
+    value = parse_money_value(value_str)
+    return 0 if value is None else value / 1_000_000
 
 def parse_salary(salary_str):
     """Parse salary string to numeric value in millions"""
-    if pd.isna(salary_str) or salary_str == '' or salary_str == '€0':
-        return 0
-    
-    try:
-        # Remove currency symbols and convert to numeric
-        salary_str = str(salary_str).replace('€', '').replace(',', '')
-        
-        # Handle values like "1.670.000.00" (points as thousand separators + decimal)
-        if '.' in salary_str:
-            parts = salary_str.split('.')
-            if len(parts) > 1:
-                # If last part has 2 digits, it's likely decimal part
-                if len(parts[-1]) == 2:
-                    whole_part = ''.join(parts[:-1])
-                    decimal_part = parts[-1]
-                    salary_str = whole_part + '.' + decimal_part
-                else:
-                    # All parts are thousands
-                    salary_str = ''.join(parts)
-        
-        # Convert to float and then to millions
-        value = float(salary_str)
-        result = value / 1_000_000  # Convert to millions
-        return result
-    except Exception as e:
-        return 0
+    return parse_market_value(salary_str)
 
 def get_player_photo_path(player_name):
     """Get player photo path or return default"""
@@ -288,9 +207,7 @@ def create_player_card(player_data, position, selected_profile=None):
     photo_path = get_player_photo_path(player_name)
     
     # Get rating columns for this position
-    rating_cols = [col for col in player_data.index if col not in 
-                  ['Player', 'Team', 'League', 'Age', 'Nationality', 'Height', 'Foot', 
-                   'Market Value', 'Contract Until', 'Position', 'Annual Salary', 'Release Clause', 'Ranking']]
+    rating_cols = [col for col in player_data.index if col not in INFO_COLUMNS and col != 'Ranking']
     
     # Get ratings
     ratings = []
@@ -962,6 +879,9 @@ a:hover {
 """
 
 def register_callbacks(app):
+    # Carica i rating una sola volta all'avvio e avvia il refresh in background
+    get_rating_store()
+
     @app.callback(
         [Output('league-filter', 'options'),
          Output('league-filter', 'value'),
@@ -1013,23 +933,15 @@ def register_callbacks(app):
     )
     def update_content(search, league, min_rating, min_market_value, min_salary, search_term, max_age,
                       foot, contract, release_clause, profile, page_data):
-        # Estrai la posizione dalla query string
-        position = None
-        if search:
-            qs = parse_qs(search.lstrip('?'))
-            position = qs.get('position', [None])[0]
-        if not position or position == 'all':
+        spec = build_filter_spec(search, league, min_rating, min_market_value, min_salary, search_term,
+                                 max_age, foot, contract, release_clause, profile)
+        if not spec.position or spec.position == 'all':
             return html.Div("Select a position to view players", className="text-center text-muted")
         
         # Get current page from store
         current_page = page_data.get('page', 1) if page_data else 1
         
-        player_data = load_player_data()
-        position_content = create_position_section(
-            player_data, position, league, min_rating, min_market_value, 
-            min_salary, search_term, max_age, foot, contract, release_clause, position, profile, current_page
-        )
-        return position_content
+        return create_position_section(spec, current_page)
 
     @app.callback(
         Output('position-bar', 'children'),
@@ -1081,115 +993,29 @@ def register_callbacks(app):
          Input('foot-filter', 'value'),
          Input('contract-filter', 'value'),
          Input('release-clause-filter', 'value'),
-         Input('profile-filter', 'value')],
-        [State('current-page-store', 'data')]
+         Input('profile-filter', 'value'),
+         Input('current-page-store', 'data')]
     )
     def update_pagination_controls(search, league, rating, market_value, salary, search_term, age, foot, contract, release_clause, profile, page_data):
         # Get current page from page_data
         current_page = 1
         if page_data and isinstance(page_data, dict):
-            current_page = page_data.get('current_page', 1)
-        
-        # Get position from URL
-        position = None
-        if search:
-            qs = parse_qs(search.lstrip('?'))
-            position = qs.get('position', [None])[0]
+            current_page = page_data.get('page', 1)
         
-        if not position or position == 'all':
+        spec = build_filter_spec(search, league, rating, market_value, salary, search_term,
+                                 age, foot, contract, release_clause, profile)
+        if not spec.position or spec.position == 'all':
             return {'display': 'none'}, "", True, True
         
-        # Special handling for Valverde Score - skip all advanced filters
-        if position == 'valverde':
-            # Load Valverde Score data
-            valverde_file = os.path.join(BASE_PATH, 'valverde_score_results.csv')
-            
-            if not os.path.exists(valverde_file):
-                return {'display': 'none'}, "", True, True
-            
-            try:
-                df = pd.read_csv(valverde_file)
-            except:
-                return {'display': 'none'}, "", True, True
-            
-            if df.empty:
-                return {'display': 'none'}, "", True, True
-            
-            # Only apply search filter for Valverde Score
-            if search_term:
-                df = df[df['Player'].str.contains(search_term, case=False, na=False)]
-            
-            # Pagination settings
-            players_per_page = 25
-            total_players = len(df)
-            total_pages = (total_players + players_per_page - 1) // players_per_page
-            
-            # Ensure current_page is within valid range
-            current_page = max(1, min(current_page, total_pages))
-            
-            # Create pagination controls
-            pagination_info = f"Page {current_page} of {total_pages} ({total_players} players total)"
-            prev_disabled = current_page <= 1
-            next_disabled = current_page >= total_pages
-            
-            return {'display': 'block'}, pagination_info, prev_disabled, next_disabled
-        
-        # Load and filter data to get total pages for other positions
-        player_data = load_player_data()
-        if position not in player_data:
+        # Same memoized query as the listing callback
+        result = run_query(spec)
+        if result is None or (spec.position == 'valverde' and result.total == 0):
             return {'display': 'none'}, "", True, True
         
-        df = player_data[position].copy()
-        
-        # Apply same filters as in create_position_section
-        if league != 'all':
-            df = df[df['League'] == league]
-        if search_term:
-            df = df[df['Player'].str.contains(search_term, case=False, na=False)]
-        if foot != 'all':
-            # Handle case-insensitive foot matching with null values
-            mask = df['Foot'].notna() & (df['Foot'].str.lower() == foot.lower())
-            df = df[mask]
-        if release_clause != 'all':
-            if release_clause == 'with_clause':
-                # Check for non-zero release clauses
-                df['Release_Clause_Numeric'] = df['Release Clause'].apply(parse_market_value)
-                df = df[df['Release_Clause_Numeric'] > 0]
-            else:
-                # Check for zero or no release clauses
-                df['Release_Clause_Numeric'] = df['Release Clause'].apply(parse_market_value)
-                df = df[df['Release_Clause_Numeric'] == 0]
-        
-        # Only apply age filter if Age column exists
-        if 'Age' in df.columns:
-            df['Age'] = pd.to_numeric(df['Age'], errors='coerce')
-            df = df[df['Age'] <= age]
-        
-        if rating > 0:
-            rating_cols = [col for col in df.columns if any(profile in col for profile in ['Playmaker_Keeper', 'Shot_Stopper', 'Guardian', 'Deep_Distributor', 'Enforcer', 'Sentinel_Fullback', 'Advanced_Wingback', 'Overlapping_Runner', 'Pivot_Master', 'Maestro', 'Box_to_Box', 'Diez', 'Space_Invader', 'Key_Passer', 'Creative_Winger', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker'])]
-            if profile and profile in df.columns:
-                df = df[df[profile] >= rating]
-            else:
-                df = df[df[rating_cols].max(axis=1) >= rating]
-        
-        if market_value > 0:
-            df['Market_Value_Numeric'] = df['Market Value'].apply(parse_market_value)
-            df = df[df['Market_Value_Numeric'] >= market_value]
-        
-        if salary > 0:
-            df['Salary_Numeric'] = df['Annual Salary'].apply(parse_salary)
-            df = df[df['Salary_Numeric'] >= salary]
-        
-        # Pagination settings
-        players_per_page = 25
-        total_players = len(df)
-        total_pages = (total_players + players_per_page - 1) // players_per_page
-        
-        # Ensure current_page is within valid range
-        current_page = max(1, min(current_page, total_pages))
+        current_page, total_pages = paginate(result.total, current_page)
         
         # Create pagination controls
-        pagination_info = f"Page {current_page} of {total_pages} ({total_players} players total)"
+        pagination_info = f"Page {current_page} of {total_pages} ({result.total} players total)"
         prev_disabled = current_page <= 1
         next_disabled = current_page >= total_pages
         
@@ -1254,135 +1080,28 @@ def register_callbacks(app):
                 return {'display': 'none'}
         return {'display': 'block'}
 
-def create_position_section(player_data, position, league, min_rating, min_market_value, min_salary, 
-                          search_term, max_age, foot, contract, release_clause, 
-                          position_filter, selected_profile, current_page=1):
+def create_position_section(spec, current_page=1):
     """Create a section for a specific position with pagination"""
     
     # Special handling for Valverde Score
-    if position == 'valverde':
-        return create_valverde_score_view()
+    if spec.position == 'valverde':
+        return create_valverde_score_view(run_query(spec))
     
-    if position not in player_data:
+    result = run_query(spec)
+    if result is None:
         return html.Div("No data available for this position")
     
-    df = player_data[position].copy()
-    
-    # Apply filters
-    if league != 'all':
-        df = df[df['League'] == league]
-    print(f"[ScoutAnalysis] After league filter: {len(df)} rows")
-    
-    if search_term:
-        df = df[df['Player'].str.contains(search_term, case=False, na=False)]
-    print(f"[ScoutAnalysis] After search_term filter: {len(df)} rows")
+    position = spec.position
+    selected_profile = spec.profile
+    total_players = result.total
+    print(f"[ScoutAnalysis] {position}: {total_players} players after filters")
     
-    if foot != 'all':
-        # Handle case-insensitive foot matching with null values
-        mask = df['Foot'].notna() & (df['Foot'].str.lower() == foot.lower())
-        df = df[mask]
-    print(f"[ScoutAnalysis] After foot filter: {len(df)} rows")
-    
-    if contract != 'all':
-        # Parse contract dates and filter
-        # For now, skip contract filtering as it requires date parsing
-        pass  # TODO: Implement contract filtering with date parsing
-    print(f"[ScoutAnalysis] After contract filter: {len(df)} rows")
-    
-    if release_clause != 'all':
-        if release_clause == 'with_clause':
-            # Check for non-zero release clauses
-            df['Release_Clause_Numeric'] = df['Release Clause'].apply(parse_market_value)
-            df = df[df['Release_Clause_Numeric'] > 0]
-        else:
-            # Check for zero or no release clauses
-            df['Release_Clause_Numeric'] = df['Release Clause'].apply(parse_market_value)
-            df = df[df['Release_Clause_Numeric'] == 0]
-    print(f"[ScoutAnalysis] After release_clause filter: {len(df)} rows")
-    
-    # Only filter by Position if the column exists
-    if position_filter != 'all' and 'Position' in df.columns:
-        df = df[df['Position'] == position_filter]
-    print(f"[ScoutAnalysis] After position_filter: {len(df)} rows")
-    
-    # Filter by age
-    df['Age'] = pd.to_numeric(df['Age'], errors='coerce')
-    df = df[df['Age'] <= max_age]
-    print(f"[ScoutAnalysis] After max_age filter: {len(df)} rows")
-    
-    # Filter by minimum rating
-    if min_rating > 0:
-        # Get rating columns
-        rating_cols = [col for col in df.columns if any(profile in col for profile in ['Playmaker_Keeper', 'Shot_Stopper', 'Guardian', 'Deep_Distributor', 'Enforcer', 'Sentinel_Fullback', 'Advanced_Wingback', 'Overlapping_Runner', 'Pivot_Master', 'Maestro', 'Box_to_Box', 'Diez', 'Space_Invader', 'Key_Passer', 'Creative_Winger', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker'])]
-        
-        # Filter by selected profile if specified
-        if selected_profile and selected_profile != 'all':
-            if selected_profile in df.columns:
-                df = df[df[selected_profile] >= min_rating]
-            else:
-                df = df[df[rating_cols].max(axis=1) >= min_rating]
-        else:
-            # Filter by any profile rating
-            df = df[df[rating_cols].max(axis=1) >= min_rating]
-    print(f"[ScoutAnalysis] After min_rating filter: {len(df)} rows")
-    
-    # Filter by market value
-    if min_market_value > 0:
-        print(f"[DEBUG] Filtering by market value >= {min_market_value}M€")
-        df['Market_Value_Numeric'] = df['Market Value'].apply(parse_market_value)
-        print(f"[DEBUG] Market values range: {df['Market_Value_Numeric'].min():.2f} - {df['Market_Value_Numeric'].max():.2f}M€")
-        before_filter = len(df)
-        df = df[df['Market_Value_Numeric'] >= min_market_value]
-        after_filter = len(df)
-        print(f"[DEBUG] Market value filter: {before_filter} -> {after_filter} players")
-    print(f"[ScoutAnalysis] After market_value filter: {len(df)} rows")
-    
-    # Filter by salary
-    if min_salary > 0:
-        print(f"[DEBUG] Filtering by salary >= {min_salary}M€")
-        df['Salary_Numeric'] = df['Annual Salary'].apply(parse_salary)
-        print(f"[DEBUG] Salaries range: {df['Salary_Numeric'].min():.2f} - {df['Salary_Numeric'].max():.2f}M€")
-        before_filter = len(df)
-        df = df[df['Salary_Numeric'] >= min_salary]
-        after_filter = len(df)
-        print(f"[DEBUG] Salary filter: {before_filter} -> {after_filter} players")
-    print(f"[ScoutAnalysis] After salary filter: {len(df)} rows")
-    
-    # Sort by selected profile rating instead of max rating
-    if selected_profile and selected_profile in df.columns:
-        # Sort by the selected profile rating
-        df = df.sort_values(selected_profile, ascending=False)
-        # Add the selected profile rating as a column for display
-        df['Selected_Rating'] = df[selected_profile]
-    else:
-        # Fallback to max rating if profile not found
-        def get_max_rating(row):
-            rating_cols = [col for col in df.columns if any(profile in col for profile in ['Playmaker_Keeper', 'Shot_Stopper', 'Guardian', 'Deep_Distributor', 'Enforcer', 'Sentinel_Fullback', 'Advanced_Wingback', 'Overlapping_Runner', 'Pivot_Master', 'Maestro', 'Box_to_Box', 'Diez', 'Space_Invader', 'Key_Passer', 'Creative_Winger', 'Falso_Nueve', 'Aerial_Dominator', 'Lethal_Striker'])]
-            max_rating = 0
-            for col in rating_cols:
-                try:
-                    rating = float(row[col])
-                    if not pd.isna(rating) and rating > max_rating:
-                        max_rating = rating
-                except:
-                    continue
-            return max_rating
-        
-        df['Selected_Rating'] = df.apply(get_max_rating, axis=1)
-        df = df.sort_values('Selected_Rating', ascending=False)
-    
-    # Pagination settings
-    players_per_page = 25
-    total_players = len(df)
-    total_pages = (total_players + players_per_page - 1) // players_per_page
-    
-    # Ensure current_page is within valid range
-    current_page = max(1, min(current_page, total_pages))
+    current_page, total_pages = paginate(total_players, current_page)
     
     # Get players for current page
-    start_idx = (current_page - 1) * players_per_page
-    end_idx = start_idx + players_per_page
-    df_page = df.iloc[start_idx:end_idx]
+    start_idx = (current_page - 1) * PLAYERS_PER_PAGE
+    end_idx = start_idx + PLAYERS_PER_PAGE
+    df_page = ranked_rows(result, start_idx, end_idx)
     
     # Create results header with selected profile
     profile_display_name = format_display_name(selected_profile) if selected_profile else "All Profiles"
@@ -1396,8 +1115,8 @@ def create_position_section(player_data, position, league, min_rating, min_marke
         }),
         html.Div([
             html.Span(f"Showing {len(df_page)} of {total_players} players", className="badge bg-info me-2"),
-            html.Span(f"Top rating: {df['Selected_Rating'].max():.1f}", className="badge bg-success me-2"),
-            html.Span(f"Average rating: {df['Selected_Rating'].mean():.1f}", className="badge bg-warning")
+            html.Span(f"Top rating: {result.top_rating:.1f}", className="badge bg-success me-2"),
+            html.Span(f"Average rating: {result.mean_rating:.1f}", className="badge bg-warning")
         ], style={
             "textAlign": "center",
             "marginBottom": "15px"
@@ -1654,25 +1373,15 @@ def create_position_section(player_data, position, league, min_rating, min_marke
         })
     ])
 
-def create_valverde_score_view():
-    """Create Valverde Score view using the dedicated CSV file"""
-    # Load Valverde Score data
-    valverde_file = os.path.join(BASE_PATH, 'valverde_score_results.csv')
-    
-    if not os.path.exists(valverde_file):
+def create_valverde_score_view(result):
+    """Create Valverde Score view from the (search-filtered, sorted) query result"""
+    if result is None:
         return html.Div("Valverde Score data not available")
     
-    try:
-        df = pd.read_csv(valverde_file)
-    except:
-        return html.Div("Error loading Valverde Score data")
-    
+    df = ranked_rows(result)
     if df.empty:
         return html.Div("No Valverde Score data available")
     
-    # Sort by Valverde Score
-    df = df.sort_values('Valverde_Score', ascending=False)
-    
     # Function to get Valverde Score color (different scale: ≥90 green, ≥80 yellow, <80 red)
     def get_valverde_color(score):
         if score >= 90:
@@ -1863,33 +1572,11 @@ def create_valverde_score_view():
     ])
 
 def load_position_data(position):
-    """Carica il file CSV della posizione e restituisce il DataFrame, le opzioni League e Profile."""
-    # Mappa posizione -> file
-    file_map = {
-        'goalkeeper': 'goalkeeper_ratings_complete_en.csv',
-        'centreback': 'centreback_ratings_complete_en.csv',
-        'fullback': 'fullback_ratings_complete_en.csv',
-        'midfielder': 'midfielder_ratings_complete_en.csv',
-        'attacking_midfielder': 'attacking_midfielder_ratings_complete_en.csv',
-        'striker': 'striker_ratings_complete_en.csv',
-        'winger': 'winger_ratings_complete_en.csv',
-        'valverde': 'valverde_score_results.csv'
-    }
-    filename = file_map.get(position)
-    if not filename or not os.path.exists(filename):
+    """Restituisce il DataFrame della posizione (dallo store condiviso), le opzioni League e Profile."""
+    df = get_rating_store().view(position)
+    if df is None:
         return None, [], []
     
-    # Rileva il separatore
-    with open(filename, 'r', encoding='utf-8') as f:
-        sample = f.read(1024)
-        if ';' in sample:
-            separator = ';'
-        else:
-            separator = ','
-    
-    # Carica il DataFrame
-    df = pd.read_csv(filename, sep=separator)
-    
     # Per il Valverde Score, gestisci diversamente
     if position == 'valverde':
         # Per il Valverde Score, non abbiamo League e Profile nel senso tradizionale
@@ -1900,11 +1587,7 @@ def load_position_data(position):
     leagues = sorted(df['League'].dropna().unique().tolist())
     
     # Estrai i profili (tutte le colonne che non sono anagrafiche)
-    exclude_cols = {
-        'Player', 'Team', 'League', 'Age', 'Nationality', 'Height', 'Foot', 
-        'Market Value', 'Contract Until', 'Position', 'Annual Salary', 'Release Clause'
-    }
-    profile_cols = [col for col in df.columns if col not in exclude_cols]
+    profile_cols = [col for col in df.columns if col not in INFO_COLUMNS]
     
     return df, leagues, profile_cols
 
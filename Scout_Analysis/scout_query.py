@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+from pages.Scout_Analysis.rating_store import CONTRACT_DATE_COLUMN, get_rating_store
+
+PLAYERS_PER_PAGE = 25
+
+# Filtro contratto: 'expiring' = scadenza entro questi mesi da oggi (o già scaduto),
+# 'long_term' = scadenza successiva; i giocatori senza data sono esclusi da entrambi
+EXPIRING_CONTRACT_MONTHS = 12
+
+# Specifica dei filtri della pagina di scouting (hashable, usata come chiave di cache)
+FilterSpec = namedtuple('FilterSpec', [
+    'position', 'league', 'search_term', 'foot', 'contract', 'release_clause',
+    'max_age', 'min_rating', 'min_market_value', 'min_salary', 'profile'
+])
+
+# Risultato di una query: frame completo della posizione (condiviso, da non modificare),
+# indici posizionali delle righe filtrate in ordine di ranking, rating usato per il
+# ranking (allineato a frame), numero di righe e statistiche sul rating
+QueryResult = namedtuple('QueryResult', ['frame', 'order', 'ratings', 'total', 'top_rating', 'mean_rating'])
+
+_CACHE_SIZE = 128
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def position_from_search(search):
+    """Estrae la posizione dalla query string dell'URL."""
+    if not search:
+        return None
+    return parse_qs(search.lstrip('?')).get('position', [None])[0]
+
+
+def build_filter_spec(search, league, min_rating, min_market_value, min_salary, search_term,
+                      max_age, foot, contract, release_clause, profile):
+    """Costruisce una FilterSpec normalizzata a partire dagli input dei callback."""
+    return FilterSpec(
+        position=position_from_search(search),
+        league=league or 'all',
+        search_term=search_term or '',
+        foot=foot or 'all',
+        contract=contract or 'all',
+        release_clause=release_clause or 'all',
+        max_age=max_age,
+        min_rating=min_rating or 0,
+        min_market_value=min_market_value or 0,
+        min_salary=min_salary or 0,
+        profile=profile
+    )
+
+
+def paginate(total, page):
+    """Restituisce (pagina corrente valida, numero totale di pagine)."""
+    total_pages = (total + PLAYERS_PER_PAGE - 1) // PLAYERS_PER_PAGE
+    return max(1, min(page, total_pages)), total_pages
+
+
+def ranked_rows(result, start=0, stop=None):
+    """
+    Righe della query tra le posizioni start e stop del ranking, con la colonna
+    Selected_Rating. Il costo dipende solo dal numero di righe richieste.
+    """
+    positions = result.order[start:stop]
+    return result.frame.iloc[positions].assign(Selected_Rating=result.ratings[positions])
+
+
+def _ranking_order(df, orders, column):
+    order = orders.get(column)
+    if order is None:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64')
+        order = np.argsort(-values, kind='stable')
+    return order
+
+
+def _result(df, order, ratings, mask):
+    # Intersezione tra l'ordinamento precalcolato e il filtro: nessun sort per query
+    if mask is not None:
+        order = order[mask[order]]
+    selected = ratings[order]
+    if len(selected) and not np.isnan(selected).all():
+        top_rating, mean_rating = np.nanmax(selected), np.nanmean(selected)
+    else:
+        top_rating = mean_rating = float('nan')
+    return QueryResult(df, order, ratings, len(order), top_rating, mean_rating)
+
+
+def _execute(spec, frames, orders):
+    df = frames.get(spec.position)
+    if df is None:
+        return None
+    orders = orders.get(spec.position, {})
+
+    # Il Valverde Score ha solo la ricerca per nome
+    if spec.position == 'valverde':
+        ratings = pd.to_numeric(df['Valverde_Score'], errors='coerce').to_numpy(dtype='float64')
+        mask = None
+        if spec.search_term:
+            mask = df['Player'].str.contains(spec.search_term, case=False, na=False, regex=False).to_numpy()
+        return _result(df, _ranking_order(df, orders, 'Valverde_Score'), ratings, mask)
+
+    mask = pd.Series(True, index=df.index)
+    if spec.league != 'all':
+        mask &= df['League'] == spec.league
+    if spec.search_term:
+        mask &= df['Player'].str.contains(spec.search_term, case=False, na=False, regex=False)
+    if spec.foot != 'all':
+        # Handle case-insensitive foot matching with null values
+        mask &= df['Foot'].notna() & (df['Foot'].str.lower() == spec.foot.lower())
+    if spec.contract != 'all' and CONTRACT_DATE_COLUMN in df.columns:
+        expiry = df[CONTRACT_DATE_COLUMN]
+        threshold = pd.Timestamp.today().normalize() + pd.DateOffset(months=EXPIRING_CONTRACT_MONTHS)
+        if spec.contract == 'expiring':
+            mask &= expiry.notna() & (expiry <= threshold)
+        else:
+            mask &= expiry.notna() & (expiry > threshold)
+    if spec.release_clause != 'all':
+        release_clause_eur = df['Release_Clause_Eur'].fillna(0)
+        if spec.release_clause == 'with_clause':
+            mask &= release_clause_eur > 0
+        else:
+            mask &= release_clause_eur == 0
+    if spec.max_age is not None and 'Age' in df.columns:
+        mask &= pd.to_numeric(df['Age'], errors='coerce') <= spec.max_age
+
+    # Rating del profilo selezionato, altrimenti il rating massimo precalcolato dallo store
+    if spec.profile and spec.profile in df.columns:
+        rating_column = spec.profile
+    elif 'Max_Rating' in df.columns:
+        rating_column = 'Max_Rating'
+    else:
+        rating_column = None
+    if rating_column:
+        ratings = pd.to_numeric(df[rating_column], errors='coerce').to_numpy(dtype='float64')
+        order = _ranking_order(df, orders, rating_column)
+    else:
+        ratings = np.zeros(len(df))
+        order = np.arange(len(df))
+    if spec.min_rating > 0:
+        mask &= ratings >= spec.min_rating
+
+    if spec.min_market_value > 0:
+        mask &= df['Market_Value_Eur'].fillna(0) >= spec.min_market_value * 1_000_000
+    if spec.min_salary > 0:
+        mask &= df['Annual_Salary_Eur'].fillna(0) >= spec.min_salary * 1_000_000
+
+    return _result(df, order, ratings, mask.to_numpy())
+
+
+def run_query(spec):
+    """
+    Filtra e ordina i giocatori di una posizione secondo la FilterSpec.
+
+    Il risultato è memoizzato per (versione dello store, spec, e il giorno se è
+    attivo il filtro contratto): i callback della lista e della paginazione
+    condividono lo stesso calcolo. Le righe di una pagina si ottengono con
+    ranked_rows. Restituisce None se la posizione non ha dati.
+    """
+    version, frames, orders = get_rating_store().snapshot()
+    key = (version, spec, pd.Timestamp.today().date() if spec.contract != 'all' else None)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    result = _execute(spec, frames, orders)
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
@@ -1,6 +1,9 @@
 import pandas as pd
 import os
+import threading
 from pages.Scout_Analysis.scout_analysis import TEAM_LOGO_MAPPING, LEAGUE_FOLDER_MAPPING
+from pages.Scout_Analysis.player_registry import name_key
+from pages.csv_cache import read_csv_cached
 
 # Percorso base del progetto
 BASE_PATH = "/Users/federico/dash_project"
@@ -22,6 +25,21 @@ PROFILES_TO_COMPARE = [
     "Playmaker_Keeper", "Shot_Stopper"
 ]
 
+# File di rating nell'ordine di ricerca di get_player_data
+PLAYER_DATA_FILES = [
+    'goalkeeper_ratings_complete_en.csv', 'striker_ratings_complete_en.csv',
+    'winger_ratings_complete_en.csv', 'attacking_midfielder_ratings_complete_en.csv',
+    'midfielder_ratings_complete_en.csv', 'fullback_ratings_complete_en.csv',
+    'centreback_ratings_complete_en.csv'
+]
+
+# Posizione -> ruolo, nell'ordine di ricerca di get_player_info
+POSITION_ROLES = {
+    'goalkeeper': 'GOALKEEPER', 'centreback': 'CENTRE BACK', 'fullback': 'FULLBACK',
+    'midfielder': 'MIDFIELDER', 'attacking_midfielder': 'ATTACKING MIDFIELDER',
+    'winger': 'WINGER', 'striker': 'STRIKER'
+}
+
 def get_team_logo_path(team, league):
     """Get team logo path using the mappings from scout_analysis"""
     if pd.isna(team) or pd.isna(league):
@@ -38,33 +56,14 @@ def get_team_logo_path(team, league):
 
 def load_all_player_data_for_dropdown():
     """Carica tutti i nomi dei giocatori dai file di rating per i menu a tendina."""
-    data_files = [
-        'goalkeeper_ratings_complete_en.csv', 'striker_ratings_complete_en.csv',
-        'winger_ratings_complete_en.csv', 'attacking_midfielder_ratings_complete_en.csv',
-        'midfielder_ratings_complete_en.csv', 'fullback_ratings_complete_en.csv',
-        'centreback_ratings_complete_en.csv'
-    ]
-    
-    all_players = []
-    for file in data_files:
-        file_path = os.path.join(BASE_PATH, file)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sample = f.read(2048)
-                sep = ';' if ';' in sample and sample.count(';') > sample.count(',') else ','
-            
-            df = pd.read_csv(file_path, sep=sep, usecols=['Player'])
-            all_players.extend(df['Player'].dropna().unique())
-        except Exception as e:
-            print(f"Error loading {file}: {e}")
-            
-    return [{'label': name, 'value': name} for name in sorted(list(set(all_players)))]
+    names = get_player_index().names()
+    return [{'label': name, 'value': name} for name in sorted(names)]
 
 def load_profiles_by_position():
     """Carica e raggruppa i profili per ruolo dal CSV."""
     profiles_path = os.path.join(BASE_PATH, 'pages/Scout_Analysis/profili_scout_analysis_finale_corretti.csv')
     try:
-        df = pd.read_csv(profiles_path, sep=';')
+        df = read_csv_cached(profiles_path, sep=';')
         df.columns = [col.strip() for col in df.columns]
         df['RUOLO'] = df['RUOLO'].ffill()
         
@@ -77,47 +76,144 @@ def load_profiles_by_position():
         print(f"Error loading profiles: {e}")
         return {}
 
+def get_team_filepath(player_info):
+    """Constructs the filepath to the team's FBRef CSV."""
+    if player_info is None or 'Team' not in player_info or 'League' not in player_info:
+        return None
+    
+    team = player_info['Team'].replace(' ', '_')
+    league = player_info['League'].replace(' ', '_')
+
+    # Handle special league paths
+    if league == 'Serie_A':
+        return os.path.join(BASE_PATH, 'pages', 'data_serie_a_24-25', f"{team}.csv")
+    elif league == 'MLS':
+        return os.path.join(BASE_PATH, 'pages', 'MLS', 'data_MLS_24', f"{team}.csv")
+    elif league == 'Primeira_Liga':
+         return os.path.join(BASE_PATH, 'pages', 'Primeira_Liga', 'data_primeira_liga_24-25', f"{team}.csv")
+
+    # Generic path for other leagues
+    league_lower = league.lower()
+    return os.path.join(BASE_PATH, 'pages', league, f"data_{league_lower}_24-25", f"{team}.csv")
+
+class PlayerIndex:
+    """
+    Indice dei giocatori su tutti i file di rating, costruito una volta e
+    ricostruito solo quando un file cambia. Per ogni file tiene il DataFrame e
+    le mappe nome -> riga (prima occorrenza), chiave senza accenti -> riga e
+    Player_ID -> riga: una ricerca è un accesso a dizionario per file.
+    """
+
+    def __init__(self, base_path=BASE_PATH, files=PLAYER_DATA_FILES):
+        self.base_path = base_path
+        self.files = list(files)
+        self.signature = self._signature()
+        self.frames, self.rows, self.keys, self.ids = {}, {}, {}, {}
+        for file in self.files:
+            if self.signature[file] is None:
+                continue
+            file_path = os.path.join(base_path, file)
+            try:
+                df = read_csv_cached(file_path, sep=None)
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
+                continue
+            rows, keys, ids = {}, {}, {}
+            for row, name in enumerate(df['Player']):
+                rows.setdefault(name, row)
+                key = name_key(name)
+                if key is not None:
+                    keys.setdefault(key, row)
+            if 'Player_ID' in df.columns:
+                for row, player_id in enumerate(df['Player_ID']):
+                    if pd.notna(player_id):
+                        ids.setdefault(int(player_id), row)
+            self.frames[file], self.rows[file], self.keys[file], self.ids[file] = df, rows, keys, ids
+
+    def _signature(self):
+        signature = {}
+        for file in self.files:
+            try:
+                stat = os.stat(os.path.join(self.base_path, file))
+                signature[file] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                signature[file] = None
+        return signature
+
+    def is_stale(self):
+        return self._signature() != self.signature
+
+    def names(self):
+        """Nomi di tutti i giocatori indicizzati (senza duplicati)."""
+        return {name for rows in self.rows.values() for name in rows if isinstance(name, str)}
+
+    def find(self, player, files=None):
+        """
+        (file, riga) del giocatore nel primo dei file indicati che lo contiene:
+        prima per Player_ID (se player è un intero) o nome esatto, poi per nome
+        senza accenti. (None, None) se non trovato.
+        """
+        files = [f for f in (files or self.files) if f in self.frames]
+        if isinstance(player, int):
+            for file in files:
+                if player in self.ids[file]:
+                    return file, self.ids[file][player]
+            return None, None
+        for file in files:
+            row = self.rows[file].get(player)
+            if row is not None:
+                return file, row
+        key = name_key(player)
+        for file in files:
+            row = self.keys[file].get(key)
+            if row is not None:
+                return file, row
+        return None, None
+
+    def row(self, file, row):
+        return self.frames[file].iloc[row]
+
+
+_player_index = None
+_player_index_lock = threading.Lock()
+
+
+def get_player_index():
+    """Indice dei giocatori di processo, ricostruito solo quando i file di rating cambiano."""
+    global _player_index
+    index = _player_index
+    if index is None or index.is_stale():
+        with _player_index_lock:
+            index = _player_index
+            if index is None or index.is_stale():
+                index = PlayerIndex()
+                _player_index = index
+    return index
+
 def get_player_data(player_name, role_file_name=None):
     """Carica i dati completi di un giocatore, cercando in un file specifico se fornito."""
-    data_files = [
-        'goalkeeper_ratings_complete_en.csv', 'striker_ratings_complete_en.csv',
-        'winger_ratings_complete_en.csv', 'attacking_midfielder_ratings_complete_en.csv',
-        'midfielder_ratings_complete_en.csv', 'fullback_ratings_complete_en.csv',
-        'centreback_ratings_complete_en.csv'
-    ]
-    
-    files_to_search = [os.path.join(BASE_PATH, role_file_name)] if role_file_name else [os.path.join(BASE_PATH, f) for f in data_files]
-    
-    for file_path in files_to_search:
+    index = get_player_index()
+    if role_file_name and role_file_name not in index.files:
+        # File fuori dall'indice: lettura diretta
+        file_path = os.path.join(BASE_PATH, role_file_name)
         try:
-            if not os.path.exists(file_path): continue
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                sample = f.read(2048)
-                sep = ';' if ';' in sample and sample.count(';') > sample.count(',') else ','
-            
-            df = pd.read_csv(file_path, sep=sep)
-            player_data = df[df['Player'] == player_name]
-            
-            if not player_data.empty:
-                return player_data.iloc[0]
+            if os.path.exists(file_path):
+                df = read_csv_cached(file_path, sep=None)
+                player_data = df[df['Player'] == player_name]
+                if not player_data.empty:
+                    return player_data.iloc[0]
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
-            
-    return None
+        return None
+
+    file, row = index.find(player_name, [role_file_name] if role_file_name else None)
+    return index.row(file, row) if file is not None else None
 
 def get_player_info(player_name):
     """Trova un giocatore e restituisce i suoi dati e il nome del suo ruolo."""
-    position_map = {
-        'goalkeeper': 'GOALKEEPER', 'centreback': 'CENTRE BACK', 'fullback': 'FULLBACK',
-        'midfielder': 'MIDFIELDER', 'attacking_midfielder': 'ATTACKING MIDFIELDER',
-        'winger': 'WINGER', 'striker': 'STRIKER'
-    }
-    
-    for position_key, role_name in position_map.items():
-        file_name = f'{position_key}_ratings_complete_en.csv'
-        player_data = get_player_data(player_name, file_name)
-        if player_data is not None:
-            return role_name, player_data
-            
-    return None, None 
+    index = get_player_index()
+    role_files = {f'{position_key}_ratings_complete_en.csv': role for position_key, role in POSITION_ROLES.items()}
+    file, row = index.find(player_name, list(role_files))
+    if file is None:
+        return None, None
+    return role_files[file], index.row(file, row)
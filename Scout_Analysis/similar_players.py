@@ -4,16 +4,20 @@ import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State
 import pandas as pd
 import os
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
 from pages.Scout_Analysis.scout_utils import (
     BASE_PATH,
     PROFILES_TO_COMPARE,
     load_profiles_by_position,
-    get_player_info,
     get_team_logo_path
 )
 from pages.Scout_Analysis.scout_analysis import get_player_photo_path
+from pages.csv_cache import read_csv_cached
+from pages.Scout_Analysis.rating_store import get_rating_store
+from pages.Scout_Analysis.kpi_matrix import ROLE_FILE_KEYS
+
+# Valori massimi dei filtri: al massimo il filtro è disattivato
+MAX_AGE_FILTER = 40
+MAX_MARKET_VALUE_FILTER = 200
 
 # Caricamento dati condivisi
 PROFILES_BY_POSITION = load_profiles_by_position()
@@ -72,6 +76,41 @@ def create_layout():
                                     tooltip={"placement": "bottom", "always_visible": True}
                                 )
                             ], width=12)
+                        ], className="mb-4"),
+
+                        # 4. Filtri applicati alla ricerca
+                        dbc.Row([
+                            dbc.Col([
+                                html.Label("4. League", className="form-label fw-bold"),
+                                dcc.Dropdown(
+                                    id='similar-league-filter',
+                                    options=[{'label': 'All', 'value': 'all'}],
+                                    value='all',
+                                    clearable=False
+                                )
+                            ], md=4),
+                            dbc.Col([
+                                html.Label("Max Age", className="form-label fw-bold"),
+                                dcc.Slider(
+                                    id='similar-age-filter',
+                                    min=16,
+                                    max=MAX_AGE_FILTER,
+                                    step=1,
+                                    value=MAX_AGE_FILTER,
+                                    marks={i: str(i) for i in [16, 24, 32, MAX_AGE_FILTER]}
+                                )
+                            ], md=4),
+                            dbc.Col([
+                                html.Label("Max Market Value (M€)", className="form-label fw-bold"),
+                                dcc.Slider(
+                                    id='similar-market-value-filter',
+                                    min=0,
+                                    max=MAX_MARKET_VALUE_FILTER,
+                                    step=5,
+                                    value=MAX_MARKET_VALUE_FILTER,
+                                    marks={i: str(i) for i in range(0, MAX_MARKET_VALUE_FILTER + 1, 50)}
+                                )
+                            ], md=4)
                         ])
                     ])
                 ], className="mb-4 shadow-sm"),
@@ -181,13 +220,23 @@ def register_callbacks(app):
 
         file_path = os.path.join(BASE_PATH, f'{pos_key}_ratings_complete_en.csv')
         try:
-            df = pd.read_csv(file_path, sep=';' if ';' in open(file_path).read(1024) else ',')
+            df = read_csv_cached(file_path, sep=None)
             if selected_profile in df.columns:
                 # Filtra per giocatori con un rating > 75 in quel profilo e ordina
                 df_filtered = df[pd.to_numeric(df[selected_profile], errors='coerce') > 75].copy()
                 df_filtered = df_filtered.sort_values(by=selected_profile, ascending=False)
-                players = df_filtered['Player'].unique().tolist()
-                player_options = [{'label': name, 'value': name} for name in players]
+                if 'Player_ID' in df_filtered.columns:
+                    # Un'opzione per giocatore (Player_ID); la squadra distingue gli omonimi
+                    players = df_filtered.dropna(subset=['Player_ID']).drop_duplicates(subset='Player_ID')
+                    homonyms = players['Player'].duplicated(keep=False)
+                    player_options = [
+                        {'label': f"{name} ({team})" if homonym else name, 'value': int(player_id)}
+                        for name, team, player_id, homonym in zip(players['Player'], players['Team'],
+                                                                  players['Player_ID'], homonyms)
+                    ]
+                else:
+                    players = df_filtered['Player'].unique().tolist()
+                    player_options = [{'label': name, 'value': name} for name in players]
                 return player_options, False, None
             else:
                 return [], True, None
@@ -195,127 +244,60 @@ def register_callbacks(app):
             print(f"Error updating player options for similar search: {e}")
             return [], True, None
 
+    @callback(
+        Output('similar-league-filter', 'options'),
+        [Input('similar-profile-dropdown', 'value')]
+    )
+    def update_similar_league_options(_):
+        leagues = set()
+        for df in get_rating_store().frames().values():
+            if 'League' in df.columns:
+                leagues.update(df['League'].dropna().unique())
+        return [{'label': 'All', 'value': 'all'}] + [
+            {'label': format_display_name(l), 'value': l} for l in sorted(leagues)
+        ]
+
     @callback(
         Output('similar-players-output-area', 'children'),
-        [Input('similar-player-dropdown', 'value')],
+        [Input('similar-player-dropdown', 'value'),
+         Input('similar-league-filter', 'value'),
+         Input('similar-age-filter', 'value'),
+         Input('similar-market-value-filter', 'value')],
         [State('num-results-slider', 'value')],
         prevent_initial_call=True
     )
-    def find_and_display_similar_players(selected_player_name, num_results):
-        if not selected_player_name:
+    def find_and_display_similar_players(selected_player, league, max_age, max_market_value, num_results):
+        if selected_player is None or selected_player == "":
             return ""
 
-        role, selected_player_data = get_player_info(selected_player_name)
-        if not role or selected_player_data is None:
-            return dbc.Alert(f"Could not find data for {selected_player_name}.", color="danger", className="mt-4")
-
-        position_map_inverse = {
-            'GOALKEEPER': 'goalkeeper', 'CENTRE BACK': 'centreback', 'FULLBACK': 'fullback',
-            'MIDFIELDER': 'midfielder', 'ATTACKING MIDFIELDER': 'attacking_midfielder',
-            'WINGER': 'winger', 'STRIKER': 'striker'
-        }
-        pos_key = position_map_inverse.get(role)
-        if not pos_key:
-            return dbc.Alert(f"Invalid role found for {selected_player_name}.", color="danger", className="mt-4")
-        
-        file_path = os.path.join(BASE_PATH, f'{pos_key}_ratings_complete_en.csv')
-        try:
-            df_role = pd.read_csv(file_path, sep=';' if ';' in open(file_path).read(1024) else ',')
-        except FileNotFoundError:
-            return dbc.Alert(f"Data file for role {role} not found.", color="danger", className="mt-4")
-
-        # 1. Trova i profili che esistono effettivamente in questo DataFrame
-        existing_profiles = [p for p in PROFILES_TO_COMPARE if p in df_role.columns]
-        if not existing_profiles:
-            return dbc.Alert(f"No profile data found in the file for role {role}.", color="warning")
-
-        # 2. Riempi i valori NaN con 0 solo per le colonne dei profili esistenti
-        df_role[existing_profiles] = df_role[existing_profiles].fillna(0)
-        
-        # Aggiorna anche i dati del giocatore selezionato per coerenza
-        # È importante ricaricarlo dal DF appena pulito per avere i dati allineati
-        selected_player_data = df_role[df_role['Player'] == selected_player_name].iloc[0]
-
-        # 3. Usa la lista dei profili esistenti per il calcolo
-        df_role_filtered = df_role[df_role['Player'] != selected_player_name]
-
-        # FIX: Escludi giocatori con un vettore di profili nullo (tutti zeri)
-        # per evitare punteggi di similarità fuorvianti del 100%.
-        df_role_filtered = df_role_filtered[df_role_filtered[existing_profiles].sum(axis=1) > 0]
+        # Ruolo e riga del giocatore (Player_ID, o nome per i file senza id) dall'indice
+        # precalcolato dello store (stesso ordine di get_player_info)
+        store = get_rating_store()
+        index, row = None, None
+        for pos_key in ROLE_FILE_KEYS.values():
+            candidate = store.similarity_index(pos_key)
+            if candidate is not None and candidate.row_of(selected_player) is not None:
+                index, row = candidate, candidate.row_of(selected_player)
+                break
+        if index is None:
+            return dbc.Alert(f"Could not find data for {selected_player}.", color="danger", className="mt-4")
+        selected_player_name = index.players[row]
 
-        player_vector = selected_player_data[existing_profiles].values.reshape(1, -1)
-        peer_vectors = df_role_filtered[existing_profiles].values
+        # I filtri al valore massimo non limitano la ricerca
+        if max_age is not None and max_age >= MAX_AGE_FILTER:
+            max_age = None
+        if max_market_value is not None and max_market_value >= MAX_MARKET_VALUE_FILTER:
+            max_market_value = None
 
-        if peer_vectors.shape[0] == 0:
-            return dbc.Alert(f"Not enough players in the {role} role to perform a comparison.", color="warning", className="mt-4")
-        
         # --- LOGICA DI SIMILARITÀ BASATA SUL RADAR ---
-        
-        # 1. Calcolare la similarità del coseno (per lo stile)
-        cosine_sim = cosine_similarity(player_vector, peer_vectors)[0]
-        
-        # 2. Calcolare la distanza euclidea (per il livello)
-        euclidean_dist = euclidean_distances(player_vector, peer_vectors)[0]
-        
-        # 3. Normalizzare la distanza euclidea in similarità
-        if np.max(euclidean_dist) > 0:
-            euclidean_sim = 1 - (euclidean_dist / np.max(euclidean_dist))
-        else:
-            euclidean_sim = np.ones_like(euclidean_dist)
-        
-        # 4. Calcolare la sovrapposizione del radar per ogni giocatore
-        radar_similarities = []
-        for i in range(len(peer_vectors)):
-            # Calcola l'area di sovrapposizione tra i due radar
-            player_radar = player_vector[0]  # Vettore del giocatore selezionato
-            peer_radar = peer_vectors[i]     # Vettore del giocatore di confronto
-            
-            # Normalizza i vettori per il confronto del radar (0-100)
-            player_normalized = player_radar / np.max(player_radar) * 100
-            peer_normalized = peer_radar / np.max(peer_radar) * 100
-            
-            # Calcola la sovrapposizione come media delle differenze minime
-            # Più simili sono i valori, più alta è la sovrapposizione
-            overlap_scores = []
-            for j in range(len(player_normalized)):
-                # Calcola quanto si sovrappongono i due valori
-                min_val = min(player_normalized[j], peer_normalized[j])
-                max_val = max(player_normalized[j], peer_normalized[j])
-                
-                if max_val > 0:
-                    # La sovrapposizione è la percentuale del valore minimo rispetto al massimo
-                    overlap = min_val / max_val
-                else:
-                    overlap = 1.0  # Se entrambi sono 0, sono identici
-                
-                overlap_scores.append(overlap)
-            
-            # La similarità del radar è la media delle sovrapposizioni
-            radar_sim = np.mean(overlap_scores)
-            radar_similarities.append(radar_sim)
-        
-        radar_similarities = np.array(radar_similarities)
-        
-        # 5. Calcolare il punteggio finale combinando tutti i metodi
-        weight_cosine = 0.65      # Peso per lo stile (coseno)
-        weight_euclidean = 0.20   # Peso per il livello (euclidea)
-        weight_radar = 0.15       # Peso per la sovrapposizione del radar
-        
-        final_scores = (weight_cosine * cosine_sim) + (weight_euclidean * euclidean_sim) + (weight_radar * radar_similarities)
-        
-        # 6. Normalizzazione finale per assicurarsi che i punteggi siano tra 0 e 1
-        if np.max(final_scores) > 0:
-            final_scores = final_scores / np.max(final_scores)
-        
-        # 7. Creare una lista di giocatori simili con il nuovo punteggio
-        similar_players = []
-        for i, score in enumerate(final_scores):
-            player_info = df_role_filtered.iloc[i]
-            similar_players.append((player_info, score))
-            
-        # 8. Ordinare e prendere i primi N
-        similar_players.sort(key=lambda x: x[1], reverse=True)
-        top_n_similar = similar_players[:num_results]
+        # Coseno (stile), euclidea (livello) e sovrapposizione del radar calcolati
+        # in blocco su tutti i pari ruolo (la normalizzazione non dipende dai filtri);
+        # poi si applicano i filtri e si selezionano i primi N
+        matches = index.query(
+            row, num_results, league=league, max_age=max_age,
+            max_market_value=max_market_value * 1_000_000 if max_market_value is not None else None
+        )
+        top_n_similar = [(index.frame.iloc[peer_row], score) for peer_row, score in matches]
 
         if not top_n_similar:
             return dbc.Alert(f"No similar players found for {selected_player_name}.", color="info", className="mt-4")
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+# Pesi del punteggio finale: stile (coseno), livello (euclidea), sovrapposizione del radar
+WEIGHT_COSINE = 0.65
+WEIGHT_EUCLIDEAN = 0.20
+WEIGHT_RADAR = 0.15
+
+
+def _safe_divide(numerator, denominator):
+    """Divisione elemento per elemento che restituisce 0 dove il denominatore è 0."""
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def cosine_scores(player_vector, peer_vectors, peer_norms=None):
+    """Similarità del coseno (0 per i vettori nulli, come sklearn)."""
+    if peer_norms is None:
+        peer_norms = np.linalg.norm(peer_vectors, axis=1)
+    dots = peer_vectors @ player_vector
+    return _safe_divide(dots, peer_norms * np.linalg.norm(player_vector))
+
+
+def euclidean_scores(player_vector, peer_vectors):
+    """Distanza euclidea trasformata in similarità: 1 - distanza / distanza massima."""
+    distances = np.sqrt(((peer_vectors - player_vector) ** 2).sum(axis=1))
+    max_distance = distances.max() if len(distances) else 0
+    if max_distance > 0:
+        return 1 - distances / max_distance
+    return np.ones_like(distances)
+
+
+def radar_overlap_scores(player_vector, peer_vectors, peer_max=None):
+    """
+    Sovrapposizione dei radar: ogni vettore è scalato sul proprio massimo (0-100),
+    per ogni profilo si prende min/max (1 se entrambi 0) e si fa la media.
+    """
+    if peer_max is None:
+        peer_max = peer_vectors.max(axis=1)
+    player_normalized = _safe_divide(player_vector, player_vector.max()) * 100
+    peer_normalized = _safe_divide(peer_vectors, peer_max[:, None]) * 100
+
+    low = np.minimum(player_normalized, peer_normalized)
+    high = np.maximum(player_normalized, peer_normalized)
+    overlap = np.ones_like(high)
+    np.divide(low, high, out=overlap, where=high > 0)
+    return overlap.mean(axis=1)
+
+
+def similarity_scores(player_vector, peer_vectors, peer_norms=None, peer_max=None):
+    """
+    Punteggio di similarità (0-1) del giocatore con ogni riga di peer_vectors,
+    calcolato in un solo passaggio su tutta la matrice dei pari ruolo.
+    Norme e massimi per riga dei pari ruolo possono essere passati già calcolati.
+    """
+    player_vector = np.asarray(player_vector, dtype='float64').ravel()
+    peer_vectors = np.asarray(peer_vectors, dtype='float64')
+
+    final_scores = (WEIGHT_COSINE * cosine_scores(player_vector, peer_vectors, peer_norms) +
+                    WEIGHT_EUCLIDEAN * euclidean_scores(player_vector, peer_vectors) +
+                    WEIGHT_RADAR * radar_overlap_scores(player_vector, peer_vectors, peer_max))
+
+    # Normalizzazione finale per avere punteggi tra 0 e 1
+    if len(final_scores) and final_scores.max() > 0:
+        final_scores = final_scores / final_scores.max()
+    return final_scores
+
+
+def top_k(scores, k):
+    """Indici dei k punteggi più alti in ordine decrescente, senza ordinare tutto l'array."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=int)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+class SimilarityIndex:
+    """
+    Indice esatto sui vettori dei profili di una posizione, costruito dallo
+    store a ogni caricamento: matrice dei profili (NaN -> 0), norme e massimi
+    per riga sono precalcolati. I giocatori sono identificati dal Player_ID
+    (dal nome se il file non ha gli id). I punteggi sono calcolati su tutti i
+    pari ruolo e i filtri applicati dopo, così la normalizzazione (distanza
+    massima, punteggio massimo) non dipende dai filtri.
+    """
+
+    def __init__(self, df, profiles):
+        self.frame = df
+        self.profiles = [p for p in profiles if p in df.columns]
+        matrix = df[self.profiles].apply(pd.to_numeric, errors='coerce').fillna(0)
+        self.matrix = np.ascontiguousarray(matrix.to_numpy(dtype='float64'))
+        self.norms = np.linalg.norm(self.matrix, axis=1)
+        self.row_max = self.matrix.max(axis=1)
+        # Esclusi dai risultati i giocatori con vettore nullo (similarità fuorvianti)
+        self.searchable = self.matrix.sum(axis=1) > 0
+
+        self.players = df['Player'].to_numpy(dtype=object)
+        self.rows = {}
+        for row, name in enumerate(self.players):
+            self.rows.setdefault(name, row)
+        self.ids = None
+        self.id_rows = {}
+        if 'Player_ID' in df.columns:
+            ids = pd.to_numeric(df['Player_ID'], errors='coerce')
+            self.ids = ids.to_numpy(dtype='float64')
+            for row, player_id in enumerate(ids):
+                if pd.notna(player_id):
+                    self.id_rows.setdefault(int(player_id), row)
+
+        n = len(df)
+        self.leagues = df['League'].to_numpy(dtype=object) if 'League' in df.columns else np.full(n, None)
+        self.ages = (pd.to_numeric(df['Age'], errors='coerce').to_numpy(dtype='float64')
+                     if 'Age' in df.columns else np.full(n, np.nan))
+        self.market_values = (df['Market_Value_Eur'].fillna(0).to_numpy(dtype='float64')
+                              if 'Market_Value_Eur' in df.columns else np.zeros(n))
+
+    def row_of(self, player):
+        """
+        Riga del giocatore nell'indice: per Player_ID se player è un intero,
+        altrimenti per nome (prima occorrenza); None se assente.
+        """
+        if isinstance(player, (int, np.integer)) and not isinstance(player, bool):
+            return self.id_rows.get(int(player))
+        return self.rows.get(player)
+
+    def _others(self, row):
+        """Maschera dei giocatori diversi da quello della riga (per id, o per nome senza id)."""
+        if self.ids is not None and not np.isnan(self.ids[row]):
+            return self.ids != self.ids[row]
+        return self.players != self.players[row]
+
+    def query(self, row, k, league=None, max_age=None, max_market_value=None):
+        """
+        I k giocatori più simili a quello della riga indicata, come lista di
+        (riga, punteggio) in ordine decrescente. max_market_value è in euro.
+        """
+        peers = np.flatnonzero(self.searchable & self._others(row))
+        scores = similarity_scores(self.matrix[row], self.matrix[peers],
+                                   self.norms[peers], self.row_max[peers])
+
+        mask = np.ones(len(peers), dtype=bool)
+        if league and league != 'all':
+            mask &= self.leagues[peers] == league
+        if max_age is not None:
+            mask &= self.ages[peers] <= max_age
+        if max_market_value is not None:
+            mask &= self.market_values[peers] <= max_market_value
+
+        candidates, scores = peers[mask], scores[mask]
+        return [(int(candidates[i]), float(scores[i])) for i in top_k(scores, k)]
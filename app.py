@@ -191,9 +191,8 @@ scout_analysis_page.register_callbacks(app)  # Register scout analysis callbacks
 player_comparison.register_callbacks(app) # Register player comparison callbacks
 similar_players.register_callbacks(app) # <-- NUOVA REGISTRAZIONE CALLBACK
 
-# Register Serie A team callbacks for all teams
-for team in serie_a_teams.teams:
-    serie_a_teams.register_team_callbacks(app, team)
+# Serie A team callbacks (pattern-matching ids: one set for all teams)
+serie_a_teams.register_team_callbacks(app)
 
 # Layout principale
 app.layout = html.Div([